@@ -25,7 +25,9 @@ from src.tools.check_sheet import check_sheet  # Check sheet module
 from src.tools.ishikawa_diagram import ishikawa_page  # Ishikawa diagram
 from src.tools.histogram_analysis import histogram  # Histogram analysis
 from src.tools.scatter_plot import scatter_plot  # Scatter plot analysis
+from src.tools.key_driver_analysis import key_driver_analysis  # Key driver analysis
 from src.tools.stratification_analysis import stratification_analysis  # Stratification analysis
+from src.tools.report_builder import report_builder  # Multi-tool PDF report
 
 
 # Page configuration
@@ -67,8 +69,10 @@ def main():
             "🐟 Ishikawa Diagram",
             "📈 Histogram",
             "🔍 Scatter Plot",
+            "🧭 Key Drivers",
             "🎛️ Control Charts",
             "🔬 Stratification",  # pending
+            "🗂️ Report Builder",
             # "🛠️ Additional LSS Tools",
             "🚪 Logout"
         ])
@@ -99,8 +103,12 @@ def main():
             histogram()
         elif menu == "🔍 Scatter Plot":
             scatter_plot()
+        elif menu == "🧭 Key Drivers":
+            key_driver_analysis()
         elif menu == "🔬 Stratification":
             stratification_analysis()
+        elif menu == "🗂️ Report Builder":
+            report_builder()
         elif menu == ".panelControl Charts":
             load_lss_tool3_control_chart()
         elif menu == "🚪 Logout":
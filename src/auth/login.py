@@ -1,32 +1,22 @@
 import streamlit as st
-import pandas as pd
 import bcrypt
 from datetime import datetime
-import os
+
+from src.auth.user_store import get_user, record_login
 
 def validate_login(username, password):
-    users_file = 'data/users.csv'
-    
-    # Check if the file exists
-    if not os.path.exists(users_file):
-        return False, "Users file not found"
-    
-    # Read user data
-    df = pd.read_csv(users_file)
-    
-    # Find user
-    user = df[df['username'] == username]
+    # Indexed lookup of the user
+    user = get_user(username)
     
-    if user.empty:
+    if user is None:
         return False, "User not found"
     
     # Verify password
-    stored_password = user['password_hash'].values[0]
+    stored_password = user['password_hash']
     
     if bcrypt.checkpw(password.encode('utf-8'), stored_password.encode('utf-8')):
         # Update last login timestamp
-        df.loc[df['username'] == username, 'last_login'] = datetime.now().isoformat()
-        df.to_csv(users_file, index=False)
+        record_login(username, datetime.now().isoformat())
         return True, "Login successful"
     
     return False, "Incorrect password"
@@ -1,8 +1,8 @@
 import streamlit as st
-import pandas as pd
 import bcrypt
 from datetime import datetime
-import os
+
+from src.auth import user_store
 
 def validate_username(username):
     # Username validations
@@ -32,45 +32,20 @@ def validate_password(password):
 
 def user_exists(username, email):
     # Check if username or email already exist
-    users_file = 'data/users.csv'
-    if not os.path.exists(users_file):
-        return False
-    
-    df = pd.read_csv(users_file)
-    return (
-        username in df['username'].values or 
-        email in df['email'].values
-    )
+    return user_store.user_exists(username, email)
 
 def register_user(username, email, password):
     # Hash password
     salt = bcrypt.gensalt()
     hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
     
-    # Prepare user data
-    user_data = pd.DataFrame({
-        'username': [username],
-        'email': [email],
-        'password_hash': [hashed_password.decode('utf-8')],
-        'created_at': [datetime.now().isoformat()],
-        'last_login': [None]
-    })
-    
-    # Save to CSV
-    users_file = 'data/users.csv'
-    
-    # Create file if it doesn't exist
-    if not os.path.exists(users_file):
-        df = pd.DataFrame(columns=['username', 'email', 'password_hash', 'created_at', 'last_login'])
-        df.to_csv(users_file, index=False)
-    
-    # Read and add new user
-    df = pd.read_csv(users_file)
-    
-    # Use concat instead of append
-    df = pd.concat([df, user_data], ignore_index=True)
-    
-    df.to_csv(users_file, index=False)
+    # Insert the user; the unique indexes reject a username or email taken meanwhile
+    return user_store.add_user(
+        username, 
+        email, 
+        hashed_password.decode('utf-8'), 
+        datetime.now().isoformat()
+    )
 
 def register_page():
     st.title("User Registration")
@@ -112,7 +87,9 @@ def register_page():
             
             # Successful registration
             try:
-                register_user(username, email, password)
+                if not register_user(username, email, password):
+                    st.error("Username or email already exists")
+                    return
                 st.success("Registration successful! You can now log in.")
             except Exception as e:
                 st.error(f"Registration error: {e}")
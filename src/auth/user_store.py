@@ -0,0 +1,186 @@
+import os
+import csv
+import queue
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from src.utils.config import Config
+
+# Connections kept open per database (Streamlit runs every session in its own thread)
+POOL_SIZE = 4
+
+# Seconds a writer waits for another writer's lock before giving up
+BUSY_TIMEOUT = 5.0
+
+# Stored in PRAGMA user_version; 0 means the CSV has not been migrated yet
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL,
+    email TEXT NOT NULL,
+    password_hash TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    last_login TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS users_username ON users (username);
+CREATE UNIQUE INDEX IF NOT EXISTS users_email ON users (email);
+"""
+
+logger = logging.getLogger(__name__)
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """
+    Reusable SQLite connections to one database file
+
+    Connections are opened in autocommit mode with WAL journaling, so logins
+    read concurrently while a registration or last_login update is written.
+    """
+
+    def __init__(self, path: str, size: int = POOL_SIZE):
+        self.path = path
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.path, 
+            timeout=BUSY_TIMEOUT, 
+            isolation_level=None, 
+            check_same_thread=False
+        )
+        connection.row_factory = sqlite3.Row
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    @contextmanager
+    def connection(self):
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            connection = self._connect()
+        try:
+            yield connection
+        finally:
+            try:
+                self._idle.put_nowait(connection)
+            except queue.Full:
+                connection.close()
+
+
+def _migrate_csv(connection: sqlite3.Connection, path: str) -> list:
+    """
+    Copy the users of the legacy CSV store into the database
+
+    Rows whose username or email is already taken (duplicates in the CSV)
+    are not inserted. They are logged, written to '<path>.skipped.csv' for
+    review and returned. The CSV itself is always left in place.
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, newline='', encoding='utf-8') as handle:
+        reader = csv.DictReader(handle)
+        fields = reader.fieldnames
+        rows = list(reader)
+    
+    skipped = []
+    for row in rows:
+        cursor = connection.execute(
+            "INSERT OR IGNORE INTO users (username, email, password_hash, created_at, last_login) VALUES (?, ?, ?, ?, ?)",
+            (row['username'], row['email'], row['password_hash'], row['created_at'], row.get('last_login') or None)
+        )
+        if cursor.rowcount == 0:
+            skipped.append(row)
+            logger.warning(
+                "Skipped user '%s' <%s> from %s: username or email already migrated", 
+                row['username'], row['email'], path
+            )
+    
+    if skipped:
+        with open(f"{path}.skipped.csv", 'w', newline='', encoding='utf-8') as handle:
+            writer = csv.DictWriter(handle, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(skipped)
+        logger.warning(
+            "Migrated %d of %d users from %s; the %d skipped rows are in %s.skipped.csv", 
+            len(rows) - len(skipped), len(rows), path, len(skipped), path
+        )
+    return skipped
+
+
+def _initialise(connection: sqlite3.Connection):
+    """
+    Create the schema and run the one-time CSV migration
+    """
+    connection.executescript(SCHEMA)
+    # IMMEDIATE takes the write lock up front, so two processes can't both migrate
+    connection.execute('BEGIN IMMEDIATE')
+    try:
+        if connection.execute('PRAGMA user_version').fetchone()[0] == 0:
+            _migrate_csv(connection, Config.LEGACY_USERS_PATH)
+            connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        connection.execute('COMMIT')
+    except BaseException:
+        connection.execute('ROLLBACK')
+        raise
+
+
+def _pool() -> ConnectionPool:
+    path = Config.DATABASE_PATH
+    with _pools_lock:
+        pool = _pools.get(path)
+        if pool is None:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            pool = ConnectionPool(path)
+            with pool.connection() as connection:
+                _initialise(connection)
+            _pools[path] = pool
+    return pool
+
+
+def get_user(username: str):
+    """
+    The user's row as a dict, or None if there is no such user
+    """
+    with _pool().connection() as connection:
+        row = connection.execute("SELECT * FROM users WHERE username = ?", (username,)).fetchone()
+    return dict(row) if row is not None else None
+
+
+def user_exists(username: str, email: str) -> bool:
+    """
+    Whether the username or the email is already registered
+    """
+    with _pool().connection() as connection:
+        row = connection.execute(
+            "SELECT 1 FROM users WHERE username = ? OR email = ? LIMIT 1", 
+            (username, email)
+        ).fetchone()
+    return row is not None
+
+
+def add_user(username: str, email: str, password_hash: str, created_at: str) -> bool:
+    """
+    Insert a user; False if the username or email was taken in the meantime
+    """
+    try:
+        with _pool().connection() as connection:
+            connection.execute(
+                "INSERT INTO users (username, email, password_hash, created_at) VALUES (?, ?, ?, ?)", 
+                (username, email, password_hash, created_at)
+            )
+    except sqlite3.IntegrityError:
+        return False
+    return True
+
+
+def record_login(username: str, timestamp: str):
+    with _pool().connection() as connection:
+        connection.execute("UPDATE users SET last_login = ? WHERE username = ?", (timestamp, username))
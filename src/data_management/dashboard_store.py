@@ -0,0 +1,241 @@
+import os
+import re
+import json
+import glob
+import shutil
+import hashlib
+import tempfile
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # Snapshots are stored as Parquet and need pyarrow
+    pq = None
+
+from src.utils.config import Config
+
+# Bump when the snapshot contents change, so old snapshots are ignored
+SNAPSHOT_FORMAT = 3
+
+# Per-variable panel values kept in the snapshot metadata
+PANEL_SCALARS = ('q1', 'median', 'q3')
+
+# Snapshots kept per layout (one per dataset fingerprint, newest first)
+SNAPSHOTS_PER_LAYOUT = 3
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha256("|".join(map(str, parts)).encode('utf-8')).hexdigest()[:32]
+
+
+def _user_folder(username: str) -> str:
+    return os.path.join(Config.DASHBOARD_FOLDER, re.sub(r'[^\w\-]+', '_', str(username)))
+
+
+def _layouts_path(username: str) -> str:
+    return os.path.join(_user_folder(username), 'layouts.json')
+
+
+def _snapshot_folder(username: str, name: str) -> str:
+    return os.path.join(_user_folder(username), 'snapshots', _digest(name)[:16])
+
+
+def _write_atomic(path: str, data: bytes):
+    """
+    Write to a temp file next to path and move it into place, so readers
+    never see a half-written file
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _clear_snapshots(username: str, name: str):
+    shutil.rmtree(_snapshot_folder(username, name), ignore_errors=True)
+
+
+def list_layouts(username: str) -> dict:
+    """
+    Saved dashboard layouts of a user, by name
+    """
+    path = _layouts_path(username)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def save_layout(username: str, name: str, layout: dict):
+    """
+    Save (or replace) a named layout; snapshots of the previous version are dropped
+    """
+    layouts = list_layouts(username)
+    if layouts.get(name) != layout:
+        _clear_snapshots(username, name)
+    layouts[name] = layout
+    _write_atomic(_layouts_path(username), json.dumps(layouts, indent=2, default=str).encode('utf-8'))
+
+
+def delete_layout(username: str, name: str):
+    layouts = list_layouts(username)
+    if layouts.pop(name, None) is None:
+        return
+    _clear_snapshots(username, name)
+    _write_atomic(_layouts_path(username), json.dumps(layouts, indent=2, default=str).encode('utf-8'))
+
+
+def _snapshot_path(username: str, name: str, layout: dict, fingerprint: str) -> str:
+    key = _digest(SNAPSHOT_FORMAT, json.dumps(layout, sort_keys=True, default=str), fingerprint)
+    return os.path.join(_snapshot_folder(username, name), key)
+
+
+def _to_parquet(df: pd.DataFrame) -> bytes:
+    buffer = BytesIO()
+    df.to_parquet(buffer, engine='pyarrow')
+    return buffer.getvalue()
+
+
+def _panel_tables(panels: dict) -> tuple:
+    """
+    Split the chart panels into JSON-safe scalars and long-format tables
+
+    Line points, histograms and bucket windows become one table each with a
+    'variable' column; histogram counts are padded to the length of the edges.
+    """
+    scalars, lines, histograms, windows = {}, [], [], []
+    for variable, panel in panels.items():
+        scalars[variable] = {key: float(panel[key]) for key in PANEL_SCALARS}
+        line = pd.DataFrame({
+            'variable': variable,
+            'position': np.asarray(panel['positions'], dtype=np.int64),
+            'value': np.asarray(panel['values'], dtype=float)
+        })
+        if 'x' in panel:
+            line['x'] = np.asarray(panel['x'])
+        lines.append(line)
+        histograms.append(pd.DataFrame({
+            'variable': variable,
+            'edge': np.asarray(panel['edges'], dtype=float),
+            'count': np.append(np.asarray(panel['counts'], dtype=float), np.nan)
+        }))
+        if 'window' in panel:
+            windows.append(panel['window'].assign(variable=variable))
+    
+    tables = {
+        'lines': pd.concat(lines, ignore_index=True) if lines else None,
+        'histograms': pd.concat(histograms, ignore_index=True) if histograms else None,
+        'windows': pd.concat(windows) if windows else None
+    }
+    return scalars, tables
+
+
+def _panels_from_tables(scalars: dict, tables: dict) -> dict:
+    lines = dict(tuple(tables['lines'].groupby('variable', sort=False))) if 'lines' in tables else {}
+    histograms = dict(tuple(tables['histograms'].groupby('variable', sort=False))) if 'histograms' in tables else {}
+    windows = tables.get('windows')
+
+    panels = {}
+    for variable, values in scalars.items():
+        # A column without finite values has no line points
+        line = lines.get(variable, tables['lines'].iloc[:0])
+        histogram = histograms[variable]
+        panel = {
+            'positions': line['position'].to_numpy(),
+            'values': line['value'].to_numpy(),
+            'counts': histogram['count'].to_numpy()[:-1].astype(np.int64),
+            'edges': histogram['edge'].to_numpy(),
+            **values
+        }
+        if 'x' in line:
+            panel['x'] = pd.Index(line['x'].to_numpy())
+        if windows is not None:
+            panel['window'] = windows[windows['variable'] == variable].drop(columns='variable')
+        panels[variable] = panel
+    return panels
+
+
+def save_snapshot(username: str, name: str, layout: dict, fingerprint: str, snapshot: dict):
+    """
+    Store the precomputed aggregates and chart data of a layout for one dataset fingerprint
+
+    A snapshot is a folder of Parquet tables plus a meta.json with the
+    layout, KPIs and scalars. meta.json is written last, so a folder without
+    it is incomplete and is never loaded. Nothing is saved without pyarrow.
+    """
+    if pq is None:
+        return
+    path = _snapshot_path(username, name, layout, fingerprint)
+    scalars, tables = _panel_tables(snapshot['panels'])
+    tables['aggregates'] = snapshot['aggregates']
+    
+    shutil.rmtree(path, ignore_errors=True)
+    for table, df in tables.items():
+        if df is not None:
+            _write_atomic(os.path.join(path, f"{table}.parquet"), _to_parquet(df))
+    meta = {
+        'format': SNAPSHOT_FORMAT,
+        'layout': snapshot['layout'],
+        'created': snapshot['created'],
+        'rows': int(snapshot['rows']),
+        'time_column': snapshot['time_column'],
+        'resolution': snapshot['resolution'],
+        'kpis': {
+            variable: {key: None if value is None else float(value) for key, value in kpis.items()} 
+            for variable, kpis in snapshot['kpis'].items()
+        },
+        'panels': scalars,
+        'tables': [table for table, df in tables.items() if df is not None]
+    }
+    _write_atomic(os.path.join(path, 'meta.json'), json.dumps(meta, default=str).encode('utf-8'))
+
+    # Keep only the newest snapshots of this layout
+    older = sorted(
+        glob.glob(os.path.join(os.path.dirname(path), '*', 'meta.json')), 
+        key=os.path.getmtime, 
+        reverse=True
+    )[SNAPSHOTS_PER_LAYOUT:]
+    for stale in older:
+        shutil.rmtree(os.path.dirname(stale), ignore_errors=True)
+
+
+def load_snapshot(username: str, name: str, layout: dict, fingerprint: str):
+    """
+    Snapshot of a layout for this dataset fingerprint, or None if there is none
+    """
+    if fingerprint is None or pq is None:
+        return None
+    path = _snapshot_path(username, name, layout, fingerprint)
+    meta_path = os.path.join(path, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    try:
+        with open(meta_path, encoding='utf-8') as handle:
+            meta = json.load(handle)
+        if meta.get('format') != SNAPSHOT_FORMAT:
+            return None
+        tables = {
+            table: pd.read_parquet(os.path.join(path, f"{table}.parquet"), engine='pyarrow') 
+            for table in meta['tables']
+        }
+        return {
+            'layout': meta['layout'],
+            'created': meta['created'],
+            'rows': meta['rows'],
+            'time_column': meta['time_column'],
+            'resolution': meta['resolution'],
+            'aggregates': tables.pop('aggregates'),
+            'kpis': meta['kpis'],
+            'panels': _panels_from_tables(meta['panels'], tables)
+        }
+    except (OSError, ValueError, KeyError):
+        return None
@@ -1,5 +1,7 @@
 import streamlit as st
 import pandas as pd
+import hashlib
+import uuid
 
 class DataSession:
     @staticmethod
@@ -17,6 +19,69 @@ class DataSession:
     #     """Retrieve DataFrame from Streamlit session state"""
     #     return st.session_state.get('shared_dataframe', None)
     
+    @staticmethod
+    def bump_version(appended=False, fingerprint=None):
+        """
+        Mark the stored DataFrame as changed (invalidates cached results)
+        
+        fingerprint is a content hash of the new data (None if unknown). Unlike
+        the version it is the same in every session that loads the same data.
+        """
+        st.session_state['data_version'] = uuid.uuid4().hex
+        st.session_state['data_fingerprint'] = fingerprint
+        # The lineage survives appends, so incremental results can be extended
+        if not appended or 'data_lineage' not in st.session_state:
+            st.session_state['data_lineage'] = st.session_state['data_version']
+
+    @staticmethod
+    def get_lineage():
+        """Token shared by a dataset and all batches appended to it"""
+        DataSession.get_version()
+        return st.session_state['data_lineage']
+
+    @staticmethod
+    def get_version():
+        """Version token of the current dataset, used as a cache key"""
+        if 'data_version' not in st.session_state:
+            DataSession.bump_version()
+        return st.session_state['data_version']
+
+    @staticmethod
+    def get_fingerprint():
+        """Content hash of the current dataset, or None if it is not known"""
+        return st.session_state.get('data_fingerprint')
+
+    @staticmethod
+    def hash_content(data):
+        """Content hash of raw file bytes or of a DataFrame batch"""
+        if isinstance(data, pd.DataFrame):
+            columns = "|".join(map(str, data.columns)).encode('utf-8')
+            data = columns + pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes()
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def chain_fingerprint(*changes):
+        """Fingerprint of the current dataset after the given changes (appended batch, edit)"""
+        current = DataSession.get_fingerprint()
+        if current is None:
+            return None
+        return hashlib.sha256("|".join([current, *map(str, changes)]).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def set_sketches(sketches):
+        """Store per-column quantile sketches built during ingestion"""
+        st.session_state['data_sketches'] = sketches
+
+    @staticmethod
+    def get_sketches():
+        """Retrieve all quantile sketches of the current dataset"""
+        return st.session_state.get('data_sketches', {})
+
+    @staticmethod
+    def get_sketch(column):
+        """Retrieve the quantile sketch of a column, if one was built"""
+        return st.session_state.get('data_sketches', {}).get(column)
+    
     @staticmethod
     def clear_dataframe():
         """Clear DataFrame from session state"""
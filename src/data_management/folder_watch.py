@@ -0,0 +1,101 @@
+import os
+import glob
+from io import BytesIO
+
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet drops need pyarrow
+    pq = None
+
+WATCH_PATTERNS = ('*.csv', '*.parquet')
+
+
+class FolderTail:
+    """
+    Follows a drop folder of CSV/Parquet files and returns only rows not seen yet
+
+    CSV files are read from the last byte offset up to the last complete
+    line, so a line the gateway is still writing is picked up on the next
+    poll. Parquet files are read row group by row group; a file whose footer
+    is not written yet is skipped until it is complete. A file that shrinks
+    (rewritten or rotated in place) is reported as a reset.
+    """
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self.files = {}
+
+    def _paths(self) -> list:
+        paths = []
+        for pattern in WATCH_PATTERNS:
+            paths.extend(glob.glob(os.path.join(self.folder, pattern)))
+        return sorted(paths, key=lambda path: (os.path.getmtime(path), path))
+
+    def _read_csv(self, path: str, state: dict):
+        size = os.path.getsize(path)
+        if size == state.get('offset', 0):
+            return None
+
+        with open(path, 'rb') as handle:
+            handle.seek(state.get('offset', 0))
+            chunk = handle.read(size - state.get('offset', 0))
+
+        # Only complete lines; the rest is read on the next poll
+        end = chunk.rfind(b'\n') + 1
+        if end == 0:
+            return None
+        chunk = chunk[:end]
+
+        if 'columns' not in state:
+            rows = pd.read_csv(BytesIO(chunk))
+            state['columns'] = list(rows.columns)
+        else:
+            rows = pd.read_csv(BytesIO(chunk), header=None, names=state['columns'])
+        state['offset'] = state.get('offset', 0) + end
+        return rows
+
+    def _read_parquet(self, path: str, state: dict):
+        if pq is None:
+            return None
+        try:
+            parquet = pq.ParquetFile(path)
+        except Exception:
+            # Footer not written yet
+            return None
+
+        seen = state.get('row_groups', 0)
+        if parquet.num_row_groups <= seen:
+            return None
+        groups = list(range(seen, parquet.num_row_groups))
+        state['row_groups'] = parquet.num_row_groups
+        return parquet.read_row_groups(groups).to_pandas()
+
+    def poll(self) -> tuple:
+        """
+        (new rows or None, reset flag) since the previous poll
+        """
+        if not os.path.isdir(self.folder):
+            return None, False
+
+        batches = []
+        for path in self._paths():
+            state = self.files.setdefault(path, {})
+            stat = os.stat(path)
+            if stat.st_size < state.get('size', 0):
+                # Rewritten in place: start over from the beginning of the folder
+                self.files = {}
+                return self.poll()[0], True
+            state['size'] = stat.st_size
+
+            if path.endswith('.csv'):
+                rows = self._read_csv(path, state)
+            else:
+                rows = self._read_parquet(path, state)
+            if rows is not None and len(rows):
+                batches.append(rows)
+
+        if not batches:
+            return None, False
+        return pd.concat(batches, ignore_index=True), False
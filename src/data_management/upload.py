@@ -3,23 +3,52 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 
+from src.data_management.data_session import DataSession
+from src.utils.quantile_sketch import build_sketches, merge_sketches, describe_sketches
+
 def data_upload_page():
     st.title("📝 Data Upload and Analysis")
 
     # File upload section
     st.header("Upload Data File")
     uploaded_file = st.file_uploader("Select a CSV or Excel file", type=['csv', 'xlsx'])
+    append_batch = st.checkbox(
+        "Append to current dataset",
+        value=False,
+        disabled=DataSession.get_dataframe() is None
+    )
 
     if uploaded_file is not None:
         try:
-            # Read the file
-            if uploaded_file.name.endswith('.csv'):
-                df = pd.read_csv(uploaded_file)
-            else:
-                df = pd.read_excel(uploaded_file)
+            # Read each file only once; reruns reuse the stored DataFrame
+            file_key = (uploaded_file.name, uploaded_file.size, getattr(uploaded_file, 'file_id', None))
+            if st.session_state.get('uploaded_file_key') != file_key:
+                content = DataSession.hash_content(uploaded_file.getvalue())
+                if uploaded_file.name.endswith('.csv'):
+                    batch = pd.read_csv(uploaded_file)
+                else:
+                    batch = pd.read_excel(uploaded_file)
 
-            # Store DataFrame in session
-            st.session_state['uploaded_data'] = df
+                # Quantile sketches are built while ingesting each batch
+                batch_sketches = build_sketches(batch)
+                current = DataSession.get_dataframe()
+
+                appended = append_batch and current is not None
+                if appended:
+                    df = pd.concat([current, batch], ignore_index=True)
+                    DataSession.set_sketches(merge_sketches(DataSession.get_sketches(), batch_sketches))
+                    st.success(f"Appended {len(batch)} rows to the current dataset")
+                else:
+                    df = batch
+                    DataSession.set_sketches(batch_sketches)
+
+                # Store DataFrame in session
+                st.session_state['uploaded_data'] = df
+                st.session_state['uploaded_file_key'] = file_key
+                fingerprint = DataSession.chain_fingerprint(content) if appended else content
+                DataSession.bump_version(appended=appended, fingerprint=fingerprint)
+
+            df = DataSession.get_dataframe()
 
             # Analysis tabs
             tab1, tab2, tab3, tab4 = st.tabs([
@@ -46,7 +75,15 @@ def data_upload_page():
             with tab2:
                 st.subheader("Descriptive Analysis")
                 # Descriptive statistics for numeric variables
-                desc_stats = df.describe()
+                use_sketches = st.checkbox(
+                    "Approximate quantiles (sketch, no full sort)",
+                    value=len(df) > 1_000_000
+                )
+                if use_sketches and DataSession.get_sketches():
+                    desc_stats = describe_sketches(DataSession.get_sketches())
+                    st.caption("Quantiles are approximate; the last row is the rank error bound (99% confidence).")
+                else:
+                    desc_stats = df.describe()
                 st.dataframe(desc_stats)
 
                 # Distribution plots
@@ -106,12 +143,19 @@ def data_upload_page():
                     if conversion_type == 'Numeric':
                         try:
                             df[col_to_convert] = pd.to_numeric(df[col_to_convert], errors='coerce')
+                            DataSession.set_sketches({**DataSession.get_sketches(), **build_sketches(df, [col_to_convert])})
+                            DataSession.bump_version(fingerprint=DataSession.chain_fingerprint('numeric', col_to_convert))
                             st.success(f"Column {col_to_convert} converted to numeric")
                         except Exception as e:
                             st.error(f"Conversion error: {e}")
 
                     elif conversion_type == 'Categorical':
                         df[col_to_convert] = df[col_to_convert].astype('category')
+                        DataSession.set_sketches({
+                            column: sketch for column, sketch in DataSession.get_sketches().items() 
+                            if column != col_to_convert
+                        })
+                        DataSession.bump_version(fingerprint=DataSession.chain_fingerprint('category', col_to_convert))
                         st.success(f"Column {col_to_convert} converted to categorical")
 
                     elif conversion_type == 'One-Hot Encoding':
@@ -1,45 +1,394 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+import numpy as np
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from concurrent.futures import ThreadPoolExecutor
 from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
 from io import BytesIO
-import base64
 
 from src.data_management.data_session import DataSession
+from src.data_management.folder_watch import FolderTail
+from src.data_management.dashboard_store import (
+    list_layouts, save_layout, delete_layout, load_snapshot, save_snapshot
+)
+from src.utils.config import Config
+from src.utils.quantile_sketch import build_sketches, merge_sketches, ERROR_CONFIDENCE
+from src.utils.report import figure_flowables, table_flowable, paragraph_markup
+from src.utils.binning import bin_columns, binned_quantiles, min_max_downsample, column_ranges, StreamingPanels
+from src.utils.time_index import (
+    is_time_column, build_time_index, extend_time_index, range_bounds, time_aggregates,
+    extend_time_aggregates, to_nanoseconds, pick_resolution, RESOLUTIONS, SHIFT_LABELS
+)
+
+# Statistics computed for every dashboard variable in one pass
+KPI_AGGREGATES = ['count', 'mean', 'std', 'min', 'max']
+
+# Saved layout field -> widget key
+LAYOUT_WIDGETS = {
+    'title': 'dashboard_title',
+    'description': 'dashboard_description',
+    'variables': 'dashboard_variables',
+    'time_column': 'dashboard_time_column',
+    'dates': 'dashboard_dates',
+    'shifts': 'dashboard_shifts',
+    'resolution': 'dashboard_resolution',
+    'category_column': 'dashboard_category_column',
+    'category_values': 'dashboard_category_values'
+}
+
+def _restore_widget(key, default, options=None):
+    """
+    Seed a keyed widget with its current (or restored) value while that is
+    still valid for the data, otherwise with the default
+    """
+    value = st.session_state.get(key, default)
+    if options is not None:
+        if isinstance(value, (list, tuple)):
+            value = [item for item in value if item in options]
+        elif value not in options:
+            value = default
+    st.session_state[key] = value
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _cached_aggregates(_df, version, columns):
+    """
+    All dashboard aggregates in one vectorised agg, cached per dataset version and column set
+    """
+    numeric = [column for column in columns if pd.api.types.is_numeric_dtype(_df[column])]
+    if not numeric:
+        return pd.DataFrame(columns=KPI_AGGREGATES)
+    return _df[numeric].agg(KPI_AGGREGATES).T
+
+def _batch_moments(df, columns) -> pd.DataFrame:
+    """
+    count, mean, sum of squared deviations, min and max of a block of rows
+    """
+    stats = df[columns].agg(['count', 'mean', 'var', 'min', 'max']).T
+    stats['m2'] = stats['var'].fillna(0) * (stats['count'] - 1).clip(lower=0)
+    return stats.drop(columns='var')
+
+def _merge_moments(a, b) -> pd.DataFrame:
+    """
+    Combine the moments of two blocks (Chan et al. parallel update)
+    """
+    n = a['count'] + b['count']
+    delta = b['mean'].fillna(0) - a['mean'].fillna(0)
+    share = (b['count'] / n).fillna(0)
+    merged = pd.DataFrame({
+        'count': n,
+        'mean': a['mean'].fillna(0) + delta * share,
+        'min': np.fmin(a['min'], b['min']),
+        'max': np.fmax(a['max'], b['max']),
+        'm2': a['m2'] + b['m2'] + delta ** 2 * a['count'] * share
+    })
+    merged.loc[n == 0, 'mean'] = np.nan
+    return merged
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _cached_panel_data(_df, version, columns, buckets, bins):
+    """
+    Downsampled lines and binned distributions for the chart panels
+
+    All columns are binned in one pass; the result is small enough to build
+    figures from instantly on every rerun.
+    """
+    columns = list(columns)
+    binned = bin_columns(_df, columns, bins)
+    counts, edges = binned['counts'], binned['edges']
+    quartiles = [binned_quantiles(counts, edges, q) for q in (0.25, 0.5, 0.75)]
+    
+    panels = {}
+    for i, column in enumerate(columns):
+        positions, values = min_max_downsample(_df[column].to_numpy(dtype=float), buckets)
+        panels[column] = {
+            'positions': positions,
+            'values': values,
+            'counts': counts[i],
+            'edges': edges[i],
+            'q1': quartiles[0][i],
+            'median': quartiles[1][i],
+            'q3': quartiles[2][i]
+        }
+    return panels
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _cached_time_columns(_df, version):
+    """
+    Columns usable as the dashboard time axis
+    """
+    return [column for column in _df.columns if is_time_column(_df[column])]
+
+def _extend_by_lineage(name, args, df, build, extend):
+    """
+    Result over the whole dataset, kept per lineage and extended with appended rows only
+    
+    build(df) computes it from scratch; extend(state, df, start) adds the
+    rows from start on. A replaced dataset (new lineage) is built again.
+    """
+    lineage = DataSession.get_lineage()
+    store = st.session_state.setdefault('dashboard_incremental', {})
+    for stale in [key for key in store if key[0] != lineage]:
+        del store[stale]
+    
+    key = (lineage, name, args)
+    rows, state = store.get(key, (0, None))
+    if state is None or rows > len(df):
+        state = build(df)
+    elif rows < len(df):
+        state = extend(state, df, rows)
+    store[key] = (len(df), state)
+    return state
+
+def _live_time_index(df, column):
+    """
+    Sorted time index of the whole dataset; appended rows are merged in, not re-sorted
+    """
+    return _extend_by_lineage(
+        'time_index', 
+        column, 
+        df, 
+        lambda frame: build_time_index(frame[column]), 
+        lambda index, frame, start: extend_time_index(index, frame[column].iloc[start:], start)
+    )
+
+def _live_time_aggregates(df, time_column, columns, resolution):
+    """
+    Minute/hour/shift/day pre-aggregates over the whole dataset
+    
+    Appended rows only re-aggregate the buckets from their earliest timestamp on.
+    """
+    def build(frame):
+        return time_aggregates(frame, _live_time_index(frame, time_column), list(columns), resolution)
+    
+    def extend(aggregates, frame, start):
+        new = to_nanoseconds(frame[time_column].iloc[start:])
+        new = new[new != np.iinfo(np.int64).min]
+        if not len(new):
+            return aggregates
+        index = _live_time_index(frame, time_column)
+        return extend_time_aggregates(aggregates, frame, index, list(columns), resolution, int(new.min()))
+    
+    return _extend_by_lineage('time_aggregates', (time_column, columns, resolution), df, build, extend)
+
+def _live_panel_data(df, columns, buckets, bins):
+    """
+    Panel data of the unfiltered dataset; appended rows are added to the
+    histograms and line buckets without rescanning the earlier rows
+    """
+    def build(frame):
+        ranges = column_ranges(frame, list(columns), DataSession.get_sketches())
+        return StreamingPanels(columns, buckets, bins, ranges=ranges, expected_rows=len(frame)).update_frame(frame)
+    
+    panels = _extend_by_lineage(
+        'panels', 
+        (columns, buckets, bins), 
+        df, 
+        build, 
+        lambda state, frame, start: state.update_frame(frame.iloc[start:])
+    )
+    return panels.panels()
 
 class CustomDashboard:
     def __init__(self, df):
         self.df = df
+        self.full_df = df
         self.variables = list(df.columns)
         
+        # Filter state: cache key of the filtered view and the sorted time index
+        self.data_key = DataSession.get_version()
+        self.time_column = None
+        self.time_index = None
+        self.time_bounds = None
+        self.row_times = None
+        self.time_only = True
+        self.resolution = 'Auto'
+        self.rows = len(df)
+        self.filters = {}
+        
         # Default values
         self.title = "Production Analysis Dashboard"
         self.description = "Detailed metrics analysis"
         self.selected_variables = self.variables[2:4]  # Select first 2 variables
+        
+        # Module settings
+        self.settings = {
+            'line_buckets': 2000,
+            'histogram_bins': 50,
+            'figure_workers': 4
+        }
+        
+        # Values and figures as rendered, reused by the PDF export
+        self.aggregates = None
+        self.kpis = {}
+        self.figures = {}
+        
+        # Saved layout shown from its snapshot (no raw data is read)
+        self.snapshot = None
     
     def configure_dashboard(self):
         """Modal for dashboard configuration"""
         with st.expander("🔧 Configure Dashboard"):
-            self.title = st.text_input(
-                "Dashboard Title", 
-                value=self.title
-            )
-            self.description = st.text_area(
-                "Description", 
-                value=self.description
-            )
+            _restore_widget('dashboard_title', self.title)
+            _restore_widget('dashboard_description', self.description)
+            self.title = st.text_input("Dashboard Title", key='dashboard_title')
+            self.description = st.text_area("Description", key='dashboard_description')
     
     def select_variables(self):
         """Dynamic variable selector"""
         with st.sidebar.expander("📊 Variable Selection"):
+            _restore_widget('dashboard_variables', self.selected_variables, self.variables)
             self.selected_variables = st.multiselect(
                 "Select variables for analysis",
                 self.variables,
-                default=self.selected_variables
+                key='dashboard_variables'
+            )
+    
+    def select_filters(self):
+        """
+        Time column, date range, shift and category filters
+        
+        With a time column the rows are taken from the sorted time index: the
+        date range is a binary-search slice of it, and shift/category filters
+        only look at the rows inside that slice. A selection that keeps every
+        row of a dataset already in time order (a live feed) is treated as
+        unfiltered, so its results keep being extended as rows arrive.
+        """
+        version = DataSession.get_version()
+        with st.sidebar.expander("🕒 Time & Filters"):
+            time_columns = ['(row order)'] + _cached_time_columns(self.full_df, version)
+            _restore_widget('dashboard_time_column', '(row order)', time_columns)
+            time_column = st.selectbox(
+                "Time column", 
+                time_columns, 
+                key='dashboard_time_column', 
+                # A new time column starts from its full date range
+                on_change=lambda: st.session_state.pop('dashboard_dates', None)
+            )
+            self.filters = {'time_column': time_column}
+            
+            positions = None
+            key_parts = [version]
+            if time_column != '(row order)':
+                index = _live_time_index(self.full_df, time_column)
+                if len(index['times']) == 0:
+                    st.warning(f"No valid timestamps in {time_column}")
+                else:
+                    first = pd.Timestamp(index['times'][0])
+                    last = pd.Timestamp(index['times'][-1])
+                    saved = st.session_state.get('dashboard_dates') or (first.date(), last.date())
+                    if len(saved) == 2 and saved[1] == st.session_state.get('dashboard_dates_last'):
+                        # A range ending on the last day follows the data as new days arrive
+                        saved = (saved[0], last.date())
+                    st.session_state['dashboard_dates_last'] = last.date()
+                    st.session_state['dashboard_dates'] = tuple(
+                        min(max(day, first.date()), last.date()) for day in saved
+                    )
+                    dates = st.date_input(
+                        "Date range", 
+                        min_value=first.date(), 
+                        max_value=last.date(), 
+                        key='dashboard_dates'
+                    )
+                    start, end = (dates[0], dates[-1]) if len(dates) else (first.date(), last.date())
+                    lo, hi = range_bounds(index, pd.Timestamp(start), pd.Timestamp(end) + pd.Timedelta(days=1))
+                    
+                    _restore_widget('dashboard_shifts', SHIFT_LABELS, SHIFT_LABELS)
+                    _restore_widget('dashboard_resolution', 'Auto', ['Auto', 'Raw'] + list(RESOLUTIONS))
+                    shifts = st.multiselect("Shifts", SHIFT_LABELS, key='dashboard_shifts')
+                    self.resolution = st.selectbox(
+                        "Resolution", 
+                        ['Auto', 'Raw'] + list(RESOLUTIONS), 
+                        key='dashboard_resolution'
+                    )
+                    self.filters.update({
+                        'dates': [day.isoformat() for day in dates], 
+                        'shifts': shifts, 
+                        'resolution': self.resolution
+                    })
+                    
+                    times = index['times'][lo:hi]
+                    positions = index['order'][lo:hi]
+                    if len(shifts) < len(SHIFT_LABELS):
+                        keep = np.isin(index['shift'][lo:hi], [SHIFT_LABELS.index(shift) for shift in shifts])
+                        positions, times = positions[keep], times[keep]
+                        self.time_only = False
+                    
+                    self.time_column = time_column
+                    self.time_index = index
+                    self.time_bounds = (lo, hi)
+                    self.row_times = times
+                    key_parts += [time_column, lo, hi, tuple(shifts)]
+            
+            # Category (product, line, ...) filter
+            categorical = ['(none)'] + self.full_df.select_dtypes(exclude=[np.number, 'datetime', 'datetimetz']).columns.tolist()
+            _restore_widget('dashboard_category_column', '(none)', categorical)
+            category_column = st.selectbox("Filter by category", categorical, key='dashboard_category_column')
+            self.filters['category_column'] = category_column
+            if category_column != '(none)':
+                values = sorted(map(str, pd.unique(self.full_df[category_column].dropna())[:1000]))
+                _restore_widget('dashboard_category_values', [], values)
+                selected = st.multiselect(f"{category_column} values", values, key='dashboard_category_values')
+                self.filters['category_values'] = selected
+                if selected:
+                    column = self.full_df[category_column]
+                    column = column if positions is None else column.iloc[positions]
+                    keep = column.astype(str).isin(selected).to_numpy()
+                    positions = np.flatnonzero(keep) if positions is None else positions[keep]
+                    if self.row_times is not None:
+                        self.row_times = self.row_times[keep]
+                    self.time_only = False
+                    key_parts += [category_column, tuple(selected)]
+        
+        whole = (
+            positions is not None and self.time_index is not None
+            and self.time_index['row_order'] and len(positions) == len(self.full_df)
+        )
+        if positions is not None and not whole:
+            self.df = self.full_df.iloc[positions]
+            self.data_key = "|".join(map(str, key_parts))
+            self.rows = len(self.df)
+    
+    def load_aggregates(self):
+        """
+        Aggregates for the selected variables (no data scan unless data or selection changed)
+        
+        On the unfiltered dataset the moments are kept per lineage and only
+        rows appended since the last rerun are scanned, so a live feed adds
+        its new rows to the KPIs instead of recomputing them.
+        """
+        if self.snapshot is not None:
+            self.aggregates = self.snapshot['aggregates']
+            return
+        if self.df is not self.full_df:
+            self.aggregates = _cached_aggregates(
+                self.df, 
+                self.data_key, 
+                tuple(self.selected_variables)
             )
+            return
+        
+        numeric = [column for column in self.selected_variables if pd.api.types.is_numeric_dtype(self.df[column])]
+        store = st.session_state.setdefault('kpi_moments', {})
+        key = (DataSession.get_lineage(), tuple(numeric))
+        rows, moments = store.get(key, (0, None))
+        if rows > len(self.df):
+            rows, moments = 0, None
+        
+        if rows < len(self.df) and numeric:
+            batch = _batch_moments(self.df.iloc[rows:], numeric)
+            moments = batch if moments is None else _merge_moments(moments, batch)
+            rows = len(self.df)
+            store[key] = (rows, moments)
+        
+        if moments is None:
+            self.aggregates = pd.DataFrame(columns=KPI_AGGREGATES)
+            return
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(moments['m2'] / (moments['count'] - 1))
+        self.aggregates = moments.assign(std=std)[KPI_AGGREGATES]
     
     def generate_kpis(self):
         """Dynamic generation of KPIs"""
@@ -49,54 +398,225 @@ class CustomDashboard:
         
         for i, variable in enumerate(self.selected_variables):
             with kpi_cols[i]:
-                mean_value = self.df[variable].mean()
-                min_value = self.df[variable].min()
-                max_value = self.df[variable].max()
+                if variable not in self.aggregates.index:
+                    st.metric(label=f"📈 {variable}", value="—", delta="Non-numeric", delta_color="off")
+                    continue
+                
+                stats = self.aggregates.loc[variable]
+                self.kpis[variable] = {'Mean': stats['mean'], 'Min': stats['min'], 'Max': stats['max']}
+                delta = f"Min: {stats['min']:.2f} | Max: {stats['max']:.2f}"
+                
+                # The ingestion sketch describes the unfiltered data only
+                if self.snapshot is not None:
+                    saved = self.snapshot['kpis'].get(variable, {})
+                    median, rank_error = saved.get('Median ≈'), saved.get('Median rank error (±%)')
+                else:
+                    sketch = DataSession.get_sketch(variable) if self.df is self.full_df else None
+                    # Approximate median from the ingestion sketch, with its rank error bound
+                    median = sketch.quantile(0.5) if sketch is not None else None
+                    rank_error = 100 * sketch.rank_error() if sketch is not None else None
+                
+                help_text = None
+                if median is not None:
+                    self.kpis[variable]['Median ≈'] = median
+                    self.kpis[variable]['Median rank error (±%)'] = rank_error
+                    delta = f"Min: {stats['min']:.2f} | Median ≈ {median:.2f} | Max: {stats['max']:.2f}"
+                    help_text = (
+                        f"The median is approximate (quantile sketch): its rank is within "
+                        f"±{rank_error:.2f}% of the true median with {ERROR_CONFIDENCE:.0%} confidence."
+                    )
                 
                 st.metric(
                     label=f"📈 {variable}", 
-                    value=f"{mean_value:.2f}",
-                    delta=f"Min: {min_value:.2f} | Max: {max_value:.2f}"
+                    value=f"{stats['mean']:.2f}",
+                    delta=delta,
+                    help=help_text
                 )
+                if median is not None:
+                    st.caption(f"Median ≈ ±{rank_error:.2f}% rank error ({ERROR_CONFIDENCE:.0%} confidence)")
     
-    def control_plots(self):
-        """Control charts for selected variables"""
-        st.header("🔍 Control Charts")
+    def _chart_resolution(self) -> str:
+        """
+        Pre-aggregate level for the time axis ('Raw' plots downsampled rows)
+        """
+        if self.snapshot is not None:
+            return self.snapshot['resolution']
+        if self.time_column is None or not self.time_only:
+            return 'Raw'
+        if self.resolution != 'Auto':
+            return self.resolution
+        span = int(self.row_times[-1] - self.row_times[0]) if len(self.row_times) else 0
+        return pick_resolution(len(self.df), span, 2 * self.settings['line_buckets'])
+    
+    def _panel_data(self, variables) -> dict:
+        """
+        Everything the charts of each variable are drawn from
+        
+        Line points on the row or time axis (or the pre-aggregated buckets of
+        the selected range) plus the binned distribution. It is small, so it
+        is also what a saved dashboard's snapshot keeps.
+        """
+        if self.snapshot is not None:
+            return {variable: self.snapshot['panels'][variable] for variable in variables}
         
-        for variable in self.selected_variables:
-            # Line chart with control limits
-            fig = px.line(
+        columns = tuple(self.aggregates.index)
+        if self.df is self.full_df:
+            # The whole dataset is extended as rows are appended
+            panels = _live_panel_data(self.df, columns, self.settings['line_buckets'], self.settings['histogram_bins'])
+        else:
+            panels = _cached_panel_data(
                 self.df, 
-                y=variable, 
-                title=f'Control Chart - {variable}',
-                labels={'index': 'Observations', 'value': variable}
-            )
-            
-            # Add control bands
-            fig.add_hrect(
-                y0=self.df[variable].mean() - self.df[variable].std(), 
-                y1=self.df[variable].mean() + self.df[variable].std(), 
-                fillcolor="green", 
-                opacity=0.2,
-                layer="below",
-                line_width=0,
+                self.data_key, 
+                columns, 
+                self.settings['line_buckets'], 
+                self.settings['histogram_bins']
             )
-            
-            st.plotly_chart(fig)
+        resolution = self._chart_resolution()
+        if resolution != 'Raw':
+            buckets = _live_time_aggregates(self.full_df, self.time_column, columns, resolution)
+            # Binary search on the bucket starts for the selected range
+            lo, hi = self.time_bounds
+            times = self.time_index['times']
+            first = buckets.index.searchsorted(pd.Timestamp(times[lo]), side='right') - 1 if hi > lo else 0
+            last = buckets.index.searchsorted(pd.Timestamp(times[hi - 1]), side='right') if hi > lo else 0
+        
+        data = {}
+        for variable in variables:
+            panel = dict(panels[variable])
+            if resolution != 'Raw':
+                panel['window'] = buckets[variable].iloc[max(first, 0):last]
+            elif self.time_column is not None:
+                panel['x'] = pd.to_datetime(self.row_times[panel['positions']])
+            else:
+                panel['x'] = self.df.index[panel['positions']]
+            data[variable] = panel
+        return data
     
-    def distribution_plots(self):
-        """Distribution charts"""
-        st.header("📊 Variable Distribution")
+    def _control_figure(self, variable, panel):
+        """
+        Control chart over the row order or the time axis, with the mean ± std band
         
-        for variable in self.selected_variables:
-            # Histogram with marginal boxplot
-            fig = px.histogram(
-                self.df, 
-                x=variable, 
-                title=f'Distribution of {variable}',
-                marginal='box'
-            )
-            st.plotly_chart(fig)
+        Long time ranges are drawn from the pre-aggregates (bucket mean with a
+        min-max envelope); otherwise the min/max-downsampled rows are plotted.
+        """
+        resolution = self._chart_resolution()
+        
+        if 'window' in panel:
+            window = panel['window']
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(
+                x=window.index, y=window['min'], mode='lines', line=dict(width=0), 
+                showlegend=False, hoverinfo='skip'
+            ))
+            fig.add_trace(go.Scatter(
+                x=window.index, y=window['max'], mode='lines', line=dict(width=0), 
+                fill='tonexty', fillcolor='rgba(31, 119, 180, 0.2)', name='Min-Max'
+            ))
+            fig.add_trace(go.Scatter(x=window.index, y=window['mean'], mode='lines', name=f'{resolution} mean'))
+        else:
+            fig = go.Figure(go.Scattergl(
+                x=panel['x'], 
+                y=panel['values'], 
+                mode='lines', 
+                name=variable
+            ))
+        
+        fig.update_layout(
+            title=f'Control Chart - {variable}', 
+            xaxis_title=self.time_column or 'Observations', 
+            yaxis_title=variable
+        )
+        
+        # Add control bands from the cached aggregates
+        mean, std = self.aggregates.loc[variable, ['mean', 'std']]
+        fig.add_hrect(
+            y0=mean - std, 
+            y1=mean + std, 
+            fillcolor="green", 
+            opacity=0.2,
+            layer="below",
+            line_width=0,
+        )
+        return fig
+    
+    def _distribution_figure(self, variable, panel):
+        """
+        Pre-binned histogram with a marginal box plot drawn from binned quartiles
+        """
+        edges = panel['edges']
+        iqr = panel['q3'] - panel['q1']
+        
+        fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.2, 0.8], vertical_spacing=0.02)
+        fig.add_trace(go.Box(
+            q1=[panel['q1']], 
+            median=[panel['median']], 
+            q3=[panel['q3']], 
+            lowerfence=[max(edges[0], panel['q1'] - 1.5 * iqr)], 
+            upperfence=[min(edges[-1], panel['q3'] + 1.5 * iqr)], 
+            mean=[self.aggregates.loc[variable, 'mean']], 
+            y=[variable], 
+            orientation='h', 
+            name=variable, 
+            showlegend=False
+        ), row=1, col=1)
+        fig.add_trace(go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2, 
+            y=panel['counts'], 
+            width=np.diff(edges), 
+            name='count', 
+            showlegend=False
+        ), row=2, col=1)
+        fig.update_layout(title=f'Distribution of {variable}', bargap=0)
+        fig.update_yaxes(showticklabels=False, row=1, col=1)
+        fig.update_yaxes(title_text='count', row=2, col=1)
+        return fig
+    
+    def _panel_figures(self, variables) -> dict:
+        """
+        Control and distribution figures per variable, built in a worker pool
+        """
+        panels = self._panel_data(variables)
+        
+        def build(variable):
+            panel = panels[variable]
+            return [self._control_figure(variable, panel), self._distribution_figure(variable, panel)]
+        
+        with ThreadPoolExecutor(max_workers=max(min(len(variables), self.settings['figure_workers']), 1)) as pool:
+            return dict(zip(variables, pool.map(build, variables)))
+    
+    def chart_panels(self):
+        """
+        One tab per variable; only the open tab builds and sends its charts
+        """
+        st.header("🔍 Control Charts and Distributions")
+        
+        variables = [variable for variable in self.selected_variables if variable in self.aggregates.index]
+        if not variables:
+            st.info("Select numeric variables to chart")
+            return
+        if self.rows == 0:
+            st.info("No rows match the selected filters")
+            return
+        
+        tabs = st.tabs([str(variable) for variable in variables], on_change="rerun", key="dashboard_panels")
+        for tab, variable in zip(tabs, variables):
+            if not tab.open:
+                continue
+            with tab:
+                self.figures.update(self._panel_figures([variable]))
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.plotly_chart(self.figures[variable][0], use_container_width=True)
+                with col2:
+                    st.plotly_chart(self.figures[variable][1], use_container_width=True)
+        
+        resolution = self._chart_resolution()
+        lines = (
+            f"Lines show {resolution.lower()} means with their min-max envelope"
+            if resolution != 'Raw' else
+            f"Lines keep the min and max of {self.settings['line_buckets']:,} row buckets"
+        )
+        st.caption(f"{lines}; histograms use {self.settings['histogram_bins']} server-side bins.")
     
     def export_to_pdf(self):
         """Export dashboard to PDF modal"""
@@ -107,46 +627,256 @@ class CustomDashboard:
             )
             
             if st.button("Generate PDF"):
-                # Basic PDF export implementation
-                buffer = BytesIO()
-                c = canvas.Canvas(buffer, pagesize=letter)
-                width, height = letter
-                
-                # Title
-                c.setFont("Helvetica-Bold", 16)
-                c.drawString(inch, height - inch, self.title)
+                with st.spinner("Rendering charts..."):
+                    pdf_data = self._build_pdf()
                 
-                # Description
-                c.setFont("Helvetica", 12)
-                c.drawString(inch, height - (inch * 1.5), self.description)
-                
-                c.save()
-                
-                pdf_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-                href = f'<a href="data:application/pdf;base64,{pdf_base64}" download="{filename}.pdf">Download PDF</a>'
-                st.markdown(href, unsafe_allow_html=True)
+                st.download_button(
+                    label="Download PDF",
+                    data=pdf_data,
+                    file_name=f"{filename}.pdf",
+                    mime="application/pdf"
+                )
+    
+    def _build_pdf(self) -> bytes:
+        """
+        Dashboard PDF from the KPIs computed by render() and every variable's charts
+        
+        All charts are rendered concurrently and embedded as vector graphics.
+        """
+        styles = getSampleStyleSheet()
+        elements = [
+            Paragraph(paragraph_markup(self.title), styles['Title']),
+            Paragraph(paragraph_markup(self.description), styles['Normal']),
+            Spacer(1, 12),
+            Paragraph("Key Performance Indicators (KPIs)", styles['Heading2'])
+        ]
+        kpi_table = pd.DataFrame.from_dict(self.kpis, orient='index')
+        kpi_table.index.name = 'Variable'
+        elements.append(table_flowable(kpi_table))
+        
+        # One batch for every chart of every variable
+        variables = [variable for variable in self.selected_variables if variable in self.aggregates.index]
+        missing = [variable for variable in variables if variable not in self.figures]
+        self.figures.update(self._panel_figures(missing))
+        charts = iter(figure_flowables(
+            [fig for variable in variables for fig in self.figures[variable]]
+        ))
+        
+        for variable in variables:
+            elements.append(PageBreak())
+            elements.append(Paragraph(paragraph_markup(variable), styles['Heading2']))
+            for _ in self.figures[variable]:
+                elements.append(next(charts))
+                elements.append(Spacer(1, 12))
+        
+        buffer = BytesIO()
+        SimpleDocTemplate(buffer, pagesize=letter).build(elements)
+        return buffer.getvalue()
+    
+    def layout(self) -> dict:
+        """Current title, variables and filters as a saved layout"""
+        if self.snapshot is not None:
+            return self.snapshot['layout']
+        return {
+            'title': self.title,
+            'description': self.description,
+            'variables': list(self.selected_variables),
+            **self.filters
+        }
+    
+    def build_snapshot(self) -> dict:
+        """
+        Aggregates, KPIs and chart data of every selected variable, as computed by render()
+        """
+        if self.snapshot is not None:
+            return self.snapshot
+        variables = [variable for variable in self.selected_variables if variable in self.aggregates.index]
+        return {
+            'layout': self.layout(),
+            'created': pd.Timestamp.now().isoformat(timespec='seconds'),
+            'rows': self.rows,
+            'time_column': self.time_column,
+            'resolution': self._chart_resolution(),
+            'aggregates': self.aggregates,
+            'kpis': self.kpis,
+            'panels': self._panel_data(variables) if self.rows else {}
+        }
+    
+    def use_snapshot(self, snapshot):
+        """Show a saved dashboard from its snapshot instead of the raw data"""
+        layout = snapshot['layout']
+        self.snapshot = snapshot
+        self.title = layout['title']
+        self.description = layout['description']
+        self.selected_variables = layout['variables']
+        self.time_column = snapshot['time_column']
+        self.rows = snapshot['rows']
+    
+    def saved_dashboards(self):
+        """
+        The user's saved dashboards
+        
+        Opening one restores its settings into the widgets. If a snapshot of
+        it exists for the current dataset, its KPIs and charts are shown from
+        the snapshot without reading the raw data; otherwise the dashboard is
+        computed as usual and the snapshot is written once it is rendered.
+        """
+        username = st.session_state.get('username') or 'default'
+        layouts = list_layouts(username)
+        opened = st.session_state.get('dashboard_opened')
+        if opened not in layouts:
+            opened = st.session_state['dashboard_opened'] = None
+        
+        with st.sidebar.expander("💾 Saved Dashboards", expanded=opened is not None):
+            if not layouts:
+                st.caption("No saved dashboards yet")
+                return
+            
+            name = st.selectbox("Dashboard", list(layouts), key='dashboard_saved_name')
+            col1, col2 = st.columns(2)
+            if col1.button("Open", key='dashboard_open'):
+                opened = st.session_state['dashboard_opened'] = name
+                _apply_layout(layouts[name])
+            if col2.button("Delete", key='dashboard_delete'):
+                delete_layout(username, name)
+                if opened == name:
+                    st.session_state['dashboard_opened'] = None
+                st.rerun()
+            
+            if opened is None:
+                return
+            snapshot = load_snapshot(username, opened, layouts[opened], DataSession.get_fingerprint())
+            if snapshot is None:
+                # Computed from the data this time; render() then stores the snapshot
+                st.session_state['dashboard_opened'] = None
+                st.session_state['dashboard_snapshot_pending'] = opened
+                return
+            
+            st.caption(f"'{opened}' is shown from its snapshot of {snapshot['created']}")
+            if st.button("Edit", key='dashboard_edit'):
+                st.session_state['dashboard_opened'] = None
+                _apply_layout(layouts[opened])
+                return
+            self.use_snapshot(snapshot)
+    
+    def save_dashboard(self):
+        """Save the current layout (and its snapshot) under a name"""
+        username = st.session_state.get('username') or 'default'
+        fingerprint = DataSession.get_fingerprint()
+        
+        pending = st.session_state.pop('dashboard_snapshot_pending', None)
+        if pending is not None and fingerprint is not None and list_layouts(username).get(pending) == self.layout():
+            save_snapshot(username, pending, self.layout(), fingerprint, self.build_snapshot())
+        
+        with st.expander("💾 Save Dashboard"):
+            name = st.text_input("Dashboard name", value=self.title, key='dashboard_save_name')
+            if st.button("Save dashboard", key='dashboard_save'):
+                if not name.strip():
+                    st.error("Enter a name for the dashboard")
+                    return
+                layout = self.layout()
+                save_layout(username, name.strip(), layout)
+                if fingerprint is not None:
+                    save_snapshot(username, name.strip(), layout, fingerprint, self.build_snapshot())
+                    st.success(f"Saved '{name.strip()}' with a snapshot of the current data")
+                else:
+                    st.success(f"Saved '{name.strip()}'")
     
     def render(self):
         """Render complete dashboard"""
         st.title(self.title)
         st.write(self.description)
         
+        self.load_aggregates()
         self.generate_kpis()
-        self.control_plots()
-        self.distribution_plots()
+        self.chart_panels()
         self.export_to_pdf()
+        self.save_dashboard()
+
+def _apply_layout(layout):
+    """Load a saved layout into the dashboard widgets (before they are drawn)"""
+    for key in LAYOUT_WIDGETS.values():
+        st.session_state.pop(key, None)
+    for field, key in LAYOUT_WIDGETS.items():
+        if field not in layout:
+            continue
+        value = layout[field]
+        if field == 'dates':
+            value = tuple(pd.Timestamp(day).date() for day in value)
+        st.session_state[key] = value
+
+def _ingest_live_rows():
+    """
+    Poll the watch folder and add new rows to the session dataset
+    
+    Only rows written since the last poll are read. They are appended with
+    merged sketches under the same lineage, so KPIs, panels and the time
+    index are extended with the new rows only; the page is rerun only when
+    something arrived.
+    """
+    tail = st.session_state.get('folder_tail')
+    if tail is None or tail.folder != Config.WATCH_FOLDER:
+        tail = st.session_state['folder_tail'] = FolderTail(Config.WATCH_FOLDER)
+        first_poll = True
+    else:
+        first_poll = False
+    
+    try:
+        rows, reset = tail.poll()
+    except Exception as e:
+        st.error(f"Error reading watch folder: {e}")
+        return
+    
+    if rows is None:
+        st.caption(f"Watching {Config.WATCH_FOLDER} · last checked {pd.Timestamp.now():%H:%M:%S}")
+        return
+    
+    current = DataSession.get_dataframe()
+    batch_sketches = build_sketches(rows)
+    content = DataSession.hash_content(rows)
+    # The first read of the folder replaces the dataset; later reads append to it
+    appended = not (reset or first_poll) and current is not None
+    if appended:
+        st.session_state['uploaded_data'] = pd.concat([current, rows], ignore_index=True)
+        DataSession.set_sketches(merge_sketches(DataSession.get_sketches(), batch_sketches))
+    else:
+        st.session_state['uploaded_data'] = rows
+        DataSession.set_sketches(batch_sketches)
+    fingerprint = DataSession.chain_fingerprint(content) if appended else content
+    DataSession.bump_version(appended=appended, fingerprint=fingerprint)
+    st.rerun()
+
+def follow_watch_folder():
+    """Sidebar switch that keeps the dashboard in sync with the watch folder"""
+    with st.sidebar.expander("📡 Live Data"):
+        follow = st.toggle(f"Follow {Config.WATCH_FOLDER}", value=False)
+        interval = st.number_input(
+            "Refresh every (seconds)", 
+            min_value=1, 
+            value=Config.WATCH_INTERVAL_SECONDS
+        )
+    
+    if follow:
+        st.fragment(_ingest_live_rows, run_every=interval)()
+    else:
+        st.session_state.pop('folder_tail', None)
 
 def dashboard():
     """Main dashboard function"""
+    follow_watch_folder()
+    
     # Retrieve DataFrame from session
     df = DataSession.get_dataframe()
     
     if df is not None:
         dashboard_instance = CustomDashboard(df)
+        dashboard_instance.saved_dashboards()
         
-        # Configuration
-        dashboard_instance.configure_dashboard()
-        dashboard_instance.select_variables()
+        # Configuration (a dashboard shown from its snapshot keeps its saved settings)
+        if dashboard_instance.snapshot is None:
+            dashboard_instance.configure_dashboard()
+            dashboard_instance.select_variables()
+            dashboard_instance.select_filters()
         
         # Render dashboard
         dashboard_instance.render()
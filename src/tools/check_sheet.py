@@ -4,6 +4,8 @@ import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 
+from src.tools.result_export import export_results
+
 class CheckSheet:
     def __init__(self):
         # Initialize session state variables
@@ -118,14 +120,12 @@ class CheckSheet:
                 st.plotly_chart(fig_pie)
             
             # Export options
-            if st.button("Export Data to CSV"):
-                csv = st.session_state.sheet_data.to_csv(index=False)
-                st.download_button(
-                    label="Download CSV",
-                    data=csv,
-                    file_name='check_sheet_data.csv',
-                    mime='text/csv'
-                )
+            export_results(
+                {'Check Sheet': st.session_state.sheet_data},
+                'check_sheet_data',
+                'check_sheet',
+                label="Download Data"
+            )
         else:
             st.info("No data to visualize. Please enter data first.")
 
@@ -6,10 +6,13 @@ import plotly.express as px
 from scipy import stats
 import io
 from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph
 from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-import base64
+
+from src.utils.rendering import render_figure
+from src.utils.report import table_flowable
+from src.tools.report_builder import add_to_report_button
+from src.tools.result_export import export_results
 
 class ControlChartAnalyzer:
     def __init__(self, dataframe):
@@ -112,6 +115,31 @@ class ControlChartAnalyzer:
         
         return interpretation
 
+    @staticmethod
+    def limits_table(limits) -> pd.DataFrame:
+        """
+        Control limits as a Metric/Value table
+        """
+        return pd.DataFrame({
+            'Metric': ['Mean', 'Upper Limit', 'Lower Limit'],
+            'Value': [limits['mean'], limits['upper_limit'], limits['lower_limit']]
+        })
+
+    def point_flags(self, variable, limits) -> pd.DataFrame:
+        """
+        Every sample with its position relative to the control limits
+        """
+        values = self.df[variable].to_numpy(dtype=float)
+        above = values > limits['upper_limit']
+        below = values < limits['lower_limit']
+        return pd.DataFrame({
+            'Sample': self.df.index,
+            variable: values,
+            'Above Upper Limit': above,
+            'Below Lower Limit': below,
+            'Out of Control': above | below
+        })
+
     def export_to_pdf(self, fig, variable, limits, interpretation):
         """
         Exports the analysis to PDF
@@ -126,16 +154,10 @@ class ControlChartAnalyzer:
         # Title
         elements.append(Paragraph(f"Quality Control Analysis - {variable}", styles['Title']))
         
-        # Save chart as image
-        img_buffer = io.BytesIO()
-        fig.write_image(img_buffer, format='png')
-        img_buffer.seek(0)
-        img_base64 = base64.b64encode(img_buffer.getvalue()).decode()
-        
-        # Image
-        img_path = f"data:image/png;base64,{img_base64}"
+        # Chart image from the shared renderer
+        img_bytes = render_figure(fig, format='png')
         from reportlab.platypus import Image
-        elements.append(Image(img_path, width=500, height=300))
+        elements.append(Image(io.BytesIO(img_bytes), width=500, height=300))
         
         # Interpretation
         elements.append(Paragraph("Interpretation", styles['Heading2']))
@@ -143,20 +165,7 @@ class ControlChartAnalyzer:
             elements.append(Paragraph(line, styles['Normal']))
         
         # Limits Table
-        table_data = [
-            ['Metric', 'Value'],
-            ['Mean', f"{limits['mean']:.2f}"],
-            ['Upper Limit', f"{limits['upper_limit']:.2f}"],
-            ['Lower Limit', f"{limits['lower_limit']:.2f}"]
-        ]
-        table = Table(table_data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0,0), (-1,0), colors.grey),
-            ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
-            ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-            ('GRID', (0,0), (-1,-1), 1, colors.black)
-        ]))
-        elements.append(table)
+        elements.append(table_flowable(self.limits_table(limits), decimals=2))
         
         doc.build(elements)
         return buffer.getvalue()
@@ -200,6 +209,20 @@ def lss_tool3_control_chart_page():
             file_name=f"quality_control_{variable}.pdf",
             mime="application/pdf"
         )
+    
+    export_results(
+        {'Control Limits': analyzer.limits_table(limits), 'Points': analyzer.point_flags(variable, limits)},
+        f"quality_control_{variable}",
+        'control_chart'
+    )
+    
+    add_to_report_button(
+        'control_chart', 
+        f"Quality Control Analysis - {variable}", 
+        interpretation, 
+        [fig], 
+        [("Control Limits", analyzer.limits_table(limits))]
+    )
 
 def load_lss_tool3_control_chart():
     lss_tool3_control_chart_page()
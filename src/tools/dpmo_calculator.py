@@ -4,6 +4,8 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from scipy.stats import norm
 
+from src.tools.result_export import export_results
+
 def dpmo_calculator_page():
     # Sigma level reference table
     sigma_table = pd.DataFrame({
@@ -109,12 +111,7 @@ def dpmo_calculator_page():
                 'Metric': ['DPMO', 'Sigma Level', 'Performance'],
                 'Value': [dpmo, sigma_level, performance * 100]
             })
-            st.download_button(
-                label="Download Results", 
-                data=results.to_csv(index=False).encode('utf-8'),
-                file_name='dpmo_results.csv',
-                mime='text/csv'
-            )
+            export_results({'DPMO': results}, 'dpmo_results', 'dpmo')
 
 # Entry point
 def main():
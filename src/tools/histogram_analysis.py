@@ -3,18 +3,35 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 from scipy import stats
 import matplotlib.pyplot as plt
 from typing import List, Optional
 
+from src.utils.capability import capability_batch, CANDIDATE_DISTRIBUTIONS
+from src.utils.kde import binned_kde
+from src.utils.binning import bin_columns, column_ranges
+from src.utils.normality import normality_tests, SIGNIFICANCE_LEVEL
+from src.data_management.data_session import DataSession
+from src.tools.report_builder import add_to_report_button
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _cached_normality_tests(_df: pd.DataFrame, version: str, columns: tuple):
+    """
+    Normality test results cached per dataset version and column set
+    """
+    return normality_tests(_df, list(columns))
+
 class StatisticalHistogram:
     def __init__(self):
         self.df = st.session_state.get('uploaded_data')
         
         # Safety and validation settings
         self.settings = {
-            'max_columns': 20,
-            'max_rows': 10000,
+            'max_columns': 500,
+            'max_rows': 50_000_000,
+            'max_bins': 200,
+            'grid_columns': 4,
             'valid_data_types': [np.number, 'object', 'category']
         }
 
@@ -77,44 +94,85 @@ class StatisticalHistogram:
             st.warning("No numeric data available for analysis")
             return
         
+        # View selector
+        view_mode = st.radio(
+            "View", 
+            ["Single Variable", "Grid (multiple variables)", "Normality Tests"], 
+            horizontal=True
+        )
+        
+        if view_mode == "Grid (multiple variables)":
+            self._generate_histogram_grid(numeric_columns)
+            return
+        
+        if view_mode == "Normality Tests":
+            self._generate_normality_tests(numeric_columns)
+            return
+        
         # Variable selector
         variable = st.selectbox("Select Variable for Analysis", numeric_columns)
+        show_density = st.checkbox("Overlay density curve (KDE)", value=False)
         
         try:
             # Generate histogram
-            fig = self._create_detailed_histogram(variable)
+            fig = self._create_detailed_histogram(variable, show_density)
             
             # Display chart
             st.plotly_chart(fig)
             
             # Summary table and analysis
-            self._generate_summary_table(variable)
+            summary_df, interpretation = self._generate_summary_table(variable)
+            add_to_report_button(
+                'histogram', 
+                f"Histogram - {variable}", 
+                [interpretation], 
+                [fig], 
+                [("Summary Statistics", summary_df)]
+            )
+            
+            # Process capability
+            self._generate_capability_analysis(variable, numeric_columns)
             
         except Exception as e:
             st.error(f"Error generating histogram: {e}")
 
-    def _create_detailed_histogram(self, variable: str):
+    def _create_detailed_histogram(self, variable: str, show_density: bool = False):
         """
         Create detailed histogram with professional annotations
+        
+        Bins are computed on the server so only the counts reach the browser.
         """
-        data = self.df[variable]
+        data = self.df[variable].dropna().to_numpy(dtype=float)
         
         # Statistical calculations
         mean = data.mean()
-        median = data.median()
-        std_dev = data.std()
         
         # Histogram with distribution
         fig = go.Figure()
         
         # Base histogram
-        fig.add_trace(go.Histogram(
-            x=data, 
+        counts, edges = np.histogram(data, bins=self._bin_count(data))
+        bin_width = edges[1] - edges[0]
+        fig.add_trace(go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=counts,
+            width=bin_width,
             name='Distribution',
             marker_color='blue',
             opacity=0.7
         ))
         
+        # Density overlay scaled to the frequency axis
+        if show_density and len(data) > 1:
+            grid, density, bandwidth = binned_kde(data)
+            fig.add_trace(go.Scatter(
+                x=grid,
+                y=density * len(data) * bin_width,
+                mode='lines',
+                name=f'KDE (bw={bandwidth:.3g})',
+                line=dict(color='orange', width=2)
+            ))
+        
         # Mean line
         fig.add_shape(
             type='line', 
@@ -145,27 +203,188 @@ class StatisticalHistogram:
         
         return fig
 
+    def _generate_histogram_grid(self, numeric_columns: List[str]):
+        """
+        Small-multiple histograms for many variables binned in one pass
+        """
+        selected = st.multiselect(
+            "Variables", 
+            numeric_columns, 
+            default=numeric_columns[:12]
+        )
+        bins = st.slider("Bins per variable", min_value=10, max_value=100, value=30)
+        
+        if not selected:
+            st.info("Select at least one variable")
+            return
+        
+        try:
+            ranges = column_ranges(self.df, selected, DataSession.get_sketches())
+            result = bin_columns(self.df, selected, bins=bins, ranges=ranges)
+        except Exception as e:
+            st.error(f"Error binning variables: {e}")
+            return
+        
+        stats_df = result['stats']
+        
+        # Subplot titles carry the skew and outlier flags
+        titles = []
+        for column in selected:
+            flags = []
+            if stats_df.at[column, 'skewed']:
+                flags.append("skewed")
+            if stats_df.at[column, 'outliers']:
+                flags.append("outliers")
+            titles.append(f"⚠️ {column} ({', '.join(flags)})" if flags else column)
+        
+        n_cols = min(self.settings['grid_columns'], len(selected))
+        n_rows = int(np.ceil(len(selected) / n_cols))
+        fig = make_subplots(rows=n_rows, cols=n_cols, subplot_titles=titles)
+        
+        for i, column in enumerate(selected):
+            edges = result['edges'][i]
+            flagged = stats_df.at[column, 'skewed'] or stats_df.at[column, 'outliers']
+            fig.add_trace(
+                go.Bar(
+                    x=(edges[:-1] + edges[1:]) / 2,
+                    y=result['counts'][i],
+                    width=edges[1] - edges[0],
+                    marker_color='orange' if flagged else 'blue',
+                    opacity=0.7,
+                    name=column
+                ),
+                row=i // n_cols + 1,
+                col=i % n_cols + 1
+            )
+        
+        fig.update_layout(
+            height=220 * n_rows,
+            showlegend=False,
+            title='Distribution Overview'
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        
+        # Flag table
+        st.subheader("🚩 Distribution Flags")
+        st.dataframe(stats_df.round(4))
+
+    def _generate_normality_tests(self, numeric_columns: List[str]):
+        """
+        Anderson-Darling, Shapiro-Wilk and Kolmogorov-Smirnov tests across columns
+        """
+        selected = st.multiselect("Variables", numeric_columns, default=numeric_columns)
+        
+        if not selected:
+            st.info("Select at least one variable")
+            return
+        
+        try:
+            with st.spinner("Running normality tests..."):
+                table, qq_data = _cached_normality_tests(
+                    self.df, 
+                    DataSession.get_version(), 
+                    tuple(selected)
+                )
+        except Exception as e:
+            st.error(f"Error running normality tests: {e}")
+            return
+        
+        st.subheader("🧪 Normality Tests")
+        st.dataframe(table)
+        st.caption(
+            f"Normal = Anderson-Darling p-value ≥ {SIGNIFICANCE_LEVEL}. Shapiro-Wilk runs on a "
+            "random subsample of at most 5000 points; KS uses the sample mean and std."
+        )
+        
+        if 'Normal' in table.columns:
+            non_normal = table.index[table['Normal'] == False].tolist()
+            if non_normal:
+                st.warning(
+                    f"{len(non_normal)} variable(s) depart from normality; "
+                    "use distribution fitting in the capability analysis: " + ", ".join(map(str, non_normal))
+                )
+        
+        # Q-Q plot
+        if qq_data:
+            qq_variable = st.selectbox("Q-Q Plot Variable", list(qq_data))
+            theoretical, sample = qq_data[qq_variable]
+            mean, std = table.at[qq_variable, 'Mean'], table.at[qq_variable, 'Std']
+            
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(
+                x=theoretical, 
+                y=sample, 
+                mode='markers', 
+                name='Sample Quantiles',
+                marker_color='blue'
+            ))
+            fig.add_trace(go.Scatter(
+                x=[theoretical[0], theoretical[-1]],
+                y=[mean + std * theoretical[0], mean + std * theoretical[-1]],
+                mode='lines',
+                name='Normal Reference',
+                line=dict(color='red', dash='dash')
+            ))
+            fig.update_layout(
+                title=f'Normal Q-Q Plot of {qq_variable}',
+                xaxis_title='Theoretical Quantiles',
+                yaxis_title='Sample Quantiles'
+            )
+            st.plotly_chart(fig)
+
+    def _bin_count(self, data: np.ndarray) -> int:
+        """
+        Freedman-Diaconis bin count, capped for readability
+        """
+        if len(data) < 2 or data.min() == data.max():
+            return 1
+        q75, q25 = np.percentile(data, [75, 25])
+        width = 2 * (q75 - q25) * len(data) ** (-1 / 3)
+        if width <= 0:
+            return self.settings['max_bins']
+        return int(np.clip(np.ceil((data.max() - data.min()) / width), 1, self.settings['max_bins']))
+
     def _generate_summary_table(self, variable: str):
         """
         Generate summary table with interpretations
         """
         data = self.df[variable]
+        sketch = DataSession.get_sketch(variable)
+        
+        use_sketch = sketch is not None and st.checkbox(
+            "Approximate quantiles (sketch)", 
+            value=len(data) > 1_000_000
+        )
         
         # Statistical metrics
-        metrics = {
-            'Mean': data.mean(),
-            'Median': data.median(),
-            'Standard Deviation': data.std(),
-            'Minimum': data.min(),
-            'Maximum': data.max(),
-            'Range': data.max() - data.min(),
-            'Variance': data.var()
-        }
+        if use_sketch:
+            # Moments are exact, the median comes from the sketch
+            metrics = {
+                'Mean': sketch.mean,
+                'Median': sketch.quantile(0.5),
+                'Standard Deviation': sketch.std,
+                'Minimum': sketch.min,
+                'Maximum': sketch.max,
+                'Range': sketch.max - sketch.min,
+                'Variance': sketch.std ** 2
+            }
+        else:
+            metrics = {
+                'Mean': data.mean(),
+                'Median': data.median(),
+                'Standard Deviation': data.std(),
+                'Minimum': data.min(),
+                'Maximum': data.max(),
+                'Range': data.max() - data.min(),
+                'Variance': data.var()
+            }
         
         # Summary table
         st.subheader("📋 Summary Statistics")
         summary_df = pd.DataFrame.from_dict(metrics, orient='index', columns=['Value'])
         st.dataframe(summary_df)
+        if use_sketch:
+            st.caption(f"Median rank error within ±{100 * sketch.rank_error():.2f}% (99% confidence)")
         
         # Interpretations
         st.subheader("🔍 Interpretation")
@@ -179,6 +398,90 @@ class StatisticalHistogram:
         """
         
         st.info(interpretation)
+        return summary_df, interpretation
+
+    def _generate_capability_analysis(self, variable: str, numeric_columns: List[str]):
+        """
+        Process capability (Cp, Cpk, Pp, Ppk) against specification limits
+        """
+        st.subheader("🎯 Capability Analysis")
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            lsl = st.number_input("LSL", value=None, format="%.4f", key=f"lsl_{variable}")
+        with col2:
+            usl = st.number_input("USL", value=None, format="%.4f", key=f"usl_{variable}")
+        with col3:
+            target = st.number_input("Target", value=None, format="%.4f", key=f"target_{variable}")
+        
+        fit_distributions = st.checkbox(
+            "Fit non-normal distributions (" + ", ".join(CANDIDATE_DISTRIBUTIONS) + ")",
+            value=True
+        )
+        
+        if lsl is None and usl is None:
+            st.info("Enter at least one specification limit to compute capability.")
+        else:
+            results = capability_batch(
+                self.df, 
+                {variable: (lsl, usl, target)}, 
+                fit_distributions=fit_distributions
+            )
+            self._display_capability_results(results)
+        
+        # Batch mode for many characteristics
+        with st.expander("Batch Capability (multiple characteristics)"):
+            specs_df = pd.DataFrame({
+                'Characteristic': numeric_columns,
+                'LSL': [np.nan] * len(numeric_columns),
+                'USL': [np.nan] * len(numeric_columns),
+                'Target': [np.nan] * len(numeric_columns)
+            })
+            edited_specs = st.data_editor(specs_df, disabled=['Characteristic'], hide_index=True)
+            
+            if st.button("Run Batch Capability"):
+                specs = {}
+                for row in edited_specs.itertuples(index=False):
+                    limits = tuple(None if pd.isna(v) else float(v) for v in (row.LSL, row.USL, row.Target))
+                    if limits[0] is not None or limits[1] is not None:
+                        specs[row.Characteristic] = limits
+                
+                if not specs:
+                    st.warning("Enter specification limits for at least one characteristic")
+                    return
+                
+                with st.spinner("Fitting distributions..."):
+                    results = capability_batch(self.df, specs, fit_distributions=fit_distributions)
+                self._display_capability_results(results)
+
+    def _display_capability_results(self, results: pd.DataFrame):
+        """
+        Show capability table with a short interpretation
+        """
+        st.dataframe(results.round(4), hide_index=True)
+        
+        if 'Error' in results.columns:
+            for row in results.dropna(subset=['Error']).itertuples(index=False):
+                st.warning(f"{row.Characteristic}: {row.Error}")
+        if 'Note' in results.columns:
+            for row in results.dropna(subset=['Note']).itertuples(index=False):
+                st.info(f"{row.Characteristic}: {row.Note}")
+        
+        # Interpretation of the least capable characteristic
+        if 'Ppk' not in results.columns:
+            return
+        valid = results.dropna(subset=['Ppk'])
+        if not valid.empty:
+            worst = valid.loc[valid['Ppk'].idxmin()]
+            if worst['Ppk'] >= 1.33:
+                st.success(f"All characteristics are capable (lowest Ppk {worst['Ppk']:.2f}).")
+            elif worst['Ppk'] >= 1.0:
+                st.warning(f"{worst['Characteristic']} is marginally capable (Ppk {worst['Ppk']:.2f}).")
+            else:
+                st.error(
+                    f"{worst['Characteristic']} is not capable (Ppk {worst['Ppk']:.2f}, "
+                    f"expected {worst['Expected PPM']:.0f} PPM, {worst['Distribution']} fit)."
+                )
 
 def histogram():
     """Main function for the Histogram module"""
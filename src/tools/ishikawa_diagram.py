@@ -2,6 +2,8 @@ import streamlit as st
 import graphviz
 import pandas as pd
 
+from src.tools.result_export import export_results
+
 def initialize_session_state():
     """Initializes session state if not present."""
     if 'causes_data' not in st.session_state:
@@ -186,13 +188,11 @@ def ishikawa_page():
                 
             st.dataframe(filtered_df)
             
-            csv = filtered_df.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                "Download Summary (CSV)",
-                csv,
-                "ishikawa_summary.csv",
-                "text/csv",
-                key='download-csv'
+            export_results(
+                {'Ishikawa Summary': filtered_df},
+                'ishikawa_summary',
+                'ishikawa',
+                label="Download Summary"
             )
         else:
             st.info("No data to display in the summary")
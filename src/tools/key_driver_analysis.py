@@ -0,0 +1,180 @@
+import streamlit as st
+import plotly.graph_objects as go
+
+from src.data_management.data_session import DataSession
+from src.utils.key_drivers import key_drivers, default_inputs
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _cached_key_drivers(_df, version, target, inputs, max_rows, repeats, n_estimators):
+    """
+    Key driver ranking cached per dataset version and settings
+    """
+    return key_drivers(_df, target, list(inputs), max_rows=max_rows,
+                       repeats=repeats, n_estimators=n_estimators)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _cached_default_inputs(_df, version, target):
+    """
+    Default inputs (timestamps, serials and IDs left out) per dataset version and target
+    """
+    return default_inputs(_df, target)
+
+class KeyDriverAnalysis:
+    def __init__(self):
+        # Load data from session
+        self.df = st.session_state.get('uploaded_data')
+
+        # Module settings
+        self.settings = {
+            'max_columns': 1000,
+            'max_sample_rows': 100_000,
+            'repeats': 3,
+            'top_drivers': 20
+        }
+
+    def validate_data(self) -> bool:
+        """
+        Comprehensive data validation before analysis
+        """
+        if self.df is None:
+            st.error("⚠️ No data loaded")
+            return False
+
+        try:
+            # Safety checks
+            if len(self.df.columns) > self.settings['max_columns']:
+                st.warning(f"Too many columns. Max {self.settings['max_columns']}")
+                return False
+
+            if len(self.df.columns) < 2:
+                st.warning("At least two columns are required for analysis")
+                return False
+
+            return True
+
+        except Exception as e:
+            st.error(f"Error in data validation: {e}")
+            return False
+
+    def generate_key_driver_analysis(self):
+        """
+        Rank process inputs by their influence on a defect rate or CTQ
+        """
+        st.title("🧭 Key Driver Analysis")
+
+        # Preliminary validations
+        if not self.validate_data():
+            return
+
+        columns = self.df.columns.tolist()
+
+        # Variable selection
+        target = st.selectbox("Output (defect rate, CTQ or defect flag)", columns)
+        inputs = st.multiselect(
+            "Process Inputs",
+            [col for col in columns if col != target],
+            default=_cached_default_inputs(self.df, DataSession.get_version(), target),
+            help="Timestamps, serial numbers and other ID columns are left out by default"
+        )
+
+        # Advanced options
+        with st.expander("Advanced Options"):
+            n_estimators = st.slider("Trees", min_value=50, max_value=500, value=100, step=50)
+            max_rows = st.number_input(
+                "Rows per subsample",
+                min_value=1_000,
+                value=self.settings['max_sample_rows'],
+                step=10_000
+            )
+
+        if not inputs:
+            st.info("Select at least one process input")
+            return
+
+        if st.button("Run Key Driver Analysis"):
+            try:
+                with st.spinner("Fitting tree ensembles..."):
+                    result = _cached_key_drivers(
+                        self.df,
+                        DataSession.get_version(),
+                        target,
+                        tuple(inputs),
+                        int(max_rows),
+                        self.settings['repeats'],
+                        n_estimators
+                    )
+            except Exception as e:
+                st.error(f"Error running key driver analysis: {e}")
+                return
+            # Kept so the result survives reruns triggered by other widgets
+            st.session_state['key_driver_result'] = {
+                'version': DataSession.get_version(),
+                'target': target,
+                'result': result
+            }
+
+        last = st.session_state.get('key_driver_result')
+        if last is None or last['version'] != DataSession.get_version():
+            return
+        self._display_results(last['result'], last['target'])
+
+    def _display_results(self, result, target):
+        """
+        Importance chart, ranking table and interpretation
+        """
+        for column, message in result.attrs.get('failed_inputs', {}).items():
+            st.warning(f"Mutual information could not be computed for {column} ({message})")
+
+        top = result.head(self.settings['top_drivers'])
+
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            y=top['Input'],
+            x=top['Tree Importance'],
+            error_x=dict(type='data', array=top['Tree Importance ±']),
+            orientation='h',
+            name='Tree Importance',
+            marker_color='blue'
+        ))
+        fig.add_trace(go.Bar(
+            y=top['Input'],
+            x=top['Mutual Information'],
+            error_x=dict(type='data', array=top['Mutual Information ±']),
+            orientation='h',
+            name='Mutual Information',
+            marker_color='orange'
+        ))
+        fig.update_layout(
+            title=f'Top Drivers of {target}',
+            barmode='group',
+            yaxis=dict(autorange='reversed'),
+            height=max(400, 28 * len(top))
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+        st.subheader("📋 Driver Ranking")
+        st.dataframe(result.round(4), hide_index=True)
+
+        # Interpretation
+        attrs = result.attrs
+        sampling = (
+            f"{attrs['repeats']} random subsamples of {attrs['rows_used']:,} rows "
+            "(± is the spread across subsamples)"
+            if attrs['repeats'] > 1 else f"all {attrs['rows_used']:,} rows"
+        )
+        st.info(f"""
+        Key Driver Analysis of {target} ({attrs['task']}):
+        - Strongest drivers: {', '.join(result['Input'].head(3).astype(str))}
+        - Computed on {sampling}.
+        - Confirm the top drivers with a scatter plot, stratification or a designed experiment.
+        """)
+
+def key_driver_analysis():
+    """Main function for the Key Driver Analysis module"""
+    analysis = KeyDriverAnalysis()
+    analysis.generate_key_driver_analysis()
+
+# Page configuration
+if __name__ == "__main__":
+    st.set_page_config(page_title="Key Driver Analysis", layout="wide")
+    key_driver_analysis()
@@ -6,9 +6,13 @@ import numpy as np
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Image
 import io
-import base64
+
+from src.utils.rendering import render_figure
+from src.utils.report import table_flowable
+from src.tools.report_builder import add_to_report_button
+from src.tools.result_export import export_results
 
 class ParetoDiagram:
     def __init__(self, df):
@@ -153,32 +157,12 @@ def export_to_pdf(fig, df_pareto, interpretation):
     styles = getSampleStyleSheet()
     elements.append(Paragraph("Pareto Analysis", styles['Title']))
     
-    # Save chart as image
-    img_buffer = io.BytesIO()
-    fig.write_image(img_buffer, format='png')
-    img_buffer.seek(0)
-    
-    # Convert image to base64
-    img_base64 = base64.b64encode(img_buffer.getvalue()).decode()
-    
-    # Add image to PDF
-    img_path = f"data:image/png;base64,{img_base64}"
-    elements.append(Image(img_path, width=500, height=300))
+    # Chart image from the shared renderer
+    img_bytes = render_figure(fig, format='png')
+    elements.append(Image(io.BytesIO(img_bytes), width=500, height=300))
     
-    # Table of data
-    from reportlab.platypus import Table, TableStyle
-    from reportlab.lib import colors
-    
-    table_data = [df_pareto.columns.tolist()] + df_pareto.values.tolist()
-    table = Table(table_data)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.grey),
-        ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
-        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-        ('GRID', (0,0), (-1,-1), 1, colors.black)
-    ]))
-    
-    elements.append(table)
+    # Table of data, paginated and capped for large category counts
+    elements.append(table_flowable(df_pareto, decimals=2))
     
     # Interpretation
     elements.append(Paragraph("Interpretation", styles['Heading2']))
@@ -250,6 +234,20 @@ def lss_tool1_pareto_page():
             file_name="pareto_analysis.pdf",
             mime="application/pdf"
         )
+    
+    export_results(
+        {'Pareto': df_pareto, 'Critical Categories': critical_summary},
+        'pareto_analysis',
+        'pareto'
+    )
+    
+    add_to_report_button(
+        'pareto', 
+        f"Pareto Analysis - {category_column}", 
+        interpretation, 
+        [fig_pareto], 
+        [("Pareto Data", df_pareto), ("Critical Categories", critical_summary)]
+    )
 
 # Function to be called from main.py
 def load_lss_tool1_pareto():
@@ -0,0 +1,104 @@
+import streamlit as st
+import plotly.graph_objects as go
+
+from src.utils.report import make_section, ReportJob
+
+def add_to_report_button(key: str, title: str, text=(), figures=(), tables=()):
+    """
+    "Add to Report" button for a tool; the section replaces any previous one from the same key
+    """
+    if st.button("➕ Add to Report", key=f"add_to_report_{key}"):
+        sections = st.session_state.setdefault('report_sections', {})
+        # Copy the figures so later edits on the page don't change the report
+        sections[key] = make_section(title, text, [go.Figure(fig) for fig in figures], tables)
+        st.success(f"Added '{title}' to the report ({len(sections)} section(s) collected)")
+
+class ReportBuilder:
+    def __init__(self):
+        self.sections = st.session_state.setdefault('report_sections', {})
+
+        # Module settings
+        self.settings = {
+            'poll_seconds': 1,
+            'file_name': 'lss_report.pdf'
+        }
+
+    def _list_sections(self):
+        """
+        Collected sections with a remove button each
+        """
+        st.subheader("📑 Collected Sections")
+        for key, section in list(self.sections.items()):
+            col1, col2 = st.columns([5, 1])
+            with col1:
+                st.write(
+                    f"**{section['title']}** — {len(section['figures'])} chart(s), "
+                    f"{len(section['tables'])} table(s)"
+                )
+            with col2:
+                if st.button("Remove", key=f"remove_section_{key}"):
+                    del self.sections[key]
+                    st.rerun()
+
+    def _start_job(self, title):
+        previous = st.session_state.get('report_job')
+        if previous is not None:
+            previous.discard()
+        st.session_state['report_job'] = ReportJob(list(self.sections.values()), title).start()
+
+    @st.fragment(run_every=1)
+    def _poll_job(self):
+        """
+        Progress of a running build; reruns the page once it finishes
+        """
+        job = st.session_state.get('report_job')
+        if job is None or not job.running:
+            st.rerun()
+        st.progress(job.progress, text="Building report in the background...")
+
+    def _show_job(self):
+        job = st.session_state.get('report_job')
+        if job is None:
+            return
+
+        if job.running:
+            self._poll_job()
+        elif job.status == 'failed':
+            st.error(f"Error building report: {job.error}")
+        else:
+            st.success(f"Report ready ({job.size() / 1024:,.0f} KB)")
+            with open(job.path, 'rb') as report_file:
+                st.download_button(
+                    label="Download PDF Report",
+                    data=report_file,
+                    file_name=self.settings['file_name'],
+                    mime="application/pdf"
+                )
+
+    def render(self):
+        st.title("🗂️ Report Builder")
+
+        if not self.sections:
+            st.info("No sections yet. Use \"➕ Add to Report\" in the Pareto, Control Chart, "
+                    "Histogram, Scatter Plot or Stratification tools.")
+            return
+
+        self._list_sections()
+
+        title = st.text_input("Report Title", "Lean Six Sigma Report")
+        job = st.session_state.get('report_job')
+        if st.button("Build PDF Report", disabled=job is not None and job.running):
+            self._start_job(title)
+            st.rerun()
+
+        self._show_job()
+
+def report_builder():
+    """Main function for the Report Builder module"""
+    builder = ReportBuilder()
+    builder.render()
+
+# Page configuration
+if __name__ == "__main__":
+    st.set_page_config(page_title="Report Builder", layout="wide")
+    report_builder()
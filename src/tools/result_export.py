@@ -0,0 +1,22 @@
+import streamlit as st
+
+from src.utils.export import export_tables, export_file_name, available_formats
+
+def export_results(tables: dict, file_stem: str, key: str, label: str = "Download Results"):
+    """
+    Format selector and download button for a tool's result tables
+
+    The file is only written when the button is clicked.
+    """
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        format = st.selectbox("Export format", available_formats(), key=f"export_format_{key}")
+    file_name, mime = export_file_name(tables, format, file_stem)
+    with col2:
+        st.download_button(
+            label=label,
+            data=lambda: export_tables(tables, format),
+            file_name=file_name,
+            mime=mime,
+            key=f"export_download_{key}"
+        )
@@ -5,9 +5,42 @@ import plotly.express as px
 import plotly.graph_objects as go
 from scipy import stats
 import seaborn as sns
-import matplotlib.pyplot as plt
 from io import BytesIO
-import base64
+from reportlab.lib.pagesizes import letter, landscape
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
+
+from src.data_management.data_session import DataSession
+from src.utils.binning import bin_2d
+from src.utils.rendering import render_figure
+from src.utils.report import paragraph_markup
+from src.tools.report_builder import add_to_report_button
+from src.tools.result_export import export_results
+from src.utils.correlation import correlation_matrix, strongest_pairs, cluster_order
+from src.utils.regression import (
+    iter_chunks, fit_streaming, fit_robust, residual_diagnostics, RegressionAccumulator, GRID_POINTS
+)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _cached_correlation_matrix(_df, version, columns, method):
+    """
+    Correlation matrix cached per dataset version, column set and method
+    """
+    return correlation_matrix(_df, list(columns), method)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _cached_robust_fit(_df, version, x, y, degree):
+    """
+    Huber fit cached per dataset version (it needs several passes over the data)
+    """
+    return fit_robust(lambda: iter_chunks(_df, x, y), degree)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _cached_residual_diagnostics(_df, _model, version, x, y, fit_key):
+    """
+    Residual diagnostics cached per dataset version and fit
+    """
+    return residual_diagnostics(_model, iter_chunks(_df, x, y))
 
 class ScatterPlot:
     def __init__(self):
@@ -16,8 +49,13 @@ class ScatterPlot:
         
         # Module settings
         self.settings = {
-            'max_columns': 20,
-            'max_rows': 10000,
+            'max_columns': 1000,
+            'max_rows': 50_000_000,
+            'max_raw_points': 50_000,
+            'density_bins': 200,
+            'legend_categories': 10,
+            'other_color': 'lightgrey',
+            'top_pairs': 20,
             'valid_data_types': [np.number]
         }
 
@@ -79,6 +117,11 @@ class ScatterPlot:
             st.warning("At least two numeric columns are required for analysis")
             return
         
+        analysis_mode = st.radio("Analysis Mode", ["Pair Scatter", "Correlation Matrix"], horizontal=True)
+        if analysis_mode == "Correlation Matrix":
+            self._generate_correlation_matrix(numeric_columns)
+            return
+        
         # Title and description
         title = st.text_input("Analysis Title", "Scatter Plot")
         description = st.text_area("Description", "Analyzing relationship between variables")
@@ -100,6 +143,18 @@ class ScatterPlot:
             
             size = st.selectbox("Point Size", 
                 ['Fixed', 'Variable'], index=0)
+            
+            render_mode = st.radio("Rendering", ['Auto', 'Density'], horizontal=True,
+                help=f"Auto draws raw WebGL points when at most {self.settings['max_raw_points']:,} "
+                     "points are in view and a density grid otherwise")
+            
+            # Zoom window; narrowing it enough switches Auto back to raw points
+            x_range = self._range_slider(var_x)
+            y_range = self._range_slider(var_y)
+            
+            fit_type = st.selectbox("Regression Fit", 
+                ['None', 'Linear (OLS)', 'Polynomial', 'Robust (Huber)'])
+            degree = st.slider("Polynomial Degree", 2, 5, 2) if fit_type == 'Polynomial' else 1
         
         # Generate plot
         try:
@@ -107,15 +162,27 @@ class ScatterPlot:
                 var_x, 
                 var_y, 
                 color_by if color_by != 'None' else None,
-                size
+                size,
+                x_range,
+                y_range,
+                render_mode
             )
             
+            # Regression overlay
+            model = None
+            if fit_type != 'None':
+                model = self._fit_regression(var_x, var_y, fit_type, degree)
+                self._add_regression_bands(fig, model, x_range)
+            
             # Display plot
             st.plotly_chart(fig, use_container_width=True)
             
             # Statistical analysis
             self._generate_statistical_analysis(var_x, var_y)
             
+            if model is not None:
+                self._generate_regression_analysis(model, var_x, var_y, fit_type, degree)
+            
             # Export button
             self._export_analysis(
                 fig, 
@@ -128,44 +195,177 @@ class ScatterPlot:
         except Exception as e:
             st.error(f"Error generating scatter plot: {e}")
 
-    def _create_scatter_plot(self, x, y, color=None, size='Fixed'):
+    def _range_slider(self, column):
+        """
+        Range slider for a numeric column, using sketch extremes when available
+        """
+        sketch = DataSession.get_sketch(column)
+        if sketch is not None:
+            low, high = float(sketch.min), float(sketch.max)
+        else:
+            low, high = float(self.df[column].min()), float(self.df[column].max())
+        
+        if not low < high:
+            return None
+        
+        selected = st.slider(f"{column} range", low, high, (low, high), key=f"range_{column}")
+        return None if selected == (low, high) else selected
+
+    def _column_values(self, column, mask=None):
+        """
+        Column as a numpy array, restricted to the zoom window when given
+        """
+        values = self.df[column].to_numpy()
+        return values if mask is None else values[mask]
+
+    def _view_mask(self, x, y, x_range=None, y_range=None):
+        """
+        Boolean mask of rows inside the zoom window (None means all rows)
+        """
+        mask = None
+        for column, value_range in ((x, x_range), (y, y_range)):
+            if value_range is not None:
+                inside = self.df[column].between(*value_range).to_numpy()
+                mask = inside if mask is None else mask & inside
+        return mask
+
+    def _create_density_plot(self, x, y, color=None, x_range=None, y_range=None):
+        """
+        Server-side 2D binned view; only the grid is sent to the browser
+        """
+        weights = None
+        if color and pd.api.types.is_numeric_dtype(self.df[color]):
+            weights = self.df[color].to_numpy()
+        
+        grid = bin_2d(
+            self.df[x].to_numpy(), 
+            self.df[y].to_numpy(), 
+            bins=self.settings['density_bins'], 
+            x_range=x_range, 
+            y_range=y_range, 
+            weights=weights
+        )
+        
+        x_centers = (grid['x_edges'][:-1] + grid['x_edges'][1:]) / 2
+        y_centers = (grid['y_edges'][:-1] + grid['y_edges'][1:]) / 2
+        counts = grid['counts'].astype(float)
+        counts[counts == 0] = np.nan
+        
+        if weights is not None:
+            z, colorbar_title = grid['means'], f'Mean {color}'
+        else:
+            z, colorbar_title = counts, 'Count'
+        
+        fig = go.Figure(go.Heatmap(
+            x=x_centers,
+            y=y_centers,
+            z=z,
+            customdata=counts,
+            colorscale='Viridis',
+            colorbar=dict(title=colorbar_title),
+            hovertemplate=f'{x}: %{{x:.3g}}<br>{y}: %{{y:.3g}}<br>{colorbar_title}: %{{z:.3g}}'
+                          '<br>Points: %{customdata}<extra></extra>'
+        ))
+        fig.update_layout(
+            title=f'Scatter Density: {x} vs {y} ({grid["points"]:,} points)',
+            xaxis_title=x,
+            yaxis_title=y
+        )
+        return fig
+
+    def _create_scatter_plot(self, x, y, color=None, size='Fixed', x_range=None, y_range=None,
+                             render_mode='Auto'):
         """
         Create an interactive scatter plot
+        
+        Large views are drawn as a density grid; small ones as raw WebGL points.
         """
-        # Prepare data
-        data = self.df[[x, y]]
-        if color:
-            data[color] = self.df[color]
+        mask = self._view_mask(x, y, x_range, y_range)
+        points_in_view = len(self.df) if mask is None else int(mask.sum())
+        
+        if render_mode == 'Density' or points_in_view > self.settings['max_raw_points']:
+            return self._create_density_plot(x, y, color, x_range, y_range)
+        
+        # Column arrays only; no intermediate DataFrame is built or written to
+        x_values = self._column_values(x, mask)
+        y_values = self._column_values(y, mask)
         
         # Size configuration
         if size == 'Fixed':
             point_size = 8
         else:
             # Normalize size based on another numeric variable
-            point_size = self.df[x] / self.df[x].max() * 20
+            x_min, x_max = np.nanmin(x_values), np.nanmax(x_values)
+            point_size = np.nan_to_num((x_values - x_min) / ((x_max - x_min) or 1) * 18 + 2, nan=2)
+        
+        fig = go.Figure()
+        marker = dict(size=point_size)
+        customdata = None
+        hovertemplate = f'{x}: %{{x}}<br>{y}: %{{y}}'
+        
+        if color and pd.api.types.is_numeric_dtype(self.df[color]):
+            # Continuous colour scale on a single trace
+            color_values = self._column_values(color, mask)
+            marker.update(color=color_values, colorscale='Viridis', showscale=True,
+                          colorbar=dict(title=color))
+            customdata = color_values
+            hovertemplate += f'<br>{color}: %{{customdata}}'
+        elif color:
+            # Integer category codes mapped to a palette in one trace
+            codes, categories = pd.factorize(self._column_values(color, mask), use_na_sentinel=True)
+            top_codes = np.argsort(-np.bincount(codes[codes >= 0], minlength=len(categories)), kind='stable')
+            top_codes = top_codes[:self.settings['legend_categories']]
+            
+            palette = px.colors.qualitative.Plotly
+            level_colors = [palette[i % len(palette)] for i in range(len(top_codes))]
+            level_colors.append(self.settings['other_color'])
+            
+            # Code -> colour level; the NA sentinel -1 picks the last slot, which stays "other"
+            code_levels = np.full(len(categories) + 1, len(top_codes), dtype=np.int64)
+            code_levels[top_codes] = np.arange(len(top_codes))
+            
+            # Numeric levels with a stepped colour scale keep the trace light to serialise
+            n_levels = len(level_colors)
+            colorscale = []
+            for i, level_color in enumerate(level_colors):
+                colorscale += [[i / n_levels, level_color], [(i + 1) / n_levels, level_color]]
+            marker.update(color=code_levels[codes], colorscale=colorscale, 
+                          cmin=-0.5, cmax=n_levels - 0.5, showscale=False)
+            
+            labels = np.append(np.asarray(categories, dtype=object), 'Missing')
+            customdata = labels[codes]
+            hovertemplate += f'<br>{color}: %{{customdata}}'
+            
+            # Legend-only entries for the most frequent categories
+            for i, code in enumerate(top_codes):
+                fig.add_trace(go.Scattergl(
+                    x=[None], y=[None], mode='markers', name=str(categories[code]),
+                    marker=dict(color=level_colors[i], size=8)
+                ))
+            if len(categories) > len(top_codes):
+                fig.add_trace(go.Scattergl(
+                    x=[None], y=[None], mode='markers', 
+                    name=f'Other ({len(categories) - len(top_codes)} categories)',
+                    marker=dict(color=self.settings['other_color'], size=8)
+                ))
         
         # Create figure
-        if color:
-            fig = px.scatter(
-                data, 
-                x=x, 
-                y=y, 
-                color=color,
-                title=f'Scatter Plot: {x} vs {y}',
-                labels={x: x, y: y},
-                hover_data=data.columns
-            )
-        else:
-            fig = px.scatter(
-                data, 
-                x=x, 
-                y=y, 
-                title=f'Scatter Plot: {x} vs {y}',
-                labels={x: x, y: y}
-            )
+        fig.add_trace(go.Scattergl(
+            x=x_values,
+            y=y_values,
+            mode='markers',
+            marker=marker,
+            customdata=customdata,
+            hovertemplate=hovertemplate + '<extra></extra>',
+            showlegend=False
+        ))
+        fig.update_layout(
+            title=f'Scatter Plot: {x} vs {y}',
+            xaxis_title=x,
+            yaxis_title=y
+        )
         
         # Customization
-        fig.update_traces(marker=dict(size=point_size))
         fig.update_layout(
             hoverlabel=dict(
                 bgcolor="white",
@@ -201,6 +401,155 @@ class ScatterPlot:
         interpretation = self._interpret_correlation(correlation)
         st.info(interpretation)
 
+    def _generate_correlation_matrix(self, numeric_columns):
+        """
+        Pearson/Spearman matrix for all numeric columns with ranked pairs
+        """
+        st.subheader("🧮 Correlation Matrix")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            method = st.radio("Method", ['pearson', 'spearman'], horizontal=True,
+                format_func=str.capitalize)
+        with col2:
+            target = st.selectbox("Rank pairs against", ['All pairs'] + numeric_columns)
+        
+        try:
+            with st.spinner("Computing correlations..."):
+                result = _cached_correlation_matrix(
+                    self.df, 
+                    DataSession.get_version(), 
+                    tuple(numeric_columns), 
+                    method
+                )
+        except Exception as e:
+            st.error(f"Error computing correlation matrix: {e}")
+            return
+        
+        # Clustered heatmap
+        order = cluster_order(result['r'])
+        r = result['r'].loc[order, order]
+        fig = go.Figure(go.Heatmap(
+            x=order,
+            y=order,
+            z=r.to_numpy(),
+            zmin=-1,
+            zmax=1,
+            colorscale='RdBu_r',
+            colorbar=dict(title='r'),
+            hovertemplate='%{y} vs %{x}<br>r = %{z:.3f}<extra></extra>'
+        ))
+        fig.update_layout(
+            title=f'{method.capitalize()} Correlation (clustered)',
+            height=max(500, 12 * len(order)),
+            yaxis=dict(autorange='reversed')
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        
+        # Strongest pairs
+        st.subheader("🔗 Strongest Relationships")
+        pairs = strongest_pairs(
+            result, 
+            limit=self.settings['top_pairs'], 
+            target=None if target == 'All pairs' else target
+        )
+        st.dataframe(pairs.round(4), hide_index=True)
+        st.caption("p-values from a t-test on r with pairwise-complete observations (N).")
+        
+        export_results(
+            {
+                'Correlation r': result['r'].rename_axis('Variable'),
+                'p-values': result['p'].rename_axis('Variable'),
+                'Pairwise N': result['n'].rename_axis('Variable'),
+                'Strongest Pairs': pairs
+            },
+            f'correlation_{method}',
+            'correlation_matrix'
+        )
+
+    def _fit_regression(self, x, y, fit_type, degree):
+        """
+        Fit from sufficient statistics, extended incrementally on appended rows
+        """
+        if fit_type == 'Robust (Huber)':
+            return _cached_robust_fit(self.df, DataSession.get_version(), x, y, degree)
+        
+        # Least-squares accumulators survive appends to the same dataset
+        fits = st.session_state.setdefault('regression_fits', {})
+        key = (DataSession.get_lineage(), x, y, degree)
+        model = fits.get(key)
+        if model is None or model.rows_seen > len(self.df):
+            model = RegressionAccumulator(degree)
+        
+        if model.rows_seen < len(self.df):
+            model = fit_streaming(iter_chunks(self.df, x, y, start=model.rows_seen), degree, model)
+            fits[key] = model
+        return model
+
+    def _add_regression_bands(self, fig, model, x_range=None):
+        """
+        Fitted curve with 95% confidence and prediction bands on a fixed x-grid
+        """
+        low, high = x_range if x_range is not None else (model.x_min, model.x_max)
+        bands = model.predict_bands(np.linspace(low, high, GRID_POINTS))
+        
+        for lower, upper, name, fill in (
+            ('pi_lower', 'pi_upper', '95% Prediction Band', 'rgba(255, 165, 0, 0.15)'),
+            ('ci_lower', 'ci_upper', '95% Confidence Band', 'rgba(255, 0, 0, 0.25)')
+        ):
+            fig.add_trace(go.Scatter(
+                x=bands['x'], y=bands[lower], mode='lines', line=dict(width=0),
+                showlegend=False, hoverinfo='skip'
+            ))
+            fig.add_trace(go.Scatter(
+                x=bands['x'], y=bands[upper], mode='lines', line=dict(width=0),
+                fill='tonexty', fillcolor=fill, name=name, hoverinfo='skip'
+            ))
+        
+        fig.add_trace(go.Scatter(
+            x=bands['x'], y=bands['fit'], mode='lines', name='Fit',
+            line=dict(color='red', width=2)
+        ))
+
+    def _generate_regression_analysis(self, model, x, y, fit_type, degree):
+        """
+        Fit summary and residual diagnostics
+        """
+        st.subheader("📐 Regression Analysis")
+        summary = model.summary()
+        diagnostics = _cached_residual_diagnostics(
+            self.df, model, DataSession.get_version(), x, y, (fit_type, degree, model.rows_seen)
+        )
+        
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("R²", f"{summary['R²']:.3f}")
+        col2.metric("RMSE", f"{summary['RMSE']:.3g}")
+        col3.metric("Durbin-Watson", f"{diagnostics['Durbin-Watson']:.2f}")
+        col4.metric("Beyond ±3 RMSE", f"{100 * diagnostics['Share beyond ±3 RMSE']:.2f}%")
+        
+        st.write(f"**{fit_type}:** `{model.equation(x, y)}` (N = {summary['N']:,})")
+        if fit_type == 'Robust (Huber)':
+            st.caption("R² and RMSE of the robust fit are computed with the final Huber weights.")
+        
+        if diagnostics['Durbin-Watson'] < 1.5 or diagnostics['Durbin-Watson'] > 2.5:
+            st.warning("Residuals are autocorrelated; observations may not be independent.")
+        
+        # Residuals vs fitted from a systematic sample
+        fig = go.Figure(go.Scattergl(
+            x=diagnostics['fitted'], 
+            y=diagnostics['residual'], 
+            mode='markers',
+            marker=dict(size=4, color='blue', opacity=0.5)
+        ))
+        fig.add_hline(y=0, line_dash='dash', line_color='red')
+        fig.update_layout(
+            title='Residuals vs Fitted (sample)',
+            xaxis_title='Fitted',
+            yaxis_title='Residual',
+            height=350
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
     def _interpret_correlation(self, correlation):
         """
         Interpret the correlation value
@@ -220,26 +569,27 @@ class ScatterPlot:
         
         # Export as PDF
         if st.button("Export Analysis"):
-            # Create PDF buffer
+            # Chart image from the shared renderer, laid out straight into the PDF
+            img_bytes = render_figure(fig, format='png')
+
             pdf_buffer = BytesIO()
+            styles = getSampleStyleSheet()
+            doc = SimpleDocTemplate(pdf_buffer, pagesize=landscape(letter))
+            doc.build([
+                Paragraph(paragraph_markup(title), styles['Title']),
+                Paragraph(paragraph_markup(description), styles['Normal']),
+                Spacer(1, 12),
+                Image(BytesIO(img_bytes), width=600, height=360)
+            ])
             
-            # Convert Plotly figure to image
-            img_bytes = fig.to_image(format='png')
-            
-            # Create PDF using matplotlib
-            plt.figure(figsize=(10, 6))
-            plt.title(title)
-            plt.imshow(plt.imread(BytesIO(img_bytes)))
-            plt.axis('off')
-            
-            # Save PDF
-            plt.savefig(pdf_buffer, format='pdf', bbox_inches='tight')
-            pdf_buffer.seek(0)
-            
-            # Generate download link
-            b64 = base64.b64encode(pdf_buffer.getvalue()).decode()
-            href = f'<a href="data:application/pdf;base64,{b64}" download="scatter_analysis.pdf">Download Analysis</a>'
-            st.markdown(href, unsafe_allow_html=True)
+            st.download_button(
+                label="Download Analysis",
+                data=pdf_buffer.getvalue(),
+                file_name="scatter_analysis.pdf",
+                mime="application/pdf"
+            )
+        
+        add_to_report_button('scatter', title, [description], [fig])
 
 def scatter_plot():
     """Main function for the Scatter Plot module"""
@@ -3,10 +3,143 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-import matplotlib.pyplot as plt
 from io import BytesIO
-import base64
 import seaborn as sns
+from reportlab.lib.pagesizes import letter, landscape
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, Image
+
+from src.data_management.data_session import DataSession
+from src.utils.grouped_stats import (
+    grouped_summary, build_cube, rollup_cube, strata_tests, tukey_hsd,
+    top_n_strata, rank_strata
+)
+from src.utils.rendering import render_figures
+from src.utils.report import paragraph_markup
+from src.tools.report_builder import add_to_report_button
+from src.tools.result_export import export_results
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _cached_cube(_df, version, factors, value):
+    """
+    Aggregate cube cached per dataset version, factor set and variable
+    """
+    return build_cube(_df, list(factors), value)
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _cached_summary(_df, version, categorical_var, numeric_var):
+    """
+    Per-stratum summary and outlier sample cached per dataset version and variables
+    """
+    return grouped_summary(_df[categorical_var], _df[numeric_var])
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_top_strata(_df, version, categorical_var, numeric_var, top_n, rank_by):
+    """
+    Top-N strata with the rest merged, their outliers and the ranked summary,
+    derived from the cached summary (no pass over the rows)
+    """
+    group_stats, outlier_sample = _cached_summary(_df, version, categorical_var, numeric_var)
+    display_stats, n_other = top_n_strata(group_stats, top_n, rank_by)
+    # The merged row has no quartiles, so the boxplot shows the top strata only
+    box_stats = display_stats.iloc[:-1] if n_other else display_stats
+    shown_outliers = outlier_sample[outlier_sample['group'].isin(box_stats.index)]
+    summary = rank_strata(group_stats, rank_by)[
+        ['count', 'mean', 'median', 'min', 'max', 'std', 'q1', 'q3', 'outliers']
+    ]
+    return display_stats, n_other, box_stats, shown_outliers, summary
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _cached_strata_tests(_df, version, categorical_var, responses):
+    """
+    ANOVA / Kruskal-Wallis tests cached per dataset version and responses
+    """
+    return strata_tests(_df[categorical_var], _df[list(responses)])
+
+def multi_factor_stratification(df, categorical_columns, numeric_columns):
+    """
+    Two- and three-way stratification read from a cached aggregate cube
+    """
+    factors = st.multiselect(
+        "Factors (2-3, in display order)", 
+        categorical_columns, 
+        default=categorical_columns[:2],
+        max_selections=3
+    )
+    numeric_var = st.selectbox("Numeric Variable", numeric_columns, key='multi_factor_numeric')
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        metric = st.radio("Metric", ['mean', 'count', 'std', 'min', 'max'], horizontal=True)
+    with col2:
+        view = st.radio("View", ['Heatmap', 'Faceted Bars'], horizontal=True)
+    
+    if len(factors) < 2:
+        st.warning("Select at least two categorical factors")
+        return
+    
+    try:
+        # The cube key ignores factor order, so reordering reuses it
+        cube = _cached_cube(df, DataSession.get_version(), tuple(sorted(factors)), numeric_var)
+        table = rollup_cube(cube, factors)
+        
+        if view == 'Heatmap':
+            heat_factors = factors[:2]
+            if len(factors) == 3:
+                levels = ['All'] + table.index.get_level_values(factors[2]).unique().tolist()
+                level = st.selectbox(f"{factors[2]} slice", levels)
+                if level == 'All':
+                    heat_table = rollup_cube(cube, heat_factors)
+                else:
+                    heat_table = table.xs(level, level=factors[2])
+            else:
+                heat_table = table
+            
+            grid = heat_table[metric].unstack(heat_factors[1])
+            fig = go.Figure(go.Heatmap(
+                x=grid.columns.astype(str),
+                y=grid.index.astype(str),
+                z=grid.to_numpy(),
+                colorscale='Viridis',
+                colorbar=dict(title=metric),
+                hovertemplate=f'{heat_factors[0]}: %{{y}}<br>{heat_factors[1]}: %{{x}}<br>{metric}: %{{z:.3g}}<extra></extra>'
+            ))
+            fig.update_layout(
+                title=f'{metric.capitalize()} of {numeric_var} by {" × ".join(heat_factors)}',
+                xaxis_title=heat_factors[1],
+                yaxis_title=heat_factors[0]
+            )
+        else:
+            plot_data = table.reset_index()
+            for factor in factors:
+                plot_data[factor] = plot_data[factor].astype(str)
+            fig = px.bar(
+                plot_data,
+                x=factors[0],
+                y=metric,
+                color=factors[1],
+                facet_col=factors[2] if len(factors) == 3 else None,
+                facet_col_wrap=4,
+                barmode='group',
+                title=f'{metric.capitalize()} of {numeric_var} by {" × ".join(factors)}'
+            )
+        
+        st.plotly_chart(fig, use_container_width=True)
+        
+        st.subheader("📊 Summary Table")
+        st.dataframe(table.round(2))
+        
+        # Interpretation
+        best = table['mean'].idxmax()
+        st.info(f"""
+        Multi-factor Stratification of {numeric_var} by {' × '.join(factors)}:
+        
+        - Populated combinations: {len(table)}
+        - Highest concentration: {table['count'].idxmax()}
+        - Highest average: {best}
+        """)
+    except Exception as e:
+        st.error(f"Error generating multi-factor stratification: {e}")
 
 def stratification_analysis():
     """
@@ -24,7 +157,8 @@ def stratification_analysis():
     
     # Module settings
     max_columns = 20
-    max_rows = 10000
+    max_rows = 50_000_000
+    page_size = 50
     
     # Safety checks
     if len(df.columns) > max_columns:
@@ -43,6 +177,14 @@ def stratification_analysis():
     title = st.text_input("Analysis Title", "Stratification Analysis")
     description = st.text_area("Description", "Detailed stratification analysis of data")
     
+    mode = st.radio("Stratification Mode", ["Single Factor", "Multi-Factor"], horizontal=True)
+    if mode == "Multi-Factor":
+        if not categorical_columns or not numeric_columns:
+            st.warning("Categorical and numeric variables are required for analysis")
+            return
+        multi_factor_stratification(df, categorical_columns, numeric_columns)
+        return
+    
     # Variable selection
     col1, col2 = st.columns(2)
     
@@ -61,16 +203,54 @@ def stratification_analysis():
     
     # Generate visualizations
     try:
-        # Boxplot
-        fig1 = px.box(
-            df, 
-            x=categorical_var, 
-            y=numeric_var,
-            title=f'Distribution of {numeric_var} by {categorical_var}'
+        version = DataSession.get_version()
+        
+        # High-cardinality variables: show the top N strata and an "Other" bucket
+        col1, col2 = st.columns(2)
+        with col1:
+            top_n = st.number_input("Strata to display (top N)", min_value=2, max_value=200, value=20)
+        with col2:
+            rank_by = st.radio("Rank strata by", ['count', 'effect'], horizontal=True,
+                format_func=lambda option: 'Count' if option == 'count' else 'Effect size')
+        
+        # Every per-stratum statistic comes from one cached grouped pass
+        display_stats, n_other, box_stats, shown_outliers, summary = _cached_top_strata(
+            df, version, categorical_var, numeric_var, int(top_n), rank_by
+        )
+        if n_other:
+            st.caption(f"{n_other} smaller strata are combined into '{display_stats.index[-1]}'.")
+        
+        # Boxplot drawn from the precomputed quartiles and whiskers (top strata only)
+        fig1 = go.Figure()
+        fig1.add_trace(go.Box(
+            x=box_stats.index.astype(str),
+            q1=box_stats['q1'],
+            median=box_stats['median'],
+            q3=box_stats['q3'],
+            lowerfence=box_stats['lower_whisker'],
+            upperfence=box_stats['upper_whisker'],
+            mean=box_stats['mean'],
+            name=numeric_var,
+            marker_color='blue',
+            boxpoints=False
+        ))
+        fig1.add_trace(go.Scatter(
+            x=shown_outliers['group'].astype(str),
+            y=shown_outliers['value'],
+            mode='markers',
+            name='Outliers (sample)',
+            marker=dict(color='blue', size=4, opacity=0.6)
+        ))
+        fig1.update_layout(
+            title=f'Distribution of {numeric_var} by {categorical_var}',
+            xaxis_title=categorical_var,
+            yaxis_title=numeric_var,
+            showlegend=False
         )
         
         # Bar chart with aggregation
-        aggregated_data = df.groupby(categorical_var)[numeric_var].agg(['mean', 'count']).reset_index()
+        aggregated_data = display_stats[['mean', 'count']].rename_axis(categorical_var).reset_index()
+        aggregated_data[categorical_var] = aggregated_data[categorical_var].astype(str)
         
         fig2 = go.Figure()
         fig2.add_trace(go.Bar(
@@ -109,52 +289,92 @@ def stratification_analysis():
         
         # Summary table
         st.subheader("📊 Summary Table")
-        summary = df.groupby(categorical_var)[numeric_var].agg([
-            'count', 'mean', 'median', 'min', 'max', 'std'
-        ]).round(2)
-        st.dataframe(summary)
+        # Paginated view of the aggregated result
+        n_pages = max(int(np.ceil(len(summary) / page_size)), 1)
+        page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1) if n_pages > 1 else 1
+        st.dataframe(summary.iloc[(page - 1) * page_size:page * page_size].round(2))
+        
+        # Overall reference quantiles from the ingestion sketch
+        sketch = DataSession.get_sketch(numeric_var)
+        if sketch is not None:
+            q1, median, q3 = sketch.quantile([0.25, 0.5, 0.75])
+            st.caption(
+                f"All strata: median ≈ {median:.2f}, IQR ≈ [{q1:.2f}, {q3:.2f}] "
+                f"(rank error ±{100 * sketch.rank_error():.2f}%)"
+            )
+        
+        # Tests of differences between strata
+        st.subheader("🧪 Do the Strata Differ?")
+        responses = st.multiselect(
+            "Responses to test", 
+            numeric_columns, 
+            default=[numeric_var]
+        )
+        test_results = _cached_strata_tests(df, version, categorical_var, tuple(responses or [numeric_var]))
+        st.dataframe(test_results)
+        
+        # Pairwise comparisons grow quadratically, so they cover the displayed strata
+        tukey = tukey_hsd(box_stats)
+        with st.expander(f"Tukey HSD pairwise comparisons for {numeric_var} (displayed strata)"):
+            st.dataframe(tukey.round(4), hide_index=True)
+            st.caption("Exact p-values are shown for the strongest pairs; all pairs are flagged against the 5% critical value.")
         
         # Interpretation of results
         st.subheader("🔍 Results Interpretation")
+        anova_p = test_results.loc[numeric_var, 'ANOVA p-value'] if numeric_var in test_results.index else np.nan
+        kruskal_p = test_results.loc[numeric_var, 'Kruskal-Wallis p-value'] if numeric_var in test_results.index else np.nan
         interpretation = f"""
         Stratification Analysis of {numeric_var} by {categorical_var}:
         
         - Identified Categories: {len(summary)} 
-        - Distribution:
-        {summary.to_string()}
+        - Distribution (top strata):
+        {display_stats[['count', 'mean', 'std']].head(5).round(2).to_string()}
         
         Key Observations:
         - Highest concentration: {summary['count'].idxmax()} 
         - Highest average: {summary['mean'].idxmax()}
+        - Strata differences: ANOVA p = {anova_p:.4g}, Kruskal-Wallis p = {kruskal_p:.4g}
+        - Significantly different pairs (Tukey HSD): {int(tukey['Significant'].sum())} of {len(tukey)}
         """
         st.info(interpretation)
         
         # Export results
         st.subheader("📥 Export Analysis")
         if st.button("Export Analysis"):
-            # Export logic similar to previous versions
-            plt.figure(figsize=(15, 10))
-            plt.suptitle(title, fontsize=16)
-            
-            # Add charts to PDF
-            plt.subplot(1, 2, 1)
-            img_bytes1 = fig1.to_image(format='png')
-            plt.imshow(plt.imread(BytesIO(img_bytes1)))
-            plt.axis('off')
-            
-            plt.subplot(1, 2, 2)
-            img_bytes2 = fig2.to_image(format='png')
-            plt.imshow(plt.imread(BytesIO(img_bytes2)))
-            plt.axis('off')
-            
-            # Save and generate download link
+            # Both charts rendered concurrently by the shared renderer
+            img_bytes1, img_bytes2 = render_figures([fig1, fig2], format='png')
+
             pdf_buffer = BytesIO()
-            plt.savefig(pdf_buffer, format='pdf', bbox_inches='tight')
-            pdf_buffer.seek(0)
+            styles = getSampleStyleSheet()
+            doc = SimpleDocTemplate(pdf_buffer, pagesize=landscape(letter))
+            doc.build([
+                Paragraph(paragraph_markup(title), styles['Title']),
+                Table([[
+                    Image(BytesIO(img_bytes1), width=340, height=240),
+                    Image(BytesIO(img_bytes2), width=340, height=240)
+                ]])
+            ])
             
-            b64 = base64.b64encode(pdf_buffer.getvalue()).decode()
-            href = f'<a href="application/pdf;base64,{b64}" download="stratification_analysis.pdf">Download Analysis</a>'
-            st.markdown(href, unsafe_allow_html=True)
+            st.download_button(
+                label="Download Analysis",
+                data=pdf_buffer.getvalue(),
+                file_name="stratification_analysis.pdf",
+                mime="application/pdf"
+            )
+        
+        export_results(
+            {'Strata Summary': summary, 'Strata Tests': test_results, 'Tukey HSD': tukey},
+            f"stratification_{numeric_var}_by_{categorical_var}",
+            'stratification'
+        )
+        
+        add_to_report_button(
+            'stratification', 
+            title, 
+            [interpretation], 
+            [fig1, fig2], 
+            [("Strata Summary", display_stats[['count', 'mean', 'median', 'std', 'min', 'max']])]
+        )
         
     except Exception as e:
         st.error(f"Error generating stratification analysis: {e}")
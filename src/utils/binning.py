@@ -0,0 +1,376 @@
+import numpy as np
+import pandas as pd
+
+# Rows processed per block so intermediate arrays stay cache- and memory-friendly
+CHUNK_ROWS = 500_000
+
+# Flag thresholds for the histogram grid
+SKEW_THRESHOLD = 1.0
+OUTLIER_THRESHOLD = 0.01
+
+
+def column_ranges(df: pd.DataFrame, columns, sketches=None) -> np.ndarray:
+    """
+    (min, max) per column, taken from ingestion sketches when available
+    """
+    sketches = sketches or {}
+    if all(column in sketches for column in columns):
+        return np.array([[sketches[c].min, sketches[c].max] for c in columns], dtype=float)
+
+    values = df[columns].to_numpy(dtype=float)
+    return np.column_stack([np.nanmin(values, axis=0), np.nanmax(values, axis=0)])
+
+
+def bin_columns(df: pd.DataFrame, columns, bins: int = 30, ranges=None) -> dict:
+    """
+    Histogram every column in one pass over the rows
+
+    Each block of rows is binned for all columns at once with per-column
+    edges and a single bincount; the same pass accumulates the power sums
+    needed for skewness. Returns counts (p x bins), edges (p x bins+1) and
+    per-column statistics.
+    """
+    columns = list(columns)
+    p = len(columns)
+    if ranges is None:
+        ranges = column_ranges(df, columns)
+
+    low = ranges[:, 0]
+    span = ranges[:, 1] - low
+    span[~(span > 0)] = 1.0
+
+    # Power sums are taken around the range midpoint for numerical stability
+    center = low + span / 2
+    counts = np.zeros(p * bins, dtype=np.int64)
+    n = np.zeros(p)
+    sums = np.zeros((3, p))
+    offsets = np.arange(p) * bins
+
+    frame = df[columns]
+    for start in range(0, len(df), CHUNK_ROWS):
+        block = frame.iloc[start:start + CHUNK_ROWS].to_numpy(dtype=float)
+        valid = np.isfinite(block)
+        complete = bool(valid.all())
+
+        # Bin indices computed in place to avoid block-sized temporaries
+        index = block - low
+        index /= span
+        index *= bins
+        np.floor(index, out=index)
+        if not complete:
+            index[~valid] = 0
+        np.clip(index, 0, bins - 1, out=index)
+        index = index.astype(np.int64)
+        index += offsets
+        counts += np.bincount(index.ravel() if complete else index[valid], minlength=p * bins)
+
+        centered = block - center
+        if not complete:
+            centered[~valid] = 0.0
+        n += valid.sum(axis=0)
+        sums[0] += centered.sum(axis=0)
+        # Products, not float powers: ** 3 takes numpy's slow pow path
+        squared = centered * centered
+        sums[1] += squared.sum(axis=0)
+        sums[2] += (squared * centered).sum(axis=0)
+
+    counts = counts.reshape(p, bins)
+    edges = low[:, None] + span[:, None] * np.linspace(0, 1, bins + 1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        raw = sums / n
+        shift = raw[0]
+        variance = raw[1] - shift ** 2
+        third = raw[2] - 3 * shift * raw[1] + 2 * shift ** 3
+        skewness = third / variance ** 1.5
+        std = np.sqrt(variance * n / (n - 1))
+
+    q1, q3 = binned_quantiles(counts, edges, 0.25), binned_quantiles(counts, edges, 0.75)
+    iqr = q3 - q1
+    centers = (edges[:, :-1] + edges[:, 1:]) / 2
+    outside = (centers < (q1 - 1.5 * iqr)[:, None]) | (centers > (q3 + 1.5 * iqr)[:, None])
+    outlier_share = np.where(n > 0, (counts * outside).sum(axis=1) / np.maximum(n, 1), 0.0)
+
+    stats = pd.DataFrame({
+        'count': n.astype(np.int64),
+        'mean': center + shift,
+        'std': std,
+        'skewness': skewness,
+        'outlier share': outlier_share
+    }, index=columns)
+    stats['skewed'] = stats['skewness'].abs() > SKEW_THRESHOLD
+    stats['outliers'] = stats['outlier share'] > OUTLIER_THRESHOLD
+
+    return {'counts': counts, 'edges': edges, 'stats': stats}
+
+
+def binned_quantiles(counts: np.ndarray, edges: np.ndarray, q: float) -> np.ndarray:
+    """
+    Quantile per row of a histogram table, interpolated inside the bin
+    """
+    cumulative = np.cumsum(counts, axis=1)
+    total = cumulative[:, -1]
+    target = q * total
+    index = np.minimum((cumulative < target[:, None]).sum(axis=1), counts.shape[1] - 1)
+
+    rows = np.arange(len(counts))
+    before = np.where(index > 0, cumulative[rows, np.maximum(index - 1, 0)], 0)
+    in_bin = np.maximum(counts[rows, index], 1)
+    fraction = np.clip((target - before) / in_bin, 0, 1)
+    return edges[rows, index] + fraction * (edges[rows, index + 1] - edges[rows, index])
+
+
+def bin_2d(x, y, bins: int = 200, x_range=None, y_range=None, weights=None) -> dict:
+    """
+    2D histogram of (x, y) on a regular grid, optionally with per-bin means
+
+    Points outside the given ranges are dropped, so the same function serves
+    zoomed views. counts and means are (bins x bins) with rows along y.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = np.isfinite(x) & np.isfinite(y)
+    if weights is not None:
+        weights = np.asarray(weights, dtype=float)
+        valid &= np.isfinite(weights)
+
+    if x_range is None:
+        x_range = (np.min(x[valid]), np.max(x[valid])) if valid.any() else (0.0, 1.0)
+    if y_range is None:
+        y_range = (np.min(y[valid]), np.max(y[valid])) if valid.any() else (0.0, 1.0)
+
+    valid &= (x >= x_range[0]) & (x <= x_range[1]) & (y >= y_range[0]) & (y <= y_range[1])
+    x_span = (x_range[1] - x_range[0]) or 1.0
+    y_span = (y_range[1] - y_range[0]) or 1.0
+
+    ix = np.clip(((x[valid] - x_range[0]) / x_span * bins).astype(np.int64), 0, bins - 1)
+    iy = np.clip(((y[valid] - y_range[0]) / y_span * bins).astype(np.int64), 0, bins - 1)
+    flat = iy * bins + ix
+
+    counts = np.bincount(flat, minlength=bins * bins).reshape(bins, bins)
+    means = None
+    if weights is not None:
+        totals = np.bincount(flat, weights=weights[valid], minlength=bins * bins).reshape(bins, bins)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(counts > 0, totals / counts, np.nan)
+
+    return {
+        'x_edges': x_range[0] + x_span * np.linspace(0, 1, bins + 1),
+        'y_edges': y_range[0] + y_span * np.linspace(0, 1, bins + 1),
+        'counts': counts,
+        'means': means,
+        'points': int(valid.sum())
+    }
+
+
+def min_max_downsample(values, buckets: int = 1000) -> tuple:
+    """
+    Line-chart downsampling keeping the min and max of each bucket of rows
+
+    Returns (row positions, values) in row order, at most 2 x buckets points,
+    so spikes and dips survive while the browser draws a few thousand points
+    instead of millions. Short series are returned unchanged.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n <= 2 * buckets:
+        positions = np.arange(n)
+        keep = np.isfinite(values)
+        return positions[keep], values[keep]
+
+    size = int(np.ceil(n / buckets))
+    padded = np.full(size * int(np.ceil(n / size)), np.nan)
+    padded[:n] = values
+    blocks = padded.reshape(-1, size)
+
+    finite = np.isfinite(blocks)
+    low = np.argmin(np.where(finite, blocks, np.inf), axis=1)
+    high = np.argmax(np.where(finite, blocks, -np.inf), axis=1)
+
+    starts = np.arange(len(blocks)) * size
+    positions = np.sort(np.column_stack([starts + low, starts + high]), axis=1).ravel()
+    positions = positions[np.r_[True, np.diff(positions) > 0]]
+    positions = positions[np.isfinite(padded[positions])]
+    return positions, values[positions]
+
+
+class StreamingPanels:
+    """
+    Histograms and min/max line downsampling of a table that grows by appends
+
+    Rows are added block by block and nothing is rescanned. The histogram
+    range doubles (merging pairs of bins, which keeps the counts exact) when
+    new values fall outside it. Lines keep the min and max of each bucket of
+    rows; when there are more than 'buckets' buckets the bucket width
+    doubles and neighbouring buckets are merged, so the line stays within
+    2 x buckets points however long the table gets. An odd bin count is
+    rounded up so bins can always be merged in pairs.
+    """
+
+    def __init__(self, columns, buckets: int = 1000, bins: int = 30, ranges=None, expected_rows: int = 0):
+        self.columns = list(columns)
+        self.buckets = buckets
+        self.bins = bins + bins % 2
+        self.rows = 0
+        p = len(self.columns)
+
+        # Histogram: per-column lower edge and span, counts (p x bins)
+        self.low = np.full(p, np.nan)
+        self.span = np.ones(p)
+        if ranges is not None:
+            ranges = np.asarray(ranges, dtype=float)
+            self.low = ranges[:, 0].copy()
+            span = ranges[:, 1] - ranges[:, 0]
+            self.span = np.where(span > 0, span, 1.0)
+        self.counts = np.zeros((p, self.bins), dtype=np.int64)
+
+        # Lines: rows per bucket and (position, value) of each bucket's min and max
+        self.size = max(int(np.ceil(expected_rows / buckets)), 1)
+        self.low_pos = np.empty((0, p), dtype=np.int64)
+        self.low_val = np.empty((0, p))
+        self.high_pos = np.empty((0, p), dtype=np.int64)
+        self.high_val = np.empty((0, p))
+
+    def update_frame(self, df: pd.DataFrame) -> 'StreamingPanels':
+        """
+        Add the rows of a DataFrame (all of them are new rows)
+        """
+        for start in range(0, len(df), CHUNK_ROWS):
+            self.update(df[self.columns].iloc[start:start + CHUNK_ROWS].to_numpy(dtype=float))
+        return self
+
+    def update(self, block: np.ndarray) -> 'StreamingPanels':
+        """
+        Add a block of rows (rows x columns)
+        """
+        block = np.asarray(block, dtype=float).reshape(-1, len(self.columns))
+        if len(block):
+            self._update_histogram(block)
+            self._update_lines(block)
+            self.rows += len(block)
+        return self
+
+    def _update_histogram(self, block: np.ndarray):
+        valid = np.isfinite(block)
+        for i in range(len(self.columns)):
+            values = block[valid[:, i], i]
+            if not len(values):
+                continue
+            low, high = values.min(), values.max()
+            if np.isnan(self.low[i]):
+                self.low[i] = low
+                self.span[i] = high - low if high > low else 1.0
+            while low < self.low[i] or high > self.low[i] + self.span[i]:
+                self._double_range(i, grow_down=low < self.low[i])
+
+            index = np.floor((values - self.low[i]) / self.span[i] * self.bins)
+            index = np.clip(index, 0, self.bins - 1).astype(np.int64)
+            self.counts[i] += np.bincount(index, minlength=self.bins)
+
+    def _double_range(self, i: int, grow_down: bool):
+        """
+        Double a column's histogram range; pairs of old bins become one new bin
+        """
+        merged = self.counts[i].reshape(-1, 2).sum(axis=1)
+        doubled = np.zeros(self.bins, dtype=np.int64)
+        if grow_down:
+            doubled[self.bins - len(merged):] = merged
+            self.low[i] -= self.span[i]
+        else:
+            doubled[:len(merged)] = merged
+        self.span[i] *= 2
+        self.counts[i] = doubled
+
+    def _bucket_extremes(self, block: np.ndarray, first_row: int) -> tuple:
+        """
+        (low positions, low values, high positions, high values) per bucket of a block
+        """
+        size = self.size
+        n_buckets = int(np.ceil(len(block) / size))
+        padded = np.full((n_buckets * size, block.shape[1]), np.nan)
+        padded[:len(block)] = block
+        blocks = padded.reshape(n_buckets, size, -1)
+
+        finite = np.isfinite(blocks)
+        low = np.argmin(np.where(finite, blocks, np.inf), axis=1)
+        high = np.argmax(np.where(finite, blocks, -np.inf), axis=1)
+        starts = first_row + np.arange(n_buckets)[:, None] * size
+        low_val = np.take_along_axis(blocks, low[:, None, :], axis=1)[:, 0, :]
+        high_val = np.take_along_axis(blocks, high[:, None, :], axis=1)[:, 0, :]
+        return starts + low, low_val, starts + high, high_val
+
+    @staticmethod
+    def _combine(a: tuple, b: tuple) -> tuple:
+        """
+        Extremes of two buckets taken together (NaN where a bucket has no values)
+        """
+        low_pos_a, low_val_a, high_pos_a, high_val_a = a
+        low_pos_b, low_val_b, high_pos_b, high_val_b = b
+        take_low_b = np.isnan(low_val_a) | (low_val_b < low_val_a)
+        take_high_b = np.isnan(high_val_a) | (high_val_b > high_val_a)
+        return (
+            np.where(take_low_b, low_pos_b, low_pos_a),
+            np.where(take_low_b, low_val_b, low_val_a),
+            np.where(take_high_b, high_pos_b, high_pos_a),
+            np.where(take_high_b, high_val_b, high_val_a)
+        )
+
+    def _update_lines(self, block: np.ndarray):
+        state = [self.low_pos, self.low_val, self.high_pos, self.high_val]
+
+        # Fill the last, partly filled bucket first
+        fill = self.rows - (len(self.low_pos) - 1) * self.size if len(self.low_pos) else self.size
+        if fill < self.size:
+            head = block[:self.size - fill]
+            block = block[len(head):]
+            extremes = self._bucket_extremes(head, self.rows)
+            combined = self._combine(tuple(array[-1] for array in state), tuple(array[0] for array in extremes))
+            for array, value in zip(state, combined):
+                array[-1] = value
+            first_row = self.rows + len(head)
+        else:
+            first_row = self.rows
+
+        if len(block):
+            extremes = self._bucket_extremes(block, first_row)
+            state = [np.concatenate([array, new]) for array, new in zip(state, extremes)]
+
+        # Too many buckets: double the width and merge neighbours
+        while len(state[0]) > self.buckets:
+            if len(state[0]) % 2:
+                state = [
+                    np.concatenate([array, np.full((1, array.shape[1]), fill_value)])
+                    for array, fill_value in zip(state, (0, np.nan, 0, np.nan))
+                ]
+            even = tuple(array[0::2] for array in state)
+            odd = tuple(array[1::2] for array in state)
+            state = list(self._combine(even, odd))
+            self.size *= 2
+
+        self.low_pos, self.low_val, self.high_pos, self.high_val = state
+
+    def panels(self) -> dict:
+        """
+        Per column: downsampled line (positions, values), histogram counts and
+        edges, and quartiles from the histogram
+        """
+        edges = self.low[:, None] + self.span[:, None] * np.linspace(0, 1, self.bins + 1)
+        edges = np.where(np.isnan(edges), np.linspace(0, 1, self.bins + 1), edges)
+        quartiles = [binned_quantiles(self.counts, edges, q) for q in (0.25, 0.5, 0.75)]
+
+        panels = {}
+        for i, column in enumerate(self.columns):
+            positions = np.concatenate([self.low_pos[:, i], self.high_pos[:, i]])
+            values = np.concatenate([self.low_val[:, i], self.high_val[:, i]])
+            keep = np.isfinite(values)
+            positions, first = np.unique(positions[keep], return_index=True)
+            panels[column] = {
+                'positions': positions,
+                'values': values[keep][first],
+                'counts': self.counts[i],
+                'edges': edges[i],
+                'q1': quartiles[0][i],
+                'median': quartiles[1][i],
+                'q3': quartiles[2][i]
+            }
+        return panels
@@ -0,0 +1,240 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from src.utils.helpers import finite_values
+
+# Candidate distributions for non-normal data (display name -> scipy name)
+CANDIDATE_DISTRIBUTIONS = {
+    'Normal': 'norm',
+    'Lognormal': 'lognorm',
+    'Weibull': 'weibull_min',
+    'Gamma': 'gamma',
+    'Johnson SU': 'johnsonsu'
+}
+
+# Distributions defined only for positive values (fitted with location fixed at 0)
+POSITIVE_DISTRIBUTIONS = {'lognorm', 'weibull_min', 'gamma'}
+
+# Bias correction constant for moving ranges of two consecutive observations
+D2_MOVING_RANGE = 1.128
+
+# Percentiles equivalent to -3 sigma, median and +3 sigma of a normal distribution
+LOWER_PERCENTILE = 0.00135
+UPPER_PERCENTILE = 0.99865
+
+# Fitting is done on a reproducible subsample to keep large columns fast
+MAX_FIT_SAMPLES = 5000
+
+
+def _fit_sample(values: np.ndarray, random_state: int = 0) -> np.ndarray:
+    """
+    Reproducible subsample used for distribution fitting
+    """
+    if len(values) <= MAX_FIT_SAMPLES:
+        return values
+    rng = np.random.default_rng(random_state)
+    return rng.choice(values, MAX_FIT_SAMPLES, replace=False)
+
+
+def _fit_distribution(task):
+    """
+    Fit one candidate distribution and return its AIC
+
+    Runs in a worker process, so it only receives picklable arguments.
+    """
+    column, dist_name, sample = task
+    dist = getattr(stats, dist_name)
+
+    try:
+        if dist_name in POSITIVE_DISTRIBUTIONS:
+            if sample.min() <= 0:
+                return column, dist_name, None, np.inf
+            params = dist.fit(sample, floc=0)
+            n_params = len(params) - 1
+        else:
+            params = dist.fit(sample)
+            n_params = len(params)
+
+        log_likelihood = np.sum(dist.logpdf(sample, *params))
+        if not np.isfinite(log_likelihood):
+            return column, dist_name, None, np.inf
+
+        aic = 2 * n_params - 2 * log_likelihood
+        return column, dist_name, tuple(params), aic
+    except Exception:
+        return column, dist_name, None, np.inf
+
+
+def _run_fits(tasks, max_workers=None):
+    """
+    Fit all (column, distribution) tasks, in parallel when worthwhile
+    """
+    if len(tasks) <= len(CANDIDATE_DISTRIBUTIONS) or max_workers == 1:
+        return [_fit_distribution(task) for task in tasks]
+
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            return list(executor.map(_fit_distribution, tasks, chunksize=4))
+    except (BrokenProcessPool, OSError):
+        # Fall back to serial fitting if worker processes are unavailable
+        return [_fit_distribution(task) for task in tasks]
+
+
+def _lowest(*indices) -> float:
+    """
+    Smallest of the one-sided indices that are defined (NaN if none is)
+    """
+    return min((value for value in indices if not np.isnan(value)), default=float('nan'))
+
+
+def capability_indices(data, lsl=None, usl=None, target=None, dist_name='norm', params=None) -> dict:
+    """
+    Compute Cp, Cpk, Pp, Ppk, Cpm and expected PPM for one characteristic
+
+    Cp/Cpk use the short-term (moving range) sigma under normality. Pp/Ppk and
+    the expected PPM use the percentile method on the given distribution, which
+    reduces to the classic formulas when the distribution is normal.
+    
+    Indices whose sigma (or percentile spread) is zero, as with constant or
+    stepwise-constant data, are NaN and explained in 'Note' rather than
+    reported as infinite.
+    """
+    values = finite_values(data)
+    if len(values) < 2:
+        raise ValueError("At least two observations are required")
+    if lsl is None and usl is None:
+        raise ValueError("At least one specification limit is required")
+    if lsl is not None and usl is not None and lsl >= usl:
+        raise ValueError("LSL must be lower than USL")
+
+    mean = values.mean()
+    sigma_overall = values.std(ddof=1)
+    sigma_within = np.abs(np.diff(values)).mean() / D2_MOVING_RANGE
+
+    dist = getattr(stats, dist_name)
+    if params is None:
+        params = (mean, sigma_overall) if dist_name == 'norm' else dist.fit(values)
+    if sigma_overall > 0:
+        lower_q, median_q, upper_q = dist.ppf([LOWER_PERCENTILE, 0.5, UPPER_PERCENTILE], *params)
+    else:
+        # A single repeated value: no distribution to evaluate
+        lower_q = median_q = upper_q = mean
+
+    nan = float('nan')
+    cp = cpk_lower = cpk_upper = nan
+    pp = ppk_lower = ppk_upper = nan
+    ppm = 0.0
+    notes = []
+
+    within_ok = sigma_within > 0
+    spread_ok = upper_q - median_q > 0 and median_q - lower_q > 0
+    if not within_ok:
+        notes.append("No point-to-point variation (constant or stepwise data): Cp/Cpk undefined")
+    if not spread_ok:
+        notes.append("No spread in the fitted distribution: Pp/Ppk undefined, PPM from observed values")
+
+    if lsl is not None:
+        if within_ok:
+            cpk_lower = (mean - lsl) / (3 * sigma_within)
+        if spread_ok:
+            ppk_lower = (median_q - lsl) / (median_q - lower_q)
+            ppm += dist.cdf(lsl, *params) * 1_000_000
+        else:
+            ppm += np.mean(values < lsl) * 1_000_000
+    if usl is not None:
+        if within_ok:
+            cpk_upper = (usl - mean) / (3 * sigma_within)
+        if spread_ok:
+            ppk_upper = (usl - median_q) / (upper_q - median_q)
+            ppm += dist.sf(usl, *params) * 1_000_000
+        else:
+            ppm += np.mean(values > usl) * 1_000_000
+    if lsl is not None and usl is not None:
+        if within_ok:
+            cp = (usl - lsl) / (6 * sigma_within)
+        if spread_ok:
+            pp = (usl - lsl) / (upper_q - lower_q)
+
+    cpm = nan
+    if target is not None and lsl is not None and usl is not None:
+        deviation = np.sqrt(sigma_overall ** 2 + (mean - target) ** 2)
+        if deviation > 0:
+            cpm = (usl - lsl) / (6 * deviation)
+
+    result = {
+        'N': len(values),
+        'Mean': mean,
+        'Std (within)': sigma_within,
+        'Std (overall)': sigma_overall,
+        'Cp': cp,
+        'Cpk': _lowest(cpk_lower, cpk_upper),
+        'Pp': pp,
+        'Ppk': _lowest(ppk_lower, ppk_upper),
+        'Cpm': cpm,
+        'Expected PPM': ppm
+    }
+    if notes:
+        result['Note'] = "; ".join(notes)
+    return result
+
+
+def capability_batch(df: pd.DataFrame, specs: dict, fit_distributions: bool = True,
+                     max_workers=None, random_state: int = 0) -> pd.DataFrame:
+    """
+    Capability table for many characteristics at once
+
+    specs maps column name -> (lsl, usl, target); any of them may be None.
+    When fit_distributions is True every candidate distribution is fitted to
+    every column in parallel and the lowest-AIC fit drives Pp, Ppk and PPM.
+    Columns with fewer than two values are listed with an 'Error' instead.
+    """
+    samples = {}
+    skipped = []
+    for column in specs:
+        values = finite_values(df[column])
+        if len(values) >= 2:
+            samples[column] = values
+        else:
+            skipped.append(column)
+
+    best_fits = {column: ('norm', None) for column in samples}
+
+    if fit_distributions and samples:
+        tasks = [
+            (column, dist_name, _fit_sample(values, random_state))
+            for column, values in samples.items()
+            # Constant columns have nothing to fit
+            if np.ptp(values) > 0
+            for dist_name in CANDIDATE_DISTRIBUTIONS.values()
+        ]
+        best_aic = {}
+        for column, dist_name, params, aic in _run_fits(tasks, max_workers):
+            if params is not None and aic < best_aic.get(column, np.inf):
+                best_aic[column] = aic
+                best_fits[column] = (dist_name, params)
+
+    display_names = {name: label for label, name in CANDIDATE_DISTRIBUTIONS.items()}
+    rows = []
+    for column in specs:
+        if column in skipped:
+            rows.append({
+                'Characteristic': column, 
+                'Error': f"Only {len(finite_values(df[column]))} non-missing value(s); at least two are required"
+            })
+            continue
+        values = samples[column]
+        lsl, usl, target = specs[column]
+        dist_name, params = best_fits[column]
+        row = {'Characteristic': column, 'Distribution': display_names[dist_name]}
+        try:
+            row.update(capability_indices(values, lsl, usl, target, dist_name, params))
+        except ValueError as e:
+            row['Error'] = str(e)
+        rows.append(row)
+
+    return pd.DataFrame(rows)
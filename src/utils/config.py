@@ -6,5 +6,12 @@ load_dotenv()
 
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key')
-    DATABASE_PATH = 'data/users.csv'
+    # SQLite user store; the CSV it replaced is imported once when the database is created
+    DATABASE_PATH = os.getenv('DATABASE_PATH', 'data/users.db')
+    LEGACY_USERS_PATH = 'data/users.csv'
     UPLOAD_FOLDER = 'data/temp_uploads/'
+    # Drop folder followed by the live dashboard (CSV/Parquet from the line gateway)
+    WATCH_FOLDER = os.getenv('WATCH_FOLDER', 'data/watch/')
+    WATCH_INTERVAL_SECONDS = int(os.getenv('WATCH_INTERVAL_SECONDS', '10'))
+    # Saved dashboard layouts and their precomputed snapshots, one folder per user
+    DASHBOARD_FOLDER = os.getenv('DASHBOARD_FOLDER', 'data/dashboards/')
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+from scipy.cluster import hierarchy
+from scipy.spatial.distance import squareform
+
+# Rows accumulated per block when building the cross-product sums
+CHUNK_ROWS = 250_000
+
+
+def correlation_matrix(df: pd.DataFrame, columns, method: str = 'pearson') -> dict:
+    """
+    Pearson or Spearman correlation of all column pairs with p-values
+
+    Missing values are handled pairwise: every pair uses the rows where both
+    columns are present. The pairwise sums are built with matrix products over
+    blocks of rows, so the cost is a few p x p products per block instead of
+    p² separate Series.corr calls. Spearman ranks each column over its
+    non-missing values and then applies the Pearson formula.
+    """
+    columns = list(columns)
+    values = df[columns]
+    if method == 'spearman':
+        values = values.rank(method='average')
+    values = values.to_numpy(dtype=float)
+
+    # Centering by the column mean keeps the sums well conditioned
+    values = values - np.nanmean(values, axis=0)
+
+    p = len(columns)
+    n = np.zeros((p, p))
+    sum_x = np.zeros((p, p))
+    sum_xx = np.zeros((p, p))
+    sum_xy = np.zeros((p, p))
+
+    for start in range(0, len(values), CHUNK_ROWS):
+        block = values[start:start + CHUNK_ROWS]
+        valid = np.isfinite(block).astype(float)
+        filled = np.where(valid > 0, block, 0.0)
+
+        n += valid.T @ valid
+        # sum_x[i, j]: sum of column i over rows where column j is present
+        sum_x += filled.T @ valid
+        sum_xx += (filled ** 2).T @ valid
+        sum_xy += filled.T @ filled
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        covariance = n * sum_xy - sum_x * sum_x.T
+        variance = (n * sum_xx - sum_x ** 2) * (n * sum_xx - sum_x ** 2).T
+        r = np.clip(covariance / np.sqrt(variance), -1.0, 1.0)
+
+        dof = n - 2
+        t = r * np.sqrt(dof / (1 - r ** 2))
+        p_values = 2 * stats.t.sf(np.abs(t), np.maximum(dof, 1))
+    p_values[dof < 1] = np.nan
+    np.fill_diagonal(r, 1.0)
+    np.fill_diagonal(p_values, 0.0)
+
+    return {
+        'r': pd.DataFrame(r, index=columns, columns=columns),
+        'p': pd.DataFrame(p_values, index=columns, columns=columns),
+        'n': pd.DataFrame(n.astype(np.int64), index=columns, columns=columns)
+    }
+
+
+def strongest_pairs(result: dict, limit: int = 20, target=None) -> pd.DataFrame:
+    """
+    Pairs ranked by absolute correlation, optionally only against a target
+    """
+    r, p, n = result['r'], result['p'], result['n']
+    columns = r.columns
+
+    if target is not None:
+        others = [c for c in columns if c != target]
+        pairs = pd.DataFrame({
+            'Variable 1': target,
+            'Variable 2': others,
+            'r': r.loc[target, others].to_numpy(),
+            'p-value': p.loc[target, others].to_numpy(),
+            'N': n.loc[target, others].to_numpy()
+        })
+    else:
+        i, j = np.triu_indices(len(columns), k=1)
+        pairs = pd.DataFrame({
+            'Variable 1': columns[i],
+            'Variable 2': columns[j],
+            'r': r.to_numpy()[i, j],
+            'p-value': p.to_numpy()[i, j],
+            'N': n.to_numpy()[i, j]
+        })
+
+    order = np.argsort(-np.nan_to_num(np.abs(pairs['r'].to_numpy()), nan=-1), kind='stable')
+    return pairs.iloc[order[:limit]].reset_index(drop=True)
+
+
+def cluster_order(r: pd.DataFrame) -> list:
+    """
+    Column order from average-linkage clustering on 1 - |r|
+    """
+    if len(r) < 3:
+        return list(r.columns)
+    distance = 1 - np.abs(np.nan_to_num(r.to_numpy(), nan=0.0))
+    distance = (distance + distance.T) / 2
+    np.fill_diagonal(distance, 0.0)
+    linkage = hierarchy.linkage(squareform(np.clip(distance, 0, None), checks=False), method='average')
+    return list(r.columns[hierarchy.leaves_list(linkage)])
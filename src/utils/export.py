@@ -0,0 +1,133 @@
+import re
+import zipfile
+from io import BytesIO
+
+import pandas as pd
+from openpyxl import Workbook
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet and Arrow IPC need pyarrow
+    pa = None
+
+# Format name -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'Excel (XLSX)': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'Arrow IPC': ('arrow', 'application/vnd.apache.arrow.file')
+}
+
+# Rows per block when streaming a table into an XLSX sheet
+XLSX_CHUNK_ROWS = 50_000
+
+
+def available_formats() -> list:
+    """
+    Formats that can be written in this environment
+    """
+    if pa is None:
+        return ['CSV', 'Excel (XLSX)']
+    return list(EXPORT_FORMATS)
+
+
+def _flatten(table: pd.DataFrame) -> pd.DataFrame:
+    """
+    Index moved into columns and string column names, as columnar formats require
+    """
+    if not isinstance(table.index, pd.RangeIndex) or table.index.name is not None:
+        table = table.reset_index()
+    table = table.copy(deep=False)
+    table.columns = [str(column) for column in table.columns]
+    return table
+
+
+def _to_arrow(table: pd.DataFrame):
+    """
+    Arrow table; mixed-type object columns (e.g. category labels) become strings
+    """
+    try:
+        return pa.Table.from_pandas(table, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        objects = table.select_dtypes(include='object').columns
+        return pa.Table.from_pandas(table.astype({column: 'string' for column in objects}), preserve_index=False)
+
+
+def _write_xlsx(tables: dict) -> bytes:
+    """
+    One sheet per table, written in openpyxl's streaming (write-only) mode
+    """
+    workbook = Workbook(write_only=True)
+    used = set()
+    for name, table in tables.items():
+        # Sheet names: max 31 characters, no []:*?/\ and unique (Excel ignores case)
+        base = re.sub(r'[\[\]:*?/\\]', '_', str(name)) or 'Sheet'
+        title = base[:31]
+        suffix = 1
+        while title.lower() in used:
+            suffix += 1
+            title = f"{base[:30 - len(str(suffix))]}_{suffix}"
+        used.add(title.lower())
+
+        # openpyxl can't write tz-aware datetimes; keep the local wall time
+        aware = [column for column in table.columns if isinstance(table[column].dtype, pd.DatetimeTZDtype)]
+        if aware:
+            table = table.assign(**{column: table[column].dt.tz_localize(None) for column in aware})
+
+        sheet = workbook.create_sheet(title=title)
+        sheet.append(list(table.columns))
+        for start in range(0, len(table), XLSX_CHUNK_ROWS):
+            block = table.iloc[start:start + XLSX_CHUNK_ROWS].astype(object)
+            for row in block.where(block.notna(), None).itertuples(index=False, name=None):
+                sheet.append(row)
+
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def _write_single(table: pd.DataFrame, extension: str) -> bytes:
+    buffer = BytesIO()
+    if extension == 'csv':
+        buffer.write(table.to_csv(index=False).encode('utf-8'))
+    elif extension == 'parquet':
+        pq.write_table(_to_arrow(table), buffer, compression='zstd')
+    elif extension == 'arrow':
+        feather.write_feather(_to_arrow(table), buffer, compression='uncompressed')
+    return buffer.getvalue()
+
+
+def export_file_name(tables: dict, format: str, file_stem: str) -> tuple:
+    """
+    (file name, MIME type) that export_tables will produce
+    """
+    extension, mime = EXPORT_FORMATS[format]
+    if extension != 'xlsx' and len(tables) > 1:
+        return f"{file_stem}.zip", 'application/zip'
+    return f"{file_stem}.{extension}", mime
+
+
+def export_tables(tables: dict, format: str) -> bytes:
+    """
+    Write named result tables in one of EXPORT_FORMATS
+
+    XLSX puts every table on its own sheet. CSV, Parquet and Arrow hold one
+    table per file, so several tables are bundled into a ZIP.
+    """
+    extension = EXPORT_FORMATS[format][0]
+    tables = {name: _flatten(table) for name, table in tables.items()}
+
+    if extension == 'xlsx':
+        return _write_xlsx(tables)
+
+    if len(tables) == 1:
+        return _write_single(next(iter(tables.values())), extension)
+
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, table in tables.items():
+            member = re.sub(r'[^\w\-]+', '_', str(name)).strip('_') or 'table'
+            archive.writestr(f"{member}.{extension}", _write_single(table, extension))
+    return buffer.getvalue()
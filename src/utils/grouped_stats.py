@@ -0,0 +1,344 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# Outliers kept per stratum for plotting (half from each tail)
+MAX_OUTLIERS_PER_GROUP = 50
+
+# Tukey HSD pairs that get an exact p-value (the rest are flagged against q critical)
+TUKEY_EXACT_PAIRS = 50
+
+SIGNIFICANCE_LEVEL = 0.05
+
+# Label of the bucket that collects strata outside the top N (made unique if a stratum has it)
+OTHER_LABEL = 'Other'
+
+
+def _segment_quantile(sorted_values: np.ndarray, starts: np.ndarray, counts: np.ndarray, q: float):
+    """
+    Linear-interpolated quantile of every contiguous sorted segment at once
+    """
+    position = starts + q * (counts - 1)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, starts + counts - 1)
+    fraction = position - lower
+    return sorted_values[lower] * (1 - fraction) + sorted_values[upper] * fraction
+
+
+def grouped_summary(groups, values, max_outliers: int = MAX_OUTLIERS_PER_GROUP):
+    """
+    Count, mean, std, min, quartiles, max, Tukey whiskers and outlier samples
+    for every stratum in one sorted pass
+
+    The data is sorted once by (stratum, value); after that every statistic
+    is a vectorised operation over contiguous segments, with no Python loop
+    over strata. Returns (summary indexed by stratum, outlier sample frame).
+    """
+    groups = pd.Series(groups)
+    values = np.asarray(values, dtype=float)
+
+    codes, categories = pd.factorize(groups, sort=True)
+    valid = (codes >= 0) & np.isfinite(values)
+    codes, values = codes[valid], values[valid]
+
+    order = np.lexsort((values, codes))
+    codes, values = codes[order], values[order]
+
+    counts = np.bincount(codes, minlength=len(categories))
+    present = counts > 0
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    p_counts, p_starts = counts[present], starts[present]
+
+    sums = np.bincount(codes, weights=values, minlength=len(categories))[present]
+    means = sums / p_counts
+    deviations = values - np.repeat(means, p_counts)
+    squares = np.bincount(codes, weights=deviations ** 2, minlength=len(categories))[present]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        stds = np.sqrt(squares / (p_counts - 1))
+
+    q1 = _segment_quantile(values, p_starts, p_counts, 0.25)
+    median = _segment_quantile(values, p_starts, p_counts, 0.5)
+    q3 = _segment_quantile(values, p_starts, p_counts, 0.75)
+    iqr = q3 - q1
+
+    # Tukey fences broadcast back to the rows of each segment
+    low_fence = np.repeat(q1 - 1.5 * iqr, p_counts)
+    high_fence = np.repeat(q3 + 1.5 * iqr, p_counts)
+    inside = (values >= low_fence) & (values <= high_fence)
+
+    lower_whisker = np.minimum.reduceat(np.where(inside, values, np.inf), p_starts)
+    upper_whisker = np.maximum.reduceat(np.where(inside, values, -np.inf), p_starts)
+
+    summary = pd.DataFrame({
+        'count': p_counts,
+        'mean': means,
+        'median': median,
+        'min': values[p_starts],
+        'max': values[p_starts + p_counts - 1],
+        'std': stds,
+        'q1': q1,
+        'q3': q3,
+        'lower_whisker': lower_whisker,
+        'upper_whisker': upper_whisker,
+        'outliers': np.add.reduceat((~inside).astype(np.int64), p_starts)
+    }, index=pd.Index(np.asarray(categories)[present], name=groups.name))
+
+    # Outlier sample: the most extreme points of each tail
+    outlier_rows = np.flatnonzero(~inside)
+    row_starts = np.repeat(starts, counts)[outlier_rows]
+    row_ends = np.repeat(starts + counts, counts)[outlier_rows]
+    below = values[outlier_rows] < np.repeat(median, p_counts)[outlier_rows]
+    keep = np.where(
+        below,
+        outlier_rows - row_starts < max_outliers // 2,
+        row_ends - 1 - outlier_rows < max_outliers // 2
+    )
+    outliers = pd.DataFrame({
+        'group': np.asarray(categories)[codes[outlier_rows[keep]]],
+        'value': values[outlier_rows[keep]]
+    })
+
+    return summary, outliers
+
+
+def merge_strata(summary: pd.DataFrame) -> pd.Series:
+    """
+    Combine several strata of a grouped summary into one row
+
+    Count, mean, pooled std, min, max and outlier counts are exact; order
+    statistics (median, quartiles, whiskers) cannot be merged and are left empty.
+    """
+    counts = summary['count'].astype(float)
+    total = counts.sum()
+    mean = (counts * summary['mean']).sum() / total
+    squares = ((counts - 1) * summary['std'].fillna(0) ** 2).sum() + (counts * (summary['mean'] - mean) ** 2).sum()
+
+    merged = pd.Series(np.nan, index=summary.columns, dtype=float)
+    merged.update(pd.Series({
+        'count': total,
+        'mean': mean,
+        'std': np.sqrt(squares / (total - 1)) if total > 1 else np.nan,
+        'min': summary['min'].min(),
+        'max': summary['max'].max(),
+        'outliers': summary['outliers'].sum() if 'outliers' in summary else np.nan
+    }))
+    return merged
+
+
+def top_n_strata(summary: pd.DataFrame, n: int = 20, by: str = 'count') -> tuple:
+    """
+    Keep the N most important strata and collapse the rest into "Other"
+
+    Strata are ranked by count, or by effect size: their contribution
+    n_g (mean_g - grand mean)² to the between-strata sum of squares.
+    Returns (reduced summary, number of strata merged into "Other"); the
+    merged row is always the last one.
+    """
+    if len(summary) <= n:
+        return summary, 0
+
+    order = rank_strata(summary, by).index
+    top = summary.loc[order[:n]]
+    rest = summary.loc[order[n:]]
+
+    label = OTHER_LABEL
+    labels = set(summary.index.astype(str))
+    while label in labels:
+        # A real stratum is called "Other": don't merge into it
+        label = f"{label} (merged)"
+    other = merge_strata(rest).to_frame(label).T
+    other.index.name = summary.index.name
+    return pd.concat([top, other.astype(summary.dtypes.to_dict(), errors='ignore')]), len(rest)
+
+
+def rank_strata(summary: pd.DataFrame, by: str = 'count') -> pd.DataFrame:
+    """
+    Strata sorted by count or by effect size (largest first)
+    """
+    if by == 'effect':
+        grand_mean = (summary['count'] * summary['mean']).sum() / summary['count'].sum()
+        score = summary['count'] * (summary['mean'] - grand_mean) ** 2
+    else:
+        score = summary['count']
+    return summary.loc[score.sort_values(ascending=False, kind='stable').index]
+
+
+def build_cube(df: pd.DataFrame, factors, value: str) -> pd.DataFrame:
+    """
+    Additive aggregates for every combination of the factor levels
+
+    One grouped pass stores count, sum, centred sum of squares, min and max
+    per cell. Any subset or ordering of the factors, and any of mean, count,
+    std, min or max, can then be derived from the cube without the raw rows.
+    """
+    values = df[value].astype(float)
+    shift = values.mean()
+    cells = pd.DataFrame({'value': values, 'square': (values - shift) ** 2})
+
+    cube = cells.groupby([df[factor] for factor in factors], observed=True, sort=True).agg(
+        count=('value', 'count'),
+        sum=('value', 'sum'),
+        square=('square', 'sum'),
+        min=('value', 'min'),
+        max=('value', 'max')
+    )
+    cube = cube[cube['count'] > 0]
+    cube.attrs['shift'] = shift
+    return cube
+
+
+def rollup_cube(cube: pd.DataFrame, factors) -> pd.DataFrame:
+    """
+    Aggregate the cube to a subset of its factors (in the given order)
+    """
+    rolled = cube.groupby(level=list(factors), observed=True, sort=True).agg(
+        count=('count', 'sum'),
+        sum=('sum', 'sum'),
+        square=('square', 'sum'),
+        min=('min', 'min'),
+        max=('max', 'max')
+    )
+    shift = cube.attrs.get('shift', 0.0)
+
+    rolled['mean'] = rolled['sum'] / rolled['count']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variance = (rolled['square'] - rolled['count'] * (rolled['mean'] - shift) ** 2) / (rolled['count'] - 1)
+    rolled['std'] = np.sqrt(variance.clip(lower=0))
+    return rolled[['count', 'mean', 'std', 'min', 'max']]
+
+
+def _group_moments(codes: np.ndarray, n_groups: int, matrix: np.ndarray):
+    """
+    Per-group count, mean and variance for every column of a matrix
+
+    One bincount per moment over the flattened (group, column) index; rows
+    with missing values are excluded column by column.
+    """
+    n_columns = matrix.shape[1]
+    valid = np.isfinite(matrix)
+    filled = np.where(valid, matrix, 0.0)
+    index = (codes[:, None] * n_columns + np.arange(n_columns)).ravel()
+    size = n_groups * n_columns
+
+    counts = np.bincount(index, weights=valid.ravel(), minlength=size).reshape(n_groups, n_columns)
+    sums = np.bincount(index, weights=filled.ravel(), minlength=size).reshape(n_groups, n_columns)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+        deviations = np.where(valid, matrix - means[codes], 0.0)
+        squares = np.bincount(index, weights=(deviations ** 2).ravel(), minlength=size).reshape(n_groups, n_columns)
+        variances = squares / (counts - 1)
+    return counts, means, variances
+
+
+def strata_tests(groups, responses: pd.DataFrame) -> pd.DataFrame:
+    """
+    One-way ANOVA, Welch ANOVA and Kruskal-Wallis for many responses at once
+
+    All tests are computed from grouped sufficient statistics (counts, means,
+    variances and rank sums) held in (groups x responses) arrays, so there is
+    no Python loop over strata.
+    """
+    codes, categories = pd.factorize(pd.Series(groups))
+    keep = codes >= 0
+    codes = codes[keep]
+    matrix = responses.to_numpy(dtype=float)[keep]
+    n_groups = len(categories)
+
+    counts, means, variances = _group_moments(codes, n_groups, matrix)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Classic one-way ANOVA
+        present = counts > 0
+        k = present.sum(axis=0)
+        total = counts.sum(axis=0)
+        grand_mean = np.nansum(counts * means, axis=0) / total
+        ss_between = np.nansum(counts * (means - grand_mean) ** 2, axis=0)
+        ss_within = np.nansum(np.where(counts > 1, (counts - 1) * variances, 0.0), axis=0)
+        df_between, df_within = k - 1, total - k
+        f_anova = (ss_between / df_between) / (ss_within / df_within)
+        p_anova = stats.f.sf(f_anova, df_between, df_within)
+
+        # Welch ANOVA on strata with at least two observations and some spread
+        usable = (counts > 1) & (variances > 0)
+        k_welch = usable.sum(axis=0)
+        weights = np.where(usable, counts / variances, 0.0)
+        weight_total = weights.sum(axis=0)
+        weighted_mean = np.nansum(np.where(usable, weights * means, 0.0), axis=0) / weight_total
+        a = np.nansum(np.where(usable, weights * (means - weighted_mean) ** 2, 0.0), axis=0) / (k_welch - 1)
+        lam = np.nansum(np.where(usable, (1 - weights / weight_total) ** 2 / (counts - 1), 0.0), axis=0)
+        f_welch = a / (1 + 2 * (k_welch - 2) / (k_welch ** 2 - 1) * lam)
+        df2_welch = (k_welch ** 2 - 1) / (3 * lam)
+        p_welch = stats.f.sf(f_welch, k_welch - 1, df2_welch)
+
+        # Kruskal-Wallis from rank sums (average ranks, tie-corrected)
+        ranks = pd.DataFrame(matrix).rank(method='average').to_numpy()
+        rank_counts, rank_means, _ = _group_moments(codes, n_groups, ranks)
+        rank_sums = np.nan_to_num(rank_counts * rank_means)
+        h = 12 / (total * (total + 1)) * np.nansum(
+            np.where(rank_counts > 0, rank_sums ** 2 / rank_counts, 0.0), axis=0
+        ) - 3 * (total + 1)
+        ties = np.array([_tie_term(matrix[:, j]) for j in range(matrix.shape[1])])
+        h = h / (1 - ties / (total ** 3 - total))
+        p_kruskal = stats.chi2.sf(h, k - 1)
+
+    return pd.DataFrame({
+        'Strata': k,
+        'N': total.astype(np.int64),
+        'ANOVA F': f_anova,
+        'ANOVA p-value': p_anova,
+        'Welch F': f_welch,
+        'Welch p-value': p_welch,
+        'Kruskal-Wallis H': h,
+        'Kruskal-Wallis p-value': p_kruskal,
+        'Strata Differ': p_anova < SIGNIFICANCE_LEVEL
+    }, index=pd.Index(responses.columns, name='Response'))
+
+
+def _tie_term(values: np.ndarray) -> float:
+    """
+    Sum of t³ - t over tied groups of a column (for the Kruskal-Wallis correction)
+    """
+    _, tie_counts = np.unique(values[np.isfinite(values)], return_counts=True)
+    tie_counts = tie_counts[tie_counts > 1].astype(float)
+    return float(np.sum(tie_counts ** 3 - tie_counts))
+
+
+def tukey_hsd(summary: pd.DataFrame, max_exact: int = TUKEY_EXACT_PAIRS) -> pd.DataFrame:
+    """
+    Tukey-Kramer pairwise comparisons from a per-stratum summary
+
+    The studentized range statistic is computed for every pair in one
+    vectorised step and compared with a single critical value; exact
+    p-values are only evaluated for the max_exact strongest pairs because
+    the studentized range distribution is expensive to integrate.
+    """
+    summary = summary[summary['count'] > 0]
+    counts = summary['count'].to_numpy(dtype=float)
+    means = summary['mean'].to_numpy(dtype=float)
+    variances = summary['std'].to_numpy(dtype=float) ** 2
+
+    k = len(summary)
+    total = counts.sum()
+    df_within = total - k
+    mse = np.nansum(np.where(counts > 1, (counts - 1) * variances, 0.0)) / df_within
+
+    i, j = np.triu_indices(k, k=1)
+    difference = means[i] - means[j]
+    q = np.abs(difference) / np.sqrt(mse / 2 * (1 / counts[i] + 1 / counts[j]))
+    q_critical = stats.studentized_range.ppf(1 - SIGNIFICANCE_LEVEL, k, df_within)
+    margin = q_critical * np.sqrt(mse / 2 * (1 / counts[i] + 1 / counts[j]))
+
+    pairs = pd.DataFrame({
+        'Stratum A': summary.index[i],
+        'Stratum B': summary.index[j],
+        'Mean Difference': difference,
+        'CI Lower': difference - margin,
+        'CI Upper': difference + margin,
+        'q': q,
+        'Significant': q > q_critical,
+        'p-value': np.nan
+    }).sort_values('q', ascending=False, ignore_index=True)
+
+    top = pairs.index[:max_exact]
+    pairs.loc[top, 'p-value'] = stats.studentized_range.sf(pairs.loc[top, 'q'].to_numpy(), k, df_within)
+    return pairs
@@ -0,0 +1,9 @@
+import numpy as np
+
+
+def finite_values(data) -> np.ndarray:
+    """
+    Convert input to a float array without missing values
+    """
+    values = np.asarray(data, dtype=float)
+    return values[np.isfinite(values)]
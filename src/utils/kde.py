@@ -0,0 +1,81 @@
+import numpy as np
+
+from src.utils.helpers import finite_values
+
+# Number of bandwidths the density is extended beyond the data range
+KDE_CUT = 3
+
+
+def select_bandwidth(values: np.ndarray, method: str = 'silverman') -> float:
+    """
+    Automatic Gaussian kernel bandwidth (Silverman or Scott rule)
+    """
+    n = len(values)
+    std = values.std(ddof=1)
+
+    if method == 'scott':
+        sigma = std
+        factor = 1.059
+    else:
+        q75, q25 = np.percentile(values, [75, 25])
+        iqr = (q75 - q25) / 1.349
+        sigma = min(std, iqr) if iqr > 0 else std
+        factor = 0.9
+
+    bandwidth = factor * sigma * n ** (-1 / 5)
+    if bandwidth <= 0:
+        # Constant data: fall back to a tiny width relative to the value
+        bandwidth = max(abs(values[0]), 1.0) * 1e-3
+    return bandwidth
+
+
+def linear_binning(values: np.ndarray, grid_min: float, delta: float, grid_size: int) -> np.ndarray:
+    """
+    Spread each observation over its two nearest grid points
+
+    Runs in O(n) with two bincount calls instead of one kernel per point.
+    """
+    position = (values - grid_min) / delta
+    left = np.clip(np.floor(position).astype(np.int64), 0, grid_size - 2)
+    right_weight = np.clip(position - left, 0.0, 1.0)
+
+    counts = np.bincount(left, weights=1.0 - right_weight, minlength=grid_size)
+    counts += np.bincount(left + 1, weights=right_weight, minlength=grid_size)
+    return counts[:grid_size]
+
+
+def binned_kde(data, grid_size: int = 1024, bandwidth=None, method: str = 'silverman'):
+    """
+    Gaussian kernel density estimate evaluated on a regular grid
+
+    Observations are linearly binned onto the grid and convolved with the
+    kernel through the FFT, so the cost is O(n + m log m) for n observations
+    and m grid points. Returns (grid, density, bandwidth).
+    """
+    values = finite_values(data)
+    if len(values) < 2:
+        raise ValueError("At least two observations are required for a density estimate")
+
+    if bandwidth is None:
+        bandwidth = select_bandwidth(values, method)
+
+    grid_min = values.min() - KDE_CUT * bandwidth
+    grid_max = values.max() + KDE_CUT * bandwidth
+    grid, delta = np.linspace(grid_min, grid_max, grid_size, retstep=True)
+
+    counts = linear_binning(values, grid_min, delta, grid_size)
+
+    # Kernel sampled on the grid spacing, truncated at KDE_CUT bandwidths
+    half_width = int(min(grid_size - 1, np.ceil(KDE_CUT * bandwidth / delta)))
+    offsets = np.arange(-half_width, half_width + 1) * delta
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+
+    # Linear convolution via zero-padded real FFT
+    fft_size = 1 << int(np.ceil(np.log2(grid_size + len(kernel) - 1)))
+    convolved = np.fft.irfft(
+        np.fft.rfft(counts, fft_size) * np.fft.rfft(kernel, fft_size),
+        fft_size
+    )[half_width:half_width + grid_size]
+
+    density = np.clip(convolved, 0.0, None) / len(values)
+    return grid, density, bandwidth
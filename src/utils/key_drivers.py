@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.feature_selection import mutual_info_classif, mutual_info_regression
+
+# Targets with at most this many distinct values are treated as classes
+MAX_CLASSES = 10
+
+# Text columns with more distinct values than this share of the rows are identifiers (serials, IDs)
+MAX_CATEGORY_SHARE = 0.5
+
+# Rows looked at when deciding whether a column is an identifier
+IDENTIFIER_SAMPLE = 10_000
+
+
+def is_classification_target(series: pd.Series) -> bool:
+    """
+    Categorical, boolean or low-cardinality integer targets are classified
+    """
+    if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return True
+    values = series.dropna()
+    return pd.api.types.is_integer_dtype(values) and values.nunique() <= MAX_CLASSES
+
+
+def is_identifier(series: pd.Series) -> bool:
+    """
+    Timestamps, serials and other per-row labels that can't act as process inputs
+
+    Text columns count when most sampled values are distinct; integer columns
+    when they are a strictly increasing counter.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return True
+    if pd.api.types.is_bool_dtype(series):
+        return False
+    if pd.api.types.is_integer_dtype(series):
+        values = series.to_numpy()
+        return len(values) > 1 and bool(np.all(values[1:] > values[:-1]))
+    if pd.api.types.is_numeric_dtype(series):
+        return False
+    sample = series.dropna().head(IDENTIFIER_SAMPLE)
+    return len(sample) > MAX_CLASSES and sample.nunique() > MAX_CATEGORY_SHARE * len(sample)
+
+
+def default_inputs(df: pd.DataFrame, target: str) -> list:
+    """
+    Candidate inputs: every column except the target and identifier-like columns
+    """
+    return [column for column in df.columns if column != target and not is_identifier(df[column])]
+
+
+def encode_inputs(df: pd.DataFrame, inputs) -> tuple:
+    """
+    Numeric matrix for the tree models plus a mask of discrete columns
+
+    Categorical inputs become integer codes and timestamps continuous
+    nanosecond values; missing numeric values are filled with the column
+    median (missing categories get their own code).
+    """
+    encoded = {}
+    discrete = []
+    for column in inputs:
+        series = df[column]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            if getattr(series.dt, 'tz', None) is not None:
+                series = series.dt.tz_convert('UTC').dt.tz_localize(None)
+            times = series.astype('datetime64[ns]').astype('int64').astype(float)
+            times[series.isna().to_numpy()] = np.nan
+            encoded[column] = np.where(np.isnan(times), np.nanmedian(times) if np.isfinite(times).any() else 0.0, times)
+            discrete.append(False)
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            encoded[column] = series.fillna(series.median()).to_numpy(dtype=float)
+            discrete.append(False)
+        else:
+            encoded[column] = pd.factorize(series, use_na_sentinel=True)[0].astype(float)
+            discrete.append(True)
+    matrix = np.column_stack([encoded[column] for column in inputs])
+    return np.nan_to_num(matrix), np.array(discrete)
+
+
+def _rank_once(X, y, discrete, classification, n_estimators, random_state):
+    """
+    Impurity importance and mutual information for one sample
+
+    If mutual information can't be computed for all inputs at once, it is
+    computed input by input; inputs that still fail get NaN and are returned
+    with the error message.
+    """
+    model_class = RandomForestClassifier if classification else RandomForestRegressor
+    model = model_class(
+        n_estimators=n_estimators,
+        min_samples_leaf=5,
+        max_features='sqrt',
+        n_jobs=-1,
+        random_state=random_state
+    )
+    model.fit(X, y)
+
+    mi_function = mutual_info_classif if classification else mutual_info_regression
+    failed = {}
+    try:
+        mutual_info = mi_function(X, y, discrete_features=discrete, random_state=random_state, n_jobs=-1)
+    except ValueError:
+        mutual_info = np.full(X.shape[1], np.nan)
+        for i in range(X.shape[1]):
+            try:
+                mutual_info[i] = mi_function(
+                    X[:, [i]], y, discrete_features=discrete[[i]], random_state=random_state
+                )[0]
+            except ValueError as e:
+                failed[i] = str(e)
+    return model.feature_importances_, mutual_info, failed
+
+
+def key_drivers(df: pd.DataFrame, target: str, inputs, max_rows: int = 100_000,
+                repeats: int = 3, n_estimators: int = 100, random_state: int = 0) -> pd.DataFrame:
+    """
+    Rank inputs by random-forest importance and mutual information with the target
+
+    Trees and per-input mutual information run in parallel on all cores.
+    Datasets above max_rows are analysed on several independent random
+    subsamples; the spread of the scores across subsamples is reported as
+    their sampling error.
+    """
+    inputs = [column for column in inputs if column != target]
+    data = df[df[target].notna()]
+    classification = is_classification_target(data[target])
+
+    rng = np.random.default_rng(random_state)
+    if len(data) <= max_rows:
+        repeats = 1
+
+    importances, mutual_infos, failed = [], [], {}
+    for repeat in range(repeats):
+        if len(data) > max_rows:
+            sample = data.iloc[np.sort(rng.choice(len(data), max_rows, replace=False))]
+        else:
+            sample = data
+
+        X, discrete = encode_inputs(sample, inputs)
+        if classification:
+            y = pd.factorize(sample[target])[0]
+        else:
+            y = sample[target].to_numpy(dtype=float)
+
+        importance, mutual_info, errors = _rank_once(
+            X, y, discrete, classification, n_estimators, random_state + repeat
+        )
+        importances.append(importance)
+        mutual_infos.append(mutual_info)
+        failed.update({inputs[i]: message for i, message in errors.items()})
+
+    importances = np.array(importances)
+    mutual_infos = np.array(mutual_infos)
+
+    result = pd.DataFrame({
+        'Input': inputs,
+        'Tree Importance': importances.mean(axis=0),
+        'Tree Importance ±': importances.std(axis=0, ddof=1) if repeats > 1 else np.nan,
+        'Mutual Information': mutual_infos.mean(axis=0),
+        'Mutual Information ±': mutual_infos.std(axis=0, ddof=1) if repeats > 1 else np.nan
+    })
+    result['Rank'] = (
+        result['Tree Importance'].rank(ascending=False)
+        + result['Mutual Information'].rank(ascending=False, na_option='bottom')
+    ).rank(method='min').astype(int)
+
+    result = result.sort_values('Rank').reset_index(drop=True)
+    result.attrs.update({
+        'task': 'classification' if classification else 'regression',
+        'rows_used': min(len(data), max_rows),
+        'repeats': repeats,
+        'failed_inputs': failed
+    })
+    return result
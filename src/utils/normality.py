@@ -0,0 +1,122 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# Shapiro-Wilk is only valid up to 5000 observations
+MAX_SHAPIRO_SAMPLES = 5000
+
+# Points kept for each Q-Q plot
+QQ_POINTS = 200
+
+SIGNIFICANCE_LEVEL = 0.05
+
+
+def anderson_darling_pvalue(statistic: float, n: int) -> float:
+    """
+    p-value of the Anderson-Darling normality test with estimated parameters
+
+    Uses the small-sample adjustment and piecewise approximation of
+    D'Agostino & Stephens (1986).
+    """
+    a2 = statistic * (1 + 0.75 / n + 2.25 / n ** 2)
+    if a2 >= 13:
+        # The approximation is no longer monotonic beyond this point
+        p = 0.0
+    elif a2 >= 0.6:
+        p = np.exp(1.2937 - 5.709 * a2 + 0.0186 * a2 ** 2)
+    elif a2 >= 0.34:
+        p = np.exp(0.9177 - 4.279 * a2 - 1.38 * a2 ** 2)
+    elif a2 >= 0.2:
+        p = 1 - np.exp(-8.318 + 42.796 * a2 - 59.938 * a2 ** 2)
+    else:
+        p = 1 - np.exp(-13.436 + 101.14 * a2 - 223.73 * a2 ** 2)
+    return float(np.clip(p, 0.0, 1.0))
+
+
+def anderson_darling_statistic(sorted_values: np.ndarray, mean: float, std: float) -> float:
+    """
+    Anderson-Darling A² statistic against a normal with the given parameters
+    """
+    n = len(sorted_values)
+    z = (sorted_values - mean) / std
+    weights = 2 * np.arange(1, n + 1) - 1
+    return float(-n - np.sum(weights * (stats.norm.logcdf(z) + stats.norm.logsf(z[::-1]))) / n)
+
+
+def qq_points(sorted_values: np.ndarray, points: int = QQ_POINTS):
+    """
+    Theoretical normal vs sample quantiles, thinned to a fixed number of points
+    """
+    n = len(sorted_values)
+    index = np.unique(np.linspace(0, n - 1, min(points, n)).astype(np.int64))
+    probabilities = (index + 1 - 0.375) / (n + 0.25)
+    return stats.norm.ppf(probabilities), sorted_values[index]
+
+
+def _test_column(task):
+    """
+    Run all normality tests on one column
+    """
+    column, values, random_state = task
+    values = np.sort(values[np.isfinite(values)])
+    n = len(values)
+    if n < 8:
+        return column, {'N': n, 'Error': "At least 8 observations are required"}, None
+
+    mean = values.mean()
+    std = values.std(ddof=1)
+    if std == 0:
+        return column, {'N': n, 'Error': "Constant data"}, None
+
+    # Anderson-Darling on the full sample
+    ad_statistic = anderson_darling_statistic(values, mean, std)
+
+    # Shapiro-Wilk on a reproducible subsample for large n
+    if n > MAX_SHAPIRO_SAMPLES:
+        rng = np.random.default_rng(random_state)
+        shapiro_sample = rng.choice(values, MAX_SHAPIRO_SAMPLES, replace=False)
+    else:
+        shapiro_sample = values
+    sw_statistic, sw_pvalue = stats.shapiro(shapiro_sample)
+
+    # Kolmogorov-Smirnov against a normal with the sample mean and std
+    ks_statistic, ks_pvalue = stats.kstest(values, 'norm', args=(mean, std))
+
+    ad_pvalue = anderson_darling_pvalue(ad_statistic, n)
+    row = {
+        'N': n,
+        'Mean': mean,
+        'Std': std,
+        'Skewness': stats.skew(values),
+        'Kurtosis': stats.kurtosis(values),
+        'AD Statistic': ad_statistic,
+        'AD p-value': ad_pvalue,
+        'SW Statistic': sw_statistic,
+        'SW p-value': sw_pvalue,
+        'SW Sample Size': len(shapiro_sample),
+        'KS Statistic': ks_statistic,
+        'KS p-value': ks_pvalue,
+        'Normal': ad_pvalue >= SIGNIFICANCE_LEVEL
+    }
+    return column, row, qq_points(values)
+
+
+def normality_tests(df: pd.DataFrame, columns, random_state: int = 0, max_workers=None):
+    """
+    Anderson-Darling, Shapiro-Wilk and Kolmogorov-Smirnov tests for many columns
+
+    Columns are tested in parallel threads (the sorting and test kernels run
+    in numpy/scipy). Returns the results table indexed by column and a dict
+    of Q-Q plot data (theoretical, sample) per column.
+    """
+    tasks = [(column, df[column].to_numpy(dtype=float), random_state) for column in columns]
+
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        results = list(executor.map(_test_column, tasks))
+
+    table = pd.DataFrame.from_dict({column: row for column, row, _ in results}, orient='index')
+    qq_data = {column: qq for column, _, qq in results if qq is not None}
+    return table, qq_data
@@ -0,0 +1,201 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+# Default accuracy parameter: larger k means smaller error and more memory
+DEFAULT_K = 200
+
+# Confidence level used for the reported rank error bound
+ERROR_CONFIDENCE = 0.99
+
+
+class QuantileSketch:
+    """
+    Mergeable KLL quantile sketch with exact count, mean, std, min and max
+
+    Values are added in numpy batches and compacted level by level, so a
+    sketch built during ingestion can be merged with the sketch of an appended
+    batch without going back to the raw rows.
+    """
+
+    def __init__(self, k: int = DEFAULT_K, seed=None):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.compactions = [0]
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        """
+        Capacity of a level; lower levels hold geometrically fewer items
+        """
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self):
+        """
+        Compact the lowest over-capacity level until every level fits
+        """
+        while True:
+            level = next(
+                (h for h, items in enumerate(self.levels) if len(items) > self._capacity(h)),
+                None
+            )
+            if level is None:
+                return
+
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+                self.compactions.append(0)
+
+            items = np.sort(self.levels[level])
+            # An odd item stays behind so the total weight is preserved exactly
+            leftover, items = items[:len(items) % 2], items[len(items) % 2:]
+            promoted = items[self._rng.integers(2)::2]
+
+            self.levels[level] = leftover
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            self.compactions[level] += 1
+
+    def _update_moments(self, count, mean, m2, minimum, maximum):
+        """
+        Combine exact moments with another batch (Chan et al. formula)
+        """
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
+
+    def update(self, data):
+        """
+        Add a batch of values (missing values are ignored)
+        """
+        values = np.asarray(data, dtype=float)
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return self
+
+        batch_mean = values.mean()
+        self._update_moments(
+            len(values), batch_mean, np.sum((values - batch_mean) ** 2),
+            values.min(), values.max()
+        )
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def copy(self) -> 'QuantileSketch':
+        return copy.deepcopy(self)
+
+    def merge(self, other: 'QuantileSketch'):
+        """
+        Merge another sketch into this one (in place)
+        """
+        if other.count == 0:
+            return self
+
+        self._update_moments(other.count, other.mean, other.m2, other.min, other.max)
+        self.k = min(self.k, other.k)
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+                self.compactions.append(0)
+            self.levels[level] = np.concatenate([self.levels[level], items])
+            self.compactions[level] += other.compactions[level]
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        """
+        Approximate quantile(s) for q in [0, 1]
+        """
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([
+            np.full(len(level_items), 2.0 ** h) for h, level_items in enumerate(self.levels)
+        ])
+        order = np.argsort(items, kind='stable')
+        cumulative = np.cumsum(weights[order])
+
+        targets = np.clip(np.asarray(q, dtype=float), 0.0, 1.0) * cumulative[-1]
+        index = np.clip(np.searchsorted(cumulative, targets, side='left'), 0, len(items) - 1)
+        result = items[order][index]
+
+        # Extremes are tracked exactly
+        result = np.where(np.asarray(q) <= 0, self.min, result)
+        result = np.where(np.asarray(q) >= 1, self.max, result)
+        return result if np.ndim(q) else float(result)
+
+    def rank_error(self, confidence: float = ERROR_CONFIDENCE) -> float:
+        """
+        Normalised rank error bound holding with the given probability
+
+        Each compaction at level h shifts any rank by at most 2**h with zero
+        mean, so Hoeffding's inequality bounds the total error.
+        """
+        if self.count == 0:
+            return 0.0
+        variance_bound = sum(m * 4.0 ** h for h, m in enumerate(self.compactions))
+        return float(np.sqrt(2 * variance_bound * np.log(2 / (1 - confidence))) / self.count)
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else np.nan
+
+    def describe(self) -> dict:
+        """
+        Summary statistics in the layout of pandas describe()
+        """
+        q1, median, q3 = self.quantile([0.25, 0.5, 0.75])
+        return {
+            'count': self.count,
+            'mean': self.mean if self.count else np.nan,
+            'std': self.std,
+            'min': self.min if self.count else np.nan,
+            '25%': q1,
+            '50%': median,
+            '75%': q3,
+            'max': self.max if self.count else np.nan,
+            'rank error (±%)': 100 * self.rank_error()
+        }
+
+
+def build_sketches(df: pd.DataFrame, columns=None, k: int = DEFAULT_K) -> dict:
+    """
+    Build one sketch per numeric column
+    """
+    if columns is None:
+        columns = df.select_dtypes(include=[np.number]).columns
+    return {column: QuantileSketch(k).update(df[column].to_numpy()) for column in columns}
+
+
+def merge_sketches(current: dict, appended: dict) -> dict:
+    """
+    Merge per-column sketches of an appended batch into the existing ones
+
+    Returns new sketches; the ones in current are left unchanged.
+    """
+    merged = dict(current)
+    for column, sketch in appended.items():
+        if column in merged:
+            merged[column] = merged[column].copy().merge(sketch)
+        else:
+            merged[column] = sketch
+    return merged
+
+
+def describe_sketches(sketches: dict) -> pd.DataFrame:
+    """
+    describe()-style table built from sketches instead of full sorts
+    """
+    return pd.DataFrame({column: sketch.describe() for column, sketch in sketches.items()})
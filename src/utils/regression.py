@@ -0,0 +1,253 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from src.utils.quantile_sketch import QuantileSketch
+
+# Rows per chunk when streaming over a DataFrame
+CHUNK_ROWS = 500_000
+
+# Huber tuning constant (95% efficiency under normal errors)
+HUBER_K = 1.345
+
+# Points on the fixed x-grid used to draw the fit and its bands
+GRID_POINTS = 200
+
+
+def iter_chunks(df: pd.DataFrame, x: str, y: str, start: int = 0, chunk_rows: int = CHUNK_ROWS):
+    """
+    Yield (x, y) float arrays block by block, starting at a given row
+    """
+    for offset in range(start, len(df), chunk_rows):
+        block = df.iloc[offset:offset + chunk_rows]
+        yield block[x].to_numpy(dtype=float), block[y].to_numpy(dtype=float)
+
+
+class RegressionAccumulator:
+    """
+    Polynomial least-squares fit from sufficient statistics
+
+    Only X'WX, X'Wy, y'Wy and a few sums are kept, so chunks can be added
+    one at a time (datasets larger than memory, appended batches) and the
+    fit, R², and confidence/prediction bands are available at any point.
+    y is accumulated around the first chunk's mean, like x, so the sums of
+    squares don't lose precision to a large offset.
+    """
+
+    def __init__(self, degree: int = 1, x_center: float = None, x_scale: float = None,
+                 y_center: float = None):
+        self.degree = degree
+        self.x_center = x_center
+        self.x_scale = x_scale
+        self.y_center = y_center
+        self.rows_seen = 0
+        self.n = 0.0
+        self.xtx = np.zeros((degree + 1, degree + 1))
+        self.xty = np.zeros(degree + 1)
+        self.yty = 0.0
+        self.sum_y = 0.0
+        self.x_min = np.inf
+        self.x_max = -np.inf
+
+    def _design(self, x: np.ndarray) -> np.ndarray:
+        """
+        Polynomial basis on centred, scaled x for a well-conditioned X'X
+        """
+        z = (x - self.x_center) / self.x_scale
+        return np.vander(z, self.degree + 1, increasing=True)
+
+    def update(self, x, y, weights=None):
+        """
+        Add a chunk of observations (pairs with missing values are skipped)
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        self.rows_seen += len(x)
+
+        valid = np.isfinite(x) & np.isfinite(y)
+        x, y = x[valid], y[valid]
+        if len(x) == 0:
+            return self
+
+        # The scaling is fixed by the first chunk so later chunks share the basis
+        if self.x_center is None:
+            self.x_center = x.mean()
+        if self.x_scale is None:
+            self.x_scale = x.std() or 1.0
+        if self.y_center is None:
+            self.y_center = y.mean()
+        y = y - self.y_center
+
+        w = np.ones(len(x)) if weights is None else np.asarray(weights, dtype=float)[valid]
+        design = self._design(x)
+        weighted = design * w[:, None]
+
+        self.n += len(x)
+        self.xtx += design.T @ weighted
+        self.xty += weighted.T @ y
+        self.yty += np.sum(w * y * y)
+        self.sum_y += np.sum(w * y)
+        self.x_min = min(self.x_min, x.min())
+        self.x_max = max(self.x_max, x.max())
+        return self
+
+    @property
+    def n_params(self) -> int:
+        return self.degree + 1
+
+    def _centered_coefficients(self) -> np.ndarray:
+        return np.linalg.lstsq(self.xtx, self.xty, rcond=None)[0]
+
+    def coefficients(self) -> np.ndarray:
+        """
+        Coefficients on the scaled basis, in the original y units
+        """
+        beta = self._centered_coefficients()
+        beta[0] += self.y_center
+        return beta
+
+    def summary(self) -> dict:
+        """
+        Fit quality from the sufficient statistics alone
+        """
+        beta = self._centered_coefficients()
+        rss = max(self.yty - 2 * beta @ self.xty + beta @ self.xtx @ beta, 0.0)
+        sst = self.yty - self.sum_y ** 2 / self.xtx[0, 0]
+        dof = self.n - self.n_params
+        return {
+            'N': int(self.n),
+            'R²': 1 - rss / sst if sst > 0 else np.nan,
+            'Adjusted R²': 1 - (rss / dof) / (sst / (self.n - 1)) if sst > 0 and dof > 0 else np.nan,
+            'RMSE': np.sqrt(rss / dof) if dof > 0 else np.nan,
+            'Residual DoF': dof
+        }
+
+    def predict_bands(self, grid, confidence: float = 0.95) -> pd.DataFrame:
+        """
+        Fitted values with confidence and prediction bands on a fixed grid
+        """
+        grid = np.asarray(grid, dtype=float)
+        design = self._design(grid)
+        beta = self.coefficients()
+        fitted = design @ beta
+
+        dof = self.n - self.n_params
+        sigma2 = self.summary()['RMSE'] ** 2
+        leverage = np.einsum('ij,jk,ik->i', design, np.linalg.pinv(self.xtx), design)
+        t_value = stats.t.ppf(0.5 + confidence / 2, max(dof, 1))
+
+        se_fit = np.sqrt(np.maximum(sigma2 * leverage, 0))
+        se_pred = np.sqrt(sigma2 + se_fit ** 2)
+        return pd.DataFrame({
+            'x': grid,
+            'fit': fitted,
+            'ci_lower': fitted - t_value * se_fit,
+            'ci_upper': fitted + t_value * se_fit,
+            'pi_lower': fitted - t_value * se_pred,
+            'pi_upper': fitted + t_value * se_pred
+        })
+
+    def equation(self, x_name: str = 'x', y_name: str = 'y') -> str:
+        """
+        Fitted equation in the original x units
+        """
+        # Expand the polynomial in z = (x - c) / s back to powers of x
+        scaled = np.polynomial.Polynomial(self.coefficients())
+        shift = np.polynomial.Polynomial([-self.x_center / self.x_scale, 1 / self.x_scale])
+        coefficients = scaled(shift).coef
+
+        terms = [f"{coefficients[0]:.4g}"]
+        for power, value in enumerate(coefficients[1:], start=1):
+            sign = '-' if value < 0 else '+'
+            suffix = x_name if power == 1 else f"{x_name}^{power}"
+            terms.append(f"{sign} {abs(value):.4g}·{suffix}")
+        return f"{y_name} = " + " ".join(terms)
+
+
+def fit_streaming(chunks, degree: int = 1, accumulator: RegressionAccumulator = None):
+    """
+    Ordinary/polynomial least squares over an iterable of (x, y) chunks
+
+    Pass an existing accumulator to extend a previous fit with new chunks.
+    """
+    accumulator = accumulator or RegressionAccumulator(degree)
+    for x, y in chunks:
+        accumulator.update(x, y)
+    return accumulator
+
+
+def fit_robust(chunk_factory, degree: int = 1, iterations: int = 10, tol: float = 1e-6):
+    """
+    Huber M-estimate by iteratively reweighted least squares
+
+    chunk_factory() must return a fresh iterable of (x, y) chunks; each IRLS
+    iteration is one streaming pass, with the residual scale (MAD) taken from
+    a quantile sketch of the absolute residuals.
+    """
+    model = fit_streaming(chunk_factory(), degree)
+    beta = model.coefficients()
+
+    for _ in range(iterations):
+        # Robust scale of the current residuals
+        sketch = QuantileSketch()
+        for x, y in chunk_factory():
+            valid = np.isfinite(x) & np.isfinite(y)
+            sketch.update(np.abs(y[valid] - model._design(x[valid]) @ beta))
+        scale = sketch.quantile(0.5) / 0.6745 or 1.0
+
+        weighted = RegressionAccumulator(degree, model.x_center, model.x_scale, model.y_center)
+        for x, y in chunk_factory():
+            valid = np.isfinite(x) & np.isfinite(y)
+            residual = np.full(len(x), np.nan)
+            residual[valid] = (y[valid] - model._design(x[valid]) @ beta) / scale
+            weights = np.where(np.abs(residual) <= HUBER_K, 1.0, HUBER_K / np.abs(residual))
+            weighted.update(x, y, np.nan_to_num(weights))
+
+        new_beta = weighted.coefficients()
+        converged = np.max(np.abs(new_beta - beta)) <= tol * max(np.max(np.abs(beta)), 1.0)
+        model, beta = weighted, new_beta
+        if converged:
+            break
+
+    return model
+
+
+def residual_diagnostics(model: RegressionAccumulator, chunks, sample_size: int = 2000) -> dict:
+    """
+    Streaming residual checks: Durbin-Watson, share beyond ±3 RMSE, and a
+    systematic sample of (fitted, residual) pairs for plotting
+    """
+    beta = model.coefficients()
+    rmse = model.summary()['RMSE']
+    step = max(int(model.rows_seen // sample_size), 1)
+
+    squared_diff = squared = 0.0
+    large = count = 0
+    previous = None
+    sample_fitted, sample_residual = [], []
+    row = 0
+
+    for x, y in chunks:
+        valid = np.isfinite(x) & np.isfinite(y)
+        fitted = model._design(x[valid]) @ beta
+        residual = y[valid] - fitted
+
+        if len(residual):
+            joined = residual if previous is None else np.concatenate([[previous], residual])
+            squared_diff += np.sum(np.diff(joined) ** 2)
+            squared += np.sum(residual ** 2)
+            large += int(np.sum(np.abs(residual) > 3 * rmse))
+            count += len(residual)
+            previous = residual[-1]
+
+            index = np.arange((-row) % step, len(residual), step)
+            sample_fitted.append(fitted[index])
+            sample_residual.append(residual[index])
+            row += len(residual)
+
+    return {
+        'Durbin-Watson': squared_diff / squared if squared > 0 else np.nan,
+        'Share beyond ±3 RMSE': large / count if count else np.nan,
+        'fitted': np.concatenate(sample_fitted) if sample_fitted else np.empty(0),
+        'residual': np.concatenate(sample_residual) if sample_residual else np.empty(0)
+    }
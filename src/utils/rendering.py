@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import plotly.io as pio
+
+# Concurrent renders (browser tabs, or threads on older kaleido)
+RENDER_WORKERS = 4
+
+# Rendered images kept in memory, most recently used last
+CACHE_ENTRIES = 64
+
+# Seconds to wait for a single figure before giving up
+RENDER_TIMEOUT = 120
+
+# Plotly's own default canvas size
+DEFAULT_WIDTH = 700
+DEFAULT_HEIGHT = 500
+
+
+class FigureRenderer:
+    """
+    Shared Plotly figure-to-image service for the PDF exports
+
+    With kaleido >= 1.0 one headless browser with several render tabs is
+    started on first use and kept warm on a background event loop, so exports
+    no longer pay the browser start-up on every call and several figures are
+    rendered at once. Older kaleido keeps its own persistent subprocess; there
+    the figures are dispatched from a small thread pool instead. Finished
+    images are cached by a hash of the figure content and output options.
+    """
+
+    def __init__(self, workers: int = RENDER_WORKERS, cache_entries: int = CACHE_ENTRIES):
+        self.workers = workers
+        self.cache_entries = cache_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._started = False
+        self._loop = None
+        self._browser = None
+        self._pool = None
+
+    def _start(self):
+        """
+        Open the warm browser once; fall back to the thread pool if unavailable
+        """
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            try:
+                self._start_browser()
+            except Exception:
+                self._loop = self._browser = None
+            if self._browser is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='renderer')
+
+    def _start_browser(self):
+        from kaleido import Kaleido
+
+        loop = asyncio.new_event_loop()
+        threading.Thread(target=loop.run_forever, name='renderer-loop', daemon=True).start()
+
+        async def open_browser():
+            browser = Kaleido(n=self.workers)
+            await browser.open()
+            return browser
+
+        try:
+            self._browser = asyncio.run_coroutine_threadsafe(open_browser(), loop).result(RENDER_TIMEOUT)
+        except Exception:
+            loop.call_soon_threadsafe(loop.stop)
+            raise
+        self._loop = loop
+
+    @staticmethod
+    def figure_key(fig, format: str, width, height, scale) -> str:
+        """
+        Content hash of a figure and its output options
+        """
+        digest = hashlib.sha256(pio.to_json(fig, validate=False).encode())
+        digest.update(repr((format, width, height, scale)).encode())
+        return digest.hexdigest()
+
+    def _cached(self, key):
+        with self._lock:
+            image = self._cache.get(key)
+            if image is not None:
+                self._cache.move_to_end(key)
+            return image
+
+    def _store(self, key, image):
+        with self._lock:
+            self._cache[key] = image
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+
+    def _submit(self, fig, format, width, height, scale):
+        """
+        Queue one render and return a concurrent future for its bytes
+        """
+        if self._browser is None:
+            return self._pool.submit(pio.to_image, fig, format=format, width=width,
+                                     height=height, scale=scale)
+
+        fig_dict = fig if isinstance(fig, dict) else fig.to_dict()
+        layout = fig_dict.get('layout', {})
+        opts = {
+            'format': format,
+            'width': width or layout.get('width') or DEFAULT_WIDTH,
+            'height': height or layout.get('height') or DEFAULT_HEIGHT,
+            'scale': scale or 1
+        }
+        return asyncio.run_coroutine_threadsafe(self._browser.calc_fig(fig_dict, opts=opts), self._loop)
+
+    def render_many(self, figs, format: str = 'png', width: int = None,
+                    height: int = None, scale: float = None) -> list:
+        """
+        Render several figures concurrently, in the order given
+        """
+        keys = [self.figure_key(fig, format, width, height, scale) for fig in figs]
+        images = [self._cached(key) for key in keys]
+
+        pending = [i for i, image in enumerate(images) if image is None]
+        if pending:
+            self._start()
+            futures = {i: self._submit(figs[i], format, width, height, scale) for i in pending}
+            for i, future in futures.items():
+                images[i] = future.result(RENDER_TIMEOUT)
+                self._store(keys[i], images[i])
+        return images
+
+    def render(self, fig, format: str = 'png', width: int = None,
+               height: int = None, scale: float = None) -> bytes:
+        """
+        Render a single figure (served from the cache when unchanged)
+        """
+        return self.render_many([fig], format, width, height, scale)[0]
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+_renderer = FigureRenderer()
+
+
+def render_figure(fig, format: str = 'png', width: int = None, height: int = None,
+                  scale: float = None) -> bytes:
+    """
+    Figure to image bytes through the shared renderer
+    """
+    return _renderer.render(fig, format, width, height, scale)
+
+
+def render_figures(figs, format: str = 'png', width: int = None, height: int = None,
+                   scale: float = None) -> list:
+    """
+    Several figures to image bytes, rendered concurrently
+    """
+    return _renderer.render_many(list(figs), format, width, height, scale)
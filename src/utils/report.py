@@ -0,0 +1,231 @@
+import os
+import weakref
+import tempfile
+import threading
+from xml.sax.saxutils import escape
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, LongTable, TableStyle, PageBreak
+
+from src.utils.rendering import render_figures
+
+try:
+    from svglib.svglib import svg2rlg
+except ImportError:  # vector charts need svglib; fall back to PNG
+    svg2rlg = None
+
+# Report jobs built at the same time (each one renders its figures concurrently)
+REPORT_WORKERS = 2
+
+# Chart size on the page, in points
+IMAGE_WIDTH = 500
+IMAGE_HEIGHT = 300
+
+# Data rows written per table before the rest is summarised
+MAX_TABLE_ROWS = 1000
+
+# Usable width of a letter page with the default 1-inch margins, in points
+FRAME_WIDTH = 468
+
+_job_pool = ThreadPoolExecutor(max_workers=REPORT_WORKERS, thread_name_prefix='report')
+
+
+def make_section(title: str, text=(), figures=(), tables=()) -> dict:
+    """
+    One report section: paragraphs, Plotly figures and (caption, DataFrame) tables
+    """
+    return {
+        'title': title,
+        'text': [str(line) for line in text],
+        'figures': list(figures),
+        'tables': [(caption, table) for caption, table in tables]
+    }
+
+
+def paragraph_markup(text: str) -> str:
+    """
+    Plain multi-line text (tool interpretations, titles) as reportlab markup
+    """
+    return '<br/>'.join(escape(line.strip()) for line in str(text).strip().splitlines())
+
+
+def figure_flowables(figures, width: float = IMAGE_WIDTH, height: float = IMAGE_HEIGHT,
+                     vector: bool = True) -> list:
+    """
+    Plotly figures as PDF flowables, rendered concurrently by the shared renderer
+
+    With svglib available the charts are rendered to SVG and embedded as
+    reportlab drawings, so they stay vector graphics in the PDF; otherwise
+    they are rasterised to PNG.
+    """
+    figures = list(figures)
+    if not vector or svg2rlg is None:
+        return [Image(BytesIO(image), width=width, height=height)
+                for image in render_figures(figures, format='png')]
+
+    flowables = []
+    for svg in render_figures(figures, format='svg'):
+        drawing = svg2rlg(BytesIO(svg))
+        factor = min(width / drawing.width, height / drawing.height)
+        drawing.scale(factor, factor)
+        drawing.width *= factor
+        drawing.height *= factor
+        flowables.append(drawing)
+    return flowables
+
+
+def _format_column(values: np.ndarray, decimals: int) -> np.ndarray:
+    """
+    One column as an array of strings, formatted in a single vectorised call
+    """
+    if values.dtype.kind == 'f':
+        text = np.char.mod(f'%.{decimals}f', values)
+        return np.where(np.isnan(values), '', text)
+    return values.astype(str)
+
+
+def table_flowable(table: pd.DataFrame, max_rows: int = MAX_TABLE_ROWS, width: float = FRAME_WIDTH,
+                   decimals: int = 4) -> LongTable:
+    """
+    Data table that splits across pages with the header repeated on each
+
+    Rows beyond max_rows are left out and replaced by a closing summary row.
+    Cells are formatted column by column and the column widths are fixed, so
+    reportlab doesn't measure every cell to lay the table out.
+    """
+    table = table.reset_index() if table.index.name is not None else table
+    total = len(table)
+    shown = table.iloc[:max_rows]
+
+    columns = [_format_column(shown[column].to_numpy(), decimals) for column in shown.columns]
+    body = np.column_stack(columns).tolist() if columns and len(shown) else []
+    data = [[str(column) for column in table.columns]] + body
+
+    style = [
+        ('BACKGROUND', (0,0), (-1,0), colors.grey),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
+        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+        ('GRID', (0,0), (-1,-1), 1, colors.black),
+        ('FONTSIZE', (0,0), (-1,-1), 8 if len(table.columns) > 6 else 10)
+    ]
+    if total > max_rows:
+        data.append([f"... {total - max_rows:,} more rows not shown ({total:,} in total)"] + [''] * (len(table.columns) - 1))
+        style += [('SPAN', (0,-1), (-1,-1)), ('ALIGN', (0,-1), (-1,-1), 'LEFT')]
+
+    flowable = LongTable(data, colWidths=[width / max(len(table.columns), 1)] * len(table.columns), repeatRows=1)
+    flowable.setStyle(TableStyle(style))
+    return flowable
+
+
+def build_report(sections: list, path: str, title: str = "Lean Six Sigma Report", progress=None):
+    """
+    Write a multi-page PDF with one page block per section straight to disk
+
+    All figures of all sections go to the shared renderer in one batch so
+    they are rendered concurrently. progress(done, total) is called as the
+    stages complete.
+    """
+    total = len(sections) + 1
+    figures = [fig for section in sections for fig in section['figures']]
+    charts = iter(figure_flowables(figures))
+    if progress:
+        progress(1, total)
+
+    styles = getSampleStyleSheet()
+    elements = [Paragraph(paragraph_markup(title), styles['Title'])]
+    for number, section in enumerate(sections, start=1):
+        if number > 1:
+            elements.append(PageBreak())
+        elements.append(Paragraph(paragraph_markup(section['title']), styles['Heading1']))
+        for line in section['text']:
+            elements.append(Paragraph(paragraph_markup(line), styles['Normal']))
+        for _ in section['figures']:
+            elements.append(Spacer(1, 12))
+            elements.append(next(charts))
+        for caption, table in section['tables']:
+            elements.append(Paragraph(paragraph_markup(caption), styles['Heading2']))
+            elements.append(table_flowable(table))
+        if progress:
+            progress(number + 1, total)
+
+    # SimpleDocTemplate writes the file itself, nothing is kept in memory
+    SimpleDocTemplate(path, pagesize=letter).build(elements)
+    return path
+
+
+class ReportJob:
+    """
+    Report build running in a background worker, written to a temp file
+
+    The Streamlit script only polls status/progress; the finished PDF is
+    read from disk when it is downloaded. The file is removed on discard()
+    (after the build, if it is still running) or once the job is garbage
+    collected with its session.
+    """
+
+    def __init__(self, sections: list, title: str = "Lean Six Sigma Report"):
+        self.sections = sections
+        self.title = title
+        self.status = 'pending'
+        self.progress = 0.0
+        self.error = None
+        fd, self.path = tempfile.mkstemp(prefix='lss_report_', suffix='.pdf')
+        os.close(fd)
+        self.discarded = False
+        self._lock = threading.Lock()
+        self._future = None
+        self._cleanup = weakref.finalize(self, _remove_file, self.path)
+
+    def start(self):
+        self.status = 'running'
+        self._future = _job_pool.submit(self._run)
+        return self
+
+    def _update_progress(self, done, total):
+        with self._lock:
+            self.progress = done / total
+
+    def _run(self):
+        try:
+            build_report(self.sections, self.path, self.title, self._update_progress)
+            status = 'done'
+        except Exception as e:
+            self.error = str(e)
+            status = 'failed'
+        with self._lock:
+            self.status = status
+            discarded = self.discarded
+        if discarded:
+            self._cleanup()
+
+    @property
+    def running(self) -> bool:
+        return self.status in ('pending', 'running')
+
+    def size(self) -> int:
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def discard(self):
+        """
+        Remove the temp file (call once the job is no longer needed)
+
+        A job that is still building removes its file when it finishes.
+        """
+        with self._lock:
+            self.discarded = True
+            running = self.running
+        if not running:
+            self._cleanup()
+
+
+def _remove_file(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
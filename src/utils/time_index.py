@@ -0,0 +1,203 @@
+import numpy as np
+import pandas as pd
+
+NS_PER_HOUR = 3_600_000_000_000
+NS_PER_DAY = 24 * NS_PER_HOUR
+
+# Shift start hours (three 8-hour shifts; hours before the first start belong to the last shift)
+SHIFT_STARTS = (6, 14, 22)
+SHIFT_LABELS = ['Shift 1 (06-14)', 'Shift 2 (14-22)', 'Shift 3 (22-06)']
+
+# Bucket widths of the pre-aggregates, finest first (Shift is computed from SHIFT_STARTS)
+RESOLUTIONS = {
+    'Minute': 60_000_000_000,
+    'Hour': NS_PER_HOUR,
+    'Shift': None,
+    'Day': NS_PER_DAY
+}
+
+
+def to_nanoseconds(series: pd.Series) -> np.ndarray:
+    """
+    Timestamps as int64 nanoseconds (timezone-aware values in UTC); NaT is NaT's int64
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        times = series
+    else:
+        times = pd.to_datetime(series, errors='coerce', format='mixed')
+    if getattr(times.dt, 'tz', None) is not None:
+        times = times.dt.tz_convert('UTC').dt.tz_localize(None)
+    return times.to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+
+def is_time_column(series: pd.Series, sample: int = 100) -> bool:
+    """
+    Datetime columns, or text columns whose leading values all parse as dates
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return True
+    if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+        return False
+    head = series.dropna().head(sample)
+    if head.empty:
+        return False
+    try:
+        return pd.to_datetime(head, errors='coerce', format='mixed').notna().all()
+    except (TypeError, ValueError):
+        return False
+
+
+def shift_codes(times: np.ndarray) -> np.ndarray:
+    """
+    Shift number (0-based) of each timestamp
+    """
+    hours = np.mod(times, NS_PER_DAY) // NS_PER_HOUR
+    codes = np.searchsorted(SHIFT_STARTS, hours, side='right') - 1
+    return np.where(codes < 0, len(SHIFT_STARTS) - 1, codes)
+
+
+def build_time_index(series: pd.Series) -> dict:
+    """
+    Row positions sorted by time, built once per dataset and time column
+
+    Rows without a valid timestamp are left out. A date range then maps to a
+    contiguous slice of 'order', found with two binary searches on 'times'.
+    'row_order' is True when every row is indexed and already in time order.
+    """
+    raw = to_nanoseconds(series)
+    valid = np.flatnonzero(raw != np.iinfo(np.int64).min)
+    order = valid[np.argsort(raw[valid], kind='stable')]
+    times = raw[order]
+    return {
+        'order': order,
+        'times': times,
+        'shift': shift_codes(times),
+        'row_order': len(order) == len(raw) and bool(np.all(order[1:] > order[:-1]))
+    }
+
+
+def extend_time_index(index: dict, series: pd.Series, offset: int) -> dict:
+    """
+    Index with appended rows added (series holds their timestamps, the first
+    at row position offset)
+
+    Only the new rows are sorted. When they are all later than the indexed
+    rows, as for a live feed, they are appended; otherwise they are merged in
+    at their binary-searched positions.
+    """
+    new = build_time_index(series)
+    if len(new['times']) == 0:
+        return {**index, 'row_order': index['row_order'] and len(series) == 0}
+    order = new['order'] + offset
+
+    times = index['times']
+    if len(times) == 0 or new['times'][0] >= times[-1]:
+        return {
+            'order': np.concatenate([index['order'], order]),
+            'times': np.concatenate([times, new['times']]),
+            'shift': np.concatenate([index['shift'], new['shift']]),
+            'row_order': index['row_order'] and new['row_order'] and len(index['order']) == offset
+        }
+
+    # side='right' keeps equal timestamps in row order, as the stable sort does
+    at = np.searchsorted(times, new['times'], side='right')
+    return {
+        'order': np.insert(index['order'], at, order),
+        'times': np.insert(times, at, new['times']),
+        'shift': np.insert(index['shift'], at, new['shift']),
+        'row_order': False
+    }
+
+
+def range_bounds(index: dict, start=None, end=None) -> tuple:
+    """
+    (lo, hi) slice of the sorted index covering start <= time < end
+    """
+    times = index['times']
+    lo = 0 if start is None else int(np.searchsorted(times, pd.Timestamp(start).value, side='left'))
+    hi = len(times) if end is None else int(np.searchsorted(times, pd.Timestamp(end).value, side='left'))
+    return lo, max(lo, hi)
+
+
+def bucket_starts(times: np.ndarray, resolution: str) -> np.ndarray:
+    """
+    Start of the minute/hour/shift/day bucket containing each timestamp
+    """
+    width = RESOLUTIONS[resolution]
+    if width is not None:
+        return times - np.mod(times, width)
+
+    day_start = times - np.mod(times, NS_PER_DAY)
+    codes = shift_codes(times)
+    hours = np.mod(times, NS_PER_DAY) // NS_PER_HOUR
+    starts = day_start + np.asarray(SHIFT_STARTS)[codes] * NS_PER_HOUR
+    # Early-morning hours belong to the shift that started the previous evening
+    return starts - np.where(hours < SHIFT_STARTS[0], NS_PER_DAY, 0)
+
+
+def time_aggregates(df: pd.DataFrame, index: dict, columns, resolution: str) -> pd.DataFrame:
+    """
+    count/mean/min/max per time bucket for each column
+
+    The rows are already in time order, so every bucket is a contiguous
+    segment and all statistics come from reduceat over the segment starts.
+    Columns are a (variable, statistic) MultiIndex; the index holds the
+    bucket start times.
+    """
+    columns = list(columns)
+    times = index['times']
+    if len(times) == 0:
+        return pd.DataFrame(columns=pd.MultiIndex.from_product([columns, ['count', 'mean', 'min', 'max']]))
+
+    starts = bucket_starts(times, resolution)
+    segments = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+
+    values = df[columns].to_numpy(dtype=float)[index['order']]
+    valid = np.isfinite(values)
+    count = np.add.reduceat(valid.astype(np.int64), segments, axis=0)
+    total = np.add.reduceat(np.where(valid, values, 0.0), segments, axis=0)
+    low = np.minimum.reduceat(np.where(valid, values, np.inf), segments, axis=0)
+    high = np.maximum.reduceat(np.where(valid, values, -np.inf), segments, axis=0)
+
+    empty = count == 0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(empty, np.nan, total / count)
+    low = np.where(empty, np.nan, low)
+    high = np.where(empty, np.nan, high)
+
+    result = {}
+    for i, column in enumerate(columns):
+        result[(column, 'count')] = count[:, i]
+        result[(column, 'mean')] = mean[:, i]
+        result[(column, 'min')] = low[:, i]
+        result[(column, 'max')] = high[:, i]
+    return pd.DataFrame(result, index=pd.DatetimeIndex(starts[segments], name='time'))
+
+
+def extend_time_aggregates(aggregates: pd.DataFrame, df: pd.DataFrame, index: dict, columns,
+                           resolution: str, since: int) -> pd.DataFrame:
+    """
+    Pre-aggregates updated for rows appended with timestamps from since (ns) on
+
+    Buckets before the one containing since are kept; only the rows from
+    that bucket onward are aggregated again (for a live feed, the last bucket
+    and the new ones).
+    """
+    start = int(bucket_starts(np.array([since], dtype=np.int64), resolution)[0])
+    lo = int(np.searchsorted(index['times'], start, side='left'))
+    tail = time_aggregates(df, {'order': index['order'][lo:], 'times': index['times'][lo:]}, columns, resolution)
+    head = aggregates[aggregates.index < pd.Timestamp(start)]
+    return pd.concat([head, tail]) if len(head) else tail
+
+
+def pick_resolution(n_rows: int, span_ns: int, max_points: int) -> str:
+    """
+    Finest resolution that keeps a chart under max_points ('Raw' if the rows already fit)
+    """
+    if n_rows <= max_points:
+        return 'Raw'
+    for name, width in RESOLUTIONS.items():
+        width = width or 8 * NS_PER_HOUR
+        if span_ns / width <= max_points:
+            return name
+    return 'Day'